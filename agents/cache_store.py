@@ -0,0 +1,203 @@
+# agents/cache_store.py
+#
+# Small content-addressed cache used by the agents:
+#   - in-memory LRU in front (cheap Streamlit reruns)
+#   - on-disk JSON store behind it (survives app restarts)
+
+import os
+import json
+import hashlib
+import weakref
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(os.getenv("HIRESENSE_CACHE_DIR", str(ROOT_DIR / ".hiresense_cache")))
+
+# caches living under CACHE_DIR, for use_cache_dir()
+_DEFAULT_DIR_CACHES: "weakref.WeakSet[LRUDiskCache]" = weakref.WeakSet()
+
+
+def normalize_text(value: str) -> str:
+    """Case/whitespace-insensitive form used in cache keys (e.g. company, role)."""
+    return " ".join((value or "").lower().split())
+
+
+def content_hash(*parts: Any) -> str:
+    """Stable sha256 over bytes, strings, or JSON-serializable values."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray)):
+            data = bytes(part)
+        elif isinstance(part, str):
+            data = part.encode("utf-8")
+        else:
+            data = json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        # length prefix so ("ab", "c") and ("a", "bc") hash differently
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class LRUDiskCache:
+    """
+    Two-level cache keyed by a content hash.
+
+    Values must be JSON-serializable. Disk failures never raise –
+    the cache degrades to memory-only so the app still runs.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_items: int = 256,
+        cache_dir: Optional[Path] = None,
+        persist: bool = True,
+    ):
+        self.namespace = namespace
+        self.max_items = max_items
+        self.persist = persist
+        self.dir = Path(cache_dir or CACHE_DIR) / namespace
+        self._mem: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if cache_dir is None:
+            _DEFAULT_DIR_CACHES.add(self)
+
+    # ---------- disk helpers ----------
+
+    def _path(self, key: str) -> Path:
+        return self.dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Optional[Any]:
+        if not self.persist:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Cache read failed ({self.namespace}):", e)
+            return None
+
+    def _disk_set(self, key: str, value: Any) -> None:
+        if not self.persist:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"Cache write failed ({self.namespace}):", e)
+
+    # ---------- public API ----------
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._mem:
+                self._mem.move_to_end(key)
+                self.hits += 1
+                return self._mem[key]
+
+        value = self._disk_get(key)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, value)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._remember(key, value)
+        self._disk_set(key, value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._mem.pop(key, None)
+        if self.persist:
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Cache delete failed ({self.namespace}):", e)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._mem.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_items": len(self._mem),
+            }
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+
+class KeyLocks:
+    """
+    One lock per cache key for single-flight builds. A key's lock exists
+    only while someone holds or waits for it, so a long-running app does
+    not keep a lock for every key it has ever built.
+    """
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        # key -> [lock, holders + waiters]
+        self._locks: Dict[str, List[Any]] = {}
+
+    @contextmanager
+    def hold(self, key: str) -> Iterator[None]:
+        with self._guard:
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def __len__(self) -> int:
+        with self._guard:
+            return len(self._locks)
+
+
+def use_cache_dir(cache_dir: Path) -> None:
+    """
+    Move every cache that lives under CACHE_DIR to `cache_dir`, empty, and
+    make it the default for caches created later. Benchmarks use this to
+    give each suite its own caches.
+    """
+    global CACHE_DIR
+    CACHE_DIR = Path(cache_dir)
+    for cache in list(_DEFAULT_DIR_CACHES):
+        with cache._lock:
+            cache.dir = CACHE_DIR / cache.namespace
+            cache._mem.clear()
+            cache.hits = 0
+            cache.misses = 0
@@ -0,0 +1,297 @@
+# agents/embedding_index.py
+#
+# Embedding store for ranking parsed resumes against a role profile
+# without running the LLM fit stage on every candidate.
+#
+#   - HashingEmbedder: offline, dependency-free feature-hashing vectorizer
+#     (words + bigrams + canonical lexicon skills), L2-normalized float32
+#   - EmbeddingStore: memory-mapped (capacity x dim) float32 matrix on
+#     disk, incremental add / overwrite / delete (tombstones, rows reused),
+#     brute-force top-k with NumPy
+#
+# Any object with `dim` and `embed(text) -> np.ndarray` can be plugged in
+# as the embedder.
+
+import os
+import re
+import json
+import zlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.cache_store import LRUDiskCache, content_hash
+from agents.skill_lexicon import get_skill_matcher
+
+
+#############################################
+# PROFILE -> TEXT
+#############################################
+
+RESUME_FIELDS = [
+    "skills_canonical",
+    "skills_raw_exact",
+    "tech_stack_clusters",
+    "project_signals",
+    "core_strengths_raw",
+    "resume_domain",
+    "seniority_signal",
+]
+
+ROLE_FIELDS = [
+    "skills_most_often_required",
+    "skills_nice_to_have",
+    "projects_they_like",
+    "common_interview_themes",
+    "seniority_pattern",
+]
+
+
+def _flatten(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _flatten(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _flatten(v)
+
+
+def profile_text(profile: Dict[str, Any], fields: Sequence[str]) -> str:
+    return "\n".join(t for f in fields for t in _flatten(profile.get(f, [])))
+
+
+#############################################
+# EMBEDDER
+#############################################
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+# canonical skills are the strongest signal – weight them above plain words
+SKILL_WEIGHT = 3.0
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words, bigrams and lexicon skills."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        h = zlib.crc32(feature.encode("utf-8"))
+        return h % self.dim, (1.0 if (h >> 31) & 1 else -1.0)
+
+    def embed(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        words = _TOKEN_RE.findall((text or "").lower())
+
+        counts: Dict[str, float] = {}
+        for w in words:
+            counts["w:" + w] = counts.get("w:" + w, 0.0) + 1.0
+        for a, b in zip(words, words[1:]):
+            key = f"b:{a} {b}"
+            counts[key] = counts.get(key, 0.0) + 1.0
+        for skill in get_skill_matcher().canonical_skills(text or ""):
+            counts["s:" + skill] = SKILL_WEIGHT
+
+        for feature, tf in counts.items():
+            i, sign = self._bucket(feature)
+            vec[i] += sign * (1.0 + np.log(tf))
+
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        return vec
+
+    def embed_resume(self, resume_profile: Dict[str, Any]) -> np.ndarray:
+        return self.embed(profile_text(resume_profile, RESUME_FIELDS))
+
+    def embed_role(self, role_profile: Dict[str, Any]) -> np.ndarray:
+        return self.embed(profile_text(role_profile, ROLE_FIELDS))
+
+
+#############################################
+# STORE
+#############################################
+
+class EmbeddingStore:
+    """
+    Files under `path`:
+      vectors.f32   – raw float32 matrix, memory-mapped (capacity x dim)
+      meta.json     – id -> row map, free rows, dim, capacity
+      payloads/     – optional JSON payload per id (e.g. the resume profile)
+
+    Adds write straight into the mapped matrix; growing extends the file
+    and re-maps it (existing rows are never rewritten). Deletes zero the
+    row and put it on a free list for reuse. Call flush() after a burst of
+    add()/delete() – add_many() flushes for you.
+    """
+
+    def __init__(self, path: Path, dim: int = 512, initial_capacity: int = 1024):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.path / "vectors.f32"
+        self._meta_path = self.path / "meta.json"
+        self._lock = threading.RLock()
+        self.payloads = LRUDiskCache("payloads", max_items=256, cache_dir=self.path)
+
+        if self._meta_path.exists():
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            self.dim = meta["dim"]
+            self.capacity = meta["capacity"]
+            self.row_of: Dict[str, int] = meta["row_of"]
+            self.free_rows: List[int] = meta["free_rows"]
+            self.next_row: int = meta["next_row"]
+        else:
+            self.dim = dim
+            self.capacity = initial_capacity
+            self.row_of = {}
+            self.free_rows = []
+            self.next_row = 0
+
+        self._ensure_file(self.capacity)
+        self._map()
+        self._rebuild_id_index()
+
+    # ---------- file / mapping ----------
+
+    def _ensure_file(self, capacity: int) -> None:
+        size = capacity * self.dim * 4
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+
+    def _map(self) -> None:
+        self.matrix = np.memmap(
+            self._vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim)
+        )
+
+    def _grow(self) -> None:
+        self.matrix.flush()
+        new_capacity = self.capacity * 2
+        del self.matrix
+        self._ensure_file(new_capacity)
+        self.capacity = new_capacity
+        self._map()
+        self._alive = np.concatenate([self._alive, np.zeros(new_capacity - len(self._alive), dtype=bool)])
+        self._ids.extend([None] * (new_capacity - len(self._ids)))
+
+    def _rebuild_id_index(self) -> None:
+        self._alive = np.zeros(self.capacity, dtype=bool)
+        self._ids: List[Optional[str]] = [None] * self.capacity
+        for item_id, row in self.row_of.items():
+            self._alive[row] = True
+            self._ids[row] = item_id
+
+    # ---------- mutation ----------
+
+    def add(self, item_id: str, vector: np.ndarray, payload: Any = None) -> None:
+        vector = np.asarray(vector, dtype=np.float32)
+        if vector.shape != (self.dim,):
+            raise ValueError(f"expected vector of shape ({self.dim},), got {vector.shape}")
+
+        with self._lock:
+            row = self.row_of.get(item_id)
+            if row is None:
+                if self.free_rows:
+                    row = self.free_rows.pop()
+                else:
+                    if self.next_row >= self.capacity:
+                        self._grow()
+                    row = self.next_row
+                    self.next_row += 1
+                self.row_of[item_id] = row
+                self._ids[row] = item_id
+                self._alive[row] = True
+            self.matrix[row] = vector
+
+        if payload is not None:
+            self.payloads.set(content_hash(item_id), payload)
+
+    def add_many(self, items: Iterable[Tuple[str, np.ndarray, Any]]) -> int:
+        n = 0
+        for item_id, vector, payload in items:
+            self.add(item_id, vector, payload)
+            n += 1
+        self.flush()
+        return n
+
+    def delete(self, item_id: str) -> bool:
+        with self._lock:
+            row = self.row_of.pop(item_id, None)
+            if row is None:
+                return False
+            self.matrix[row] = 0.0
+            self._alive[row] = False
+            self._ids[row] = None
+            self.free_rows.append(row)
+        self.payloads.delete(content_hash(item_id))
+        return True
+
+    def flush(self) -> None:
+        with self._lock:
+            self.matrix.flush()
+            meta = {
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "row_of": self.row_of,
+                "free_rows": self.free_rows,
+                "next_row": self.next_row,
+            }
+            tmp = self._meta_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp, self._meta_path)
+
+    # ---------- queries ----------
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.row_of
+
+    def get_payload(self, item_id: str) -> Optional[Any]:
+        return self.payloads.get(content_hash(item_id))
+
+    def search(self, query: np.ndarray, k: int = 10) -> List[Tuple[str, float]]:
+        """Top-k (id, cosine similarity) by brute-force dot product."""
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            n = self.next_row
+            if n == 0 or not self.row_of:
+                return []
+            scores = self.matrix[:n] @ query
+            scores = np.where(self._alive[:n], scores, -np.inf)
+            k = min(k, len(self.row_of))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._ids[i], float(scores[i])) for i in top]
+
+
+#############################################
+# CONVENIENCE
+#############################################
+
+def index_resume(
+    store: EmbeddingStore,
+    resume_id: str,
+    resume_profile: Dict[str, Any],
+    embedder: Optional[HashingEmbedder] = None,
+    payload: Any = None,
+) -> None:
+    embedder = embedder or HashingEmbedder(store.dim)
+    store.add(resume_id, embedder.embed_resume(resume_profile), payload if payload is not None else resume_profile)
+
+
+def shortlist(
+    store: EmbeddingStore,
+    role_profile: Dict[str, Any],
+    k: int = 50,
+    embedder: Optional[HashingEmbedder] = None,
+) -> List[Tuple[str, float]]:
+    """Best-matching stored resumes for a role – only these go to the LLM fit stage."""
+    embedder = embedder or HashingEmbedder(store.dim)
+    return store.search(embedder.embed_role(role_profile), k=k)
@@ -0,0 +1,502 @@
+# agents/fake_openai.py
+#
+# Offline stand-in for the OpenAI client: replays recorded chat.completions
+# contents with a configurable latency distribution.
+#
+#   - FakeOpenAI / AsyncFakeOpenAI: in-process, duck-type
+#     client.chat.completions.create() (incl. with_raw_response and
+#     stream=True); HIRESENSE_LLM_BACKEND=fake or
+#     agents.openai_client.set_client(FakeOpenAI(...))
+#   - serve(): the same replay behind a local OpenAI-compatible HTTP stub
+#     (POST /v1/chat/completions, JSON or SSE streaming)
+#   - FakeQuota: server-side RPM/TPM enforcement with x-ratelimit-* headers
+#     and 429 + retry-after, plus an optional 5xx error rate, to exercise
+#     the retry scheduler (agents/rate_limit.py)
+#   - a `timeout` request option shorter than the sampled latency raises
+#     APITimeoutError after `timeout` seconds, to exercise model tier
+#     fallback (agents/model_router.py)
+#   - vary=True: the top-level string fields of each JSON answer are
+#     tagged with a hash of the prompt, so different inputs get different
+#     answers (as from a real model) and downstream caches keyed by them
+#     don't collapse many analyses into one
+#   - RecordingClient: wraps a real client and saves responses in the
+#     fixtures format, to refresh the recordings
+#
+# Latency specs: "0.8" / "fixed:0.8", "uniform:0.3,1.2",
+# "lognormal:1.5,0.4" (median seconds, sigma). Multiply everything with
+# `scale` to run the same shape faster.
+
+import os
+import json
+import math
+import hashlib
+import time
+import asyncio
+import random
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+FIXTURES = Path(
+    os.getenv(
+        "HIRESENSE_FAKE_RECORDINGS",
+        Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "replay_responses.json",
+    )
+)
+
+# chars per streamed chunk (~5 tokens)
+STREAM_CHUNK_CHARS = 20
+
+
+#############################################
+# LATENCY
+#############################################
+
+class LatencyModel:
+    def __init__(self, spec: str = "0", scale: float = 1.0, seed: Optional[int] = None):
+        self.spec = spec
+        self.scale = scale
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        kind, _, args = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+        self.kind = kind
+        self.args = [float(a) for a in args.split(",") if a]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"unknown latency distribution: {spec!r}")
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.args[0] if self.args else 0.0
+            elif self.kind == "uniform":
+                value = self._rng.uniform(self.args[0], self.args[1])
+            else:
+                median, sigma = self.args
+                value = self._rng.lognormvariate(math.log(median), sigma)
+        return max(0.0, value * self.scale)
+
+
+#############################################
+# RECORDINGS
+#############################################
+
+def load_recordings(path: Path = FIXTURES) -> List[Dict[str, Any]]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return data["responses"]
+
+
+def _prompt_of(kwargs: Dict[str, Any]) -> str:
+    return "\n".join(str(m.get("content", "")) for m in kwargs.get("messages") or [])
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+#############################################
+# SIMULATED RATE LIMITS
+#############################################
+
+def _varied(content: Any, prompt: str) -> Any:
+    """`content` with its top-level string values tagged by a hash of `prompt`."""
+    if not isinstance(content, dict):
+        return content
+    # hex only: the tag can't spell a skill, seniority or domain keyword
+    tag = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+    return {k: f"{v} [{tag}]" if isinstance(v, str) and v else v for k, v in content.items()}
+
+
+class FakeAPIError(Exception):
+    """Duck-types openai.APIStatusError: .status_code and .response.headers."""
+
+    def __init__(self, status_code: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class APITimeoutError(Exception):
+    """Duck-types openai.APITimeoutError (matched by class name)."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"Request timed out after {timeout:g}s (fake)")
+
+
+class FakeQuota:
+    """
+    The API's per-key limits as two buckets refilled per second
+    (`burst_seconds` of budget at most). Every response carries
+    x-ratelimit-* headers; an empty bucket is a 429 with retry-after.
+    """
+
+    def __init__(self, rpm: float, tpm: float = 0, burst_seconds: float = 1.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._levels = {"requests": rpm * burst_seconds / 60.0, "tokens": tpm * burst_seconds / 60.0}
+        self._caps = dict(self._levels)
+        self._rates = {"requests": rpm / 60.0, "tokens": tpm / 60.0}
+        self._limits = {"requests": rpm, "tokens": tpm}
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+
+    def admit(self, tokens: int):
+        """(ok, headers) for one request of `tokens` tokens."""
+        with self._lock:
+            now = time.monotonic()
+            for kind, rate in self._rates.items():
+                self._levels[kind] = min(self._caps[kind], self._levels[kind] + (now - self._updated) * rate)
+            self._updated = now
+
+            need = {"requests": 1.0, "tokens": float(min(tokens, self._caps["tokens"]))}
+            active = [k for k in need if self._rates[k] > 0]
+            wait = max([(need[k] - self._levels[k]) / self._rates[k] for k in active] + [0.0])
+            ok = wait <= 0
+            if ok:
+                for k in active:
+                    self._levels[k] -= need[k]
+                self.admitted += 1
+            else:
+                self.rejected += 1
+
+            headers: Dict[str, str] = {}
+            for k in active:
+                headers[f"x-ratelimit-limit-{k}"] = str(int(self._limits[k]))
+                headers[f"x-ratelimit-remaining-{k}"] = str(max(0, int(self._levels[k])))
+                headers[f"x-ratelimit-reset-{k}"] = f"{(self._caps[k] - self._levels[k]) / self._rates[k]:.3f}s"
+            if not ok:
+                headers["retry-after-ms"] = str(int(wait * 1000) + 1)
+            return ok, headers
+
+
+#############################################
+# IN-PROCESS FAKE
+#############################################
+
+class _Raw:
+    """Mimics openai's LegacyAPIResponse: .parse() + .retries_taken + .headers."""
+
+    def __init__(self, result: Any, headers: Optional[Dict[str, str]] = None):
+        self._result = result
+        self.retries_taken = 0
+        self.headers = headers or {}
+
+    def parse(self) -> Any:
+        return self._result
+
+
+class _FakeCompletions:
+    def __init__(self, owner: "FakeOpenAI"):
+        self._owner = owner
+        self.with_raw_response = SimpleNamespace(create=lambda **kw: self._owner._complete(kw, raw=True))
+
+    def create(self, **kwargs: Any) -> Any:
+        return self._owner._complete(kwargs)
+
+
+class FakeOpenAI:
+    """
+    `latency` applies to every call unless the matched recording's agent
+    has an entry in `per_agent_latency`. Unmatched prompts get "{}".
+    With `quota`, requests over it fail with a 429 FakeAPIError;
+    `error_rate` of the rest fail with a 503. A call whose `timeout`
+    option is below its latency (time to first token when streaming)
+    raises APITimeoutError once the timeout has passed. With `vary`,
+    answers differ per prompt (see the module notes).
+    """
+
+    def __init__(
+        self,
+        recordings: Optional[List[Dict[str, Any]]] = None,
+        latency: Optional[LatencyModel] = None,
+        per_agent_latency: Optional[Dict[str, LatencyModel]] = None,
+        quota: Optional[FakeQuota] = None,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        vary: bool = False,
+    ):
+        self.recordings = recordings if recordings is not None else load_recordings()
+        self.latency = latency or LatencyModel("0")
+        self.per_agent_latency = per_agent_latency or {}
+        self.quota = quota
+        self.error_rate = error_rate
+        self.vary = vary
+        self._rng = random.Random(seed)
+        self.chat = SimpleNamespace(completions=_FakeCompletions(self))
+        self.calls: Dict[str, int] = {}
+        self.completion_tokens: Dict[str, int] = {}
+        self.errors: Dict[int, int] = {}
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def match(self, prompt: str) -> Dict[str, Any]:
+        for rec in self.recordings:
+            if rec["match"] in prompt:
+                return rec
+        return {"agent": "unmatched", "content": {}}
+
+    def _prepare(self, kwargs: Dict[str, Any]):
+        prompt = _prompt_of(kwargs)
+        rec = self.match(prompt)
+        answer = _varied(rec["content"], prompt) if self.vary else rec["content"]
+        content = answer if isinstance(answer, str) else json.dumps(answer, ensure_ascii=False)
+        delay = self.per_agent_latency.get(rec["agent"], self.latency).sample()
+
+        usage = SimpleNamespace(
+            prompt_tokens=_approx_tokens(prompt),
+            completion_tokens=_approx_tokens(content),
+            total_tokens=_approx_tokens(prompt) + _approx_tokens(content),
+        )
+
+        headers: Dict[str, str] = {}
+        if self.quota is not None:
+            ok, headers = self.quota.admit(usage.total_tokens)
+            if not ok:
+                self._fail(429, "Rate limit reached (fake quota)", headers)
+        if self.error_rate:
+            with self._lock:
+                failed = self._rng.random() < self.error_rate
+            if failed:
+                self._fail(503, "Service unavailable (fake)")
+
+        with self._lock:
+            self.calls[rec["agent"]] = self.calls.get(rec["agent"], 0) + 1
+            self.completion_tokens[rec["agent"]] = self.completion_tokens.get(rec["agent"], 0) + usage.completion_tokens
+
+        return content, delay, usage, kwargs.get("model", "fake"), headers
+
+    def _fail(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        with self._lock:
+            self.errors[status] = self.errors.get(status, 0) + 1
+        raise FakeAPIError(status, message, headers)
+
+    def _timeout(self, kwargs: Dict[str, Any], delay: float) -> Optional[float]:
+        """Seconds until the call times out, or None if it answers in time."""
+        timeout = kwargs.get("timeout")
+        if not isinstance(timeout, (int, float)):
+            return None
+        if (delay / 3 if kwargs.get("stream") else delay) <= timeout:
+            return None
+        with self._lock:
+            self.timeouts += 1
+        return float(timeout)
+
+    @staticmethod
+    def _response(content: str, usage: Any, model: str) -> Any:
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, finish_reason="stop", message=SimpleNamespace(role="assistant", content=content))],
+            usage=usage,
+        )
+
+    @staticmethod
+    def _chunks(content: str, usage: Any, model: str, include_usage: bool) -> List[Any]:
+        pieces = [content[i : i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)] or [""]
+        chunks = [
+            SimpleNamespace(
+                model=model,
+                choices=[SimpleNamespace(index=0, finish_reason=None, delta=SimpleNamespace(content=piece))],
+                usage=None,
+            )
+            for piece in pieces
+        ]
+        if include_usage:
+            chunks.append(SimpleNamespace(model=model, choices=[], usage=usage))
+        return chunks
+
+    def _complete(self, kwargs: Dict[str, Any], raw: bool = False) -> Any:
+        content, delay, usage, model, headers = self._prepare(kwargs)
+
+        timeout = self._timeout(kwargs, delay)
+        if timeout is not None:
+            time.sleep(timeout)
+            raise APITimeoutError(timeout)
+
+        if kwargs.get("stream"):
+            include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+            result = self._stream(self._chunks(content, usage, model, include_usage), delay)
+        else:
+            time.sleep(delay)
+            result = self._response(content, usage, model)
+        return _Raw(result, headers) if raw else result
+
+    def _stream(self, chunks: List[Any], delay: float) -> Iterator[Any]:
+        # a third of the latency before the first token, the rest spread over the chunks
+        time.sleep(delay / 3)
+        gap = (2 * delay / 3) / len(chunks)
+        for chunk in chunks:
+            yield chunk
+            if chunk.choices:
+                time.sleep(gap)
+
+
+#############################################
+# ASYNC FAKE
+#############################################
+
+class _AsyncFakeCompletions:
+    def __init__(self, owner: "AsyncFakeOpenAI"):
+        self._owner = owner
+        self.with_raw_response = SimpleNamespace(create=self._raw_create)
+
+    async def _raw_create(self, **kwargs: Any) -> Any:
+        return await self._owner._acomplete(kwargs, raw=True)
+
+    async def create(self, **kwargs: Any) -> Any:
+        return await self._owner._acomplete(kwargs)
+
+
+class AsyncFakeOpenAI(FakeOpenAI):
+    """AsyncOpenAI look-alike: same recordings and latency, awaits instead of sleeping."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.chat = SimpleNamespace(completions=_AsyncFakeCompletions(self))
+
+    async def _acomplete(self, kwargs: Dict[str, Any], raw: bool = False) -> Any:
+        content, delay, usage, model, headers = self._prepare(kwargs)
+
+        timeout = self._timeout(kwargs, delay)
+        if timeout is not None:
+            await asyncio.sleep(timeout)
+            raise APITimeoutError(timeout)
+
+        if kwargs.get("stream"):
+            include_usage = bool((kwargs.get("stream_options") or {}).get("include_usage"))
+            result = self._astream(self._chunks(content, usage, model, include_usage), delay)
+        else:
+            await asyncio.sleep(delay)
+            result = self._response(content, usage, model)
+        return _Raw(result, headers) if raw else result
+
+    async def _astream(self, chunks: List[Any], delay: float):
+        await asyncio.sleep(delay / 3)
+        gap = (2 * delay / 3) / len(chunks)
+        for chunk in chunks:
+            yield chunk
+            if chunk.choices:
+                await asyncio.sleep(gap)
+
+
+#############################################
+# LOCAL HTTP STUB (OpenAI-compatible)
+#############################################
+
+def serve(fake: FakeOpenAI, port: int = 8765, host: str = "127.0.0.1"):
+    """Start the stub on a daemon thread; returns the server (call .shutdown())."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            try:
+                raw = fake._complete(body, raw=True)
+            except FakeAPIError as e:
+                payload = json.dumps({"error": {"message": str(e), "type": "fake_error", "code": e.status_code}}).encode("utf-8")
+                self.send_response(e.status_code)
+                for name, value in e.response.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+            result = raw.parse()
+
+            if body.get("stream"):
+                self.send_response(200)
+                for name, value in raw.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for chunk in result:
+                    payload = {
+                        "id": "chatcmpl-fake",
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": chunk.model,
+                        "choices": [
+                            {"index": 0, "delta": {"content": c.delta.content}, "finish_reason": None}
+                            for c in chunk.choices
+                        ],
+                    }
+                    if chunk.usage is not None:
+                        payload["usage"] = vars(chunk.usage)
+                    self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+                return
+
+            payload = json.dumps(
+                {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": result.model,
+                    "choices": [
+                        {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": result.choices[0].message.content}}
+                    ],
+                    "usage": vars(result.usage),
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            for name, value in raw.headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True).start()
+    return server
+
+
+#############################################
+# RECORDING
+#############################################
+
+class RecordingClient:
+    """
+    Wraps a real client; every non-streaming json response whose prompt
+    matches a known recording is kept. save() writes the fixtures format.
+    """
+
+    def __init__(self, client: Any, recordings: Optional[List[Dict[str, Any]]] = None):
+        self._client = client
+        self._recordings = recordings if recordings is not None else load_recordings()
+        self.captured: Dict[str, Dict[str, Any]] = {}
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs: Any) -> Any:
+        resp = self._client.chat.completions.create(**kwargs)
+        if not kwargs.get("stream"):
+            prompt = _prompt_of(kwargs)
+            for rec in self._recordings:
+                if rec["match"] in prompt:
+                    try:
+                        content = json.loads(resp.choices[0].message.content)
+                    except (TypeError, ValueError):
+                        content = resp.choices[0].message.content
+                    self.captured[rec["agent"]] = {"agent": rec["agent"], "match": rec["match"], "content": content}
+                    break
+        return resp
+
+    def save(self, path: Path = FIXTURES) -> None:
+        merged = {r["agent"]: r for r in self._recordings}
+        merged.update(self.captured)
+        data = {"version": 1, "responses": list(merged.values())}
+        Path(path).write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
@@ -1,57 +1,47 @@
 #############################################
-# HireSense – Fit Agent v2.0
+# HireSense – Fit Agent v3.0
 #
 # Computes alignment between:
 #   - Role Reality (expectations)
 #   - Resume Reality (capabilities)
 #
-# Produces:
+# Scores come from the deterministic core in agents/fit_scoring.py:
 #   * skill_match_score
-#   * project_fit
-#   * seniority_fit
-#   * domain_fit
+#   * fit_score_percentage
+#   * fit_summary_category
+#   * score_breakdown (skill / seniority / domain, matched + missing skills)
+#
+# The LLM only writes the qualitative analysis:
+#   * project_fit / seniority_fit / domain_fit / experience_fit
 #   * risks
 #   * strengths
 #   * priority_gaps
-#   * final_fit_category
 #############################################
 
-from typing import Dict, Any, List
-import json
+from typing import Dict, Any, List, Sequence, Union
 from string import Template
-from agents.openai_client import get_client
+from agents.model_router import async_routed_client, route_version, routed_client
+from agents.cache_store import content_hash
+from agents.fit_scoring import FIT_SCORING_VERSION, score_fit
+from agents.prompt_budget import FIT_DROP_ORDER, FIT_PROMPT_BUDGET, compact_json, serialize_for_prompt
+from agents.schemas import FIT_SCHEMA, structured_output, structured_output_async
 
 
 #############################################
-# MAIN FIT AGENT
+# PROMPT
 #############################################
 
-def compute_fit_profile(
-    role_profile: Dict[str, Any],
-    resume_profile: Dict[str, Any],
-) -> Dict[str, Any]:
-
-    client = get_client()
-
-    # --------------------------
-    # PREPARE DATA
-    # --------------------------
-
-    role_json = json.dumps(role_profile, indent=2)
-    resume_json = json.dumps(resume_profile, indent=2)
-
-    # --------------------------
-    # PROMPT
-    # --------------------------
-
-    tmpl = Template(
-        """
+_FIT_TEMPLATE = Template(
+    """
 You are the FIT ANALYSIS ENGINE for HireSense.
 
 Your job:
 - Compare the REAL role expectations (role_profile)
 - With the REAL resume capabilities (resume_profile)
-- Produce a QUANTITATIVE & QUALITATIVE alignment report
+- Produce a QUALITATIVE alignment report
+
+The numeric scores have ALREADY been computed deterministically (below).
+Do not produce or change any scores – explain them.
 
 ========================================
 ROLE PROFILE (REALITY)
@@ -63,12 +53,16 @@ RESUME PROFILE (REALITY)
 ========================================
 $resume_json
 
+========================================
+DETERMINISTIC SCORES (FIXED)
+========================================
+$scores_json
+
 ========================================
 OUTPUT JSON FORMAT (STRICT)
 ========================================
 
 {
-  "skill_match_score": 0,      
   "seniority_fit": "",
   "domain_fit": "",
   "experience_fit": "",
@@ -78,64 +72,131 @@ OUTPUT JSON FORMAT (STRICT)
   "matched_strengths": [],
   "mismatched_risks": [],
   "priority_gaps": [],
-  "missing_role_requirements": [],
-
-  "fit_summary_category": "",  
-  "fit_score_percentage": 0    
+  "missing_role_requirements": []
 }
 
 ========================================
 RULES
 ========================================
 
-- "skill_match_score": 0–100 based only on skill comparison.
 - “seniority_fit”: realistic match based on resume seniority vs role expectations.
 - “domain_fit”: SWE vs DE vs DS vs ML vs Full-Stack vs Backend.
 - “experience_fit”: whether experience level, duration, and impact patterns match expectations.
 - “project_fit”: whether project themes match the job's expectations.
-- "fit_summary_category": one of:
-   "Excellent Fit", "Strong Fit", "Moderate Fit", "Weak Fit", "Misaligned".
-
-- “fit_score_percentage”: an overall normalized fit score (0–100).
+- Use matched_required_skills / missing_required_skills from the scores for strengths and gaps.
 - DO NOT guess missing skills — use only what resume reality shows.
 - DO NOT be friendly (the Friendly Agent handles tone). Be factual.
 """
+)
+
+# Pipeline checkpoints of the fit stage are invalidated whenever the
+# template, the route's models, scoring core or prompt budget change.
+def fit_prompt_version() -> str:
+    return content_hash(route_version("fit"), _FIT_TEMPLATE.template, FIT_SCORING_VERSION, FIT_PROMPT_BUDGET)
+
+
+#############################################
+# MAIN FIT AGENT
+#############################################
+
+def _skills_list(extracted_skills: Union[str, Sequence[str]]) -> List[str]:
+    if isinstance(extracted_skills, str):
+        return [s.strip() for s in extracted_skills.split(",") if s.strip()]
+    return list(extracted_skills or [])
+
+
+def _fit_scores(
+    role_profile: Dict[str, Any],
+    resume_profile: Dict[str, Any],
+    role_title: str,
+    extracted_skills: Union[str, Sequence[str]],
+) -> Dict[str, Any]:
+    return score_fit(
+        role_profile,
+        resume_profile,
+        role_title=role_title,
+        extracted_skills=_skills_list(extracted_skills),
     )
 
-    prompt = tmpl.substitute(
-        role_json=role_json,
-        resume_json=resume_json
+
+def _fit_request(
+    role_profile: Dict[str, Any],
+    resume_profile: Dict[str, Any],
+    scores: Dict[str, Any],
+) -> Dict[str, Any]:
+    """chat.completions.create() kwargs – shared by the sync and async agent."""
+
+    # compact JSON, trimmed to the stage token budget if needed;
+    # the scores are small and always sent whole
+    parts = serialize_for_prompt(
+        "fit",
+        {"role": role_profile, "resume": resume_profile},
+        budget=FIT_PROMPT_BUDGET,
+        drop_order=FIT_DROP_ORDER,
     )
 
-    # --------------------------
-    # CALL LLM
-    # --------------------------
+    prompt = _FIT_TEMPLATE.substitute(
+        role_json=parts["role"],
+        resume_json=parts["resume"],
+        scores_json=compact_json(scores),
+    )
 
-    response = client.chat.completions.create(
-        model="gpt-4.1",
+    return dict(
         messages=[{"role": "user", "content": prompt}],
         temperature=0.0,
         response_format={"type": "json_object"},
     )
 
-    raw = response.choices[0].message.content
-
-    try:
-        data = json.loads(raw)
-    except Exception:
-        data = {
-            "skill_match_score": 0,
-            "seniority_fit": "",
-            "domain_fit": "",
-            "experience_fit": "",
-            "project_fit": "",
-            "overall_alignment_notes": [],
-            "matched_strengths": [],
-            "mismatched_risks": [],
-            "priority_gaps": [],
-            "missing_role_requirements": [],
-            "fit_summary_category": "Unknown",
-            "fit_score_percentage": 0
-        }
 
+def compute_fit_profile(
+    role_profile: Dict[str, Any],
+    resume_profile: Dict[str, Any],
+    role_title: str = "",
+    extracted_skills: Union[str, Sequence[str]] = (),
+) -> Dict[str, Any]:
+
+    client = routed_client("fit")
+
+    # --------------------------
+    # DETERMINISTIC SCORES
+    # --------------------------
+
+    scores = _fit_scores(role_profile, resume_profile, role_title, extracted_skills)
+
+    # --------------------------
+    # CALL LLM (qualitative notes only)
+    # --------------------------
+
+    request = _fit_request(role_profile, resume_profile, scores)
+    response = client.chat.completions.create(**request)
+
+    data, _ = structured_output(client, request, response.choices[0].message.content, FIT_SCHEMA, "fit")
+    return _with_scores(data, scores)
+
+
+async def compute_fit_profile_async(
+    role_profile: Dict[str, Any],
+    resume_profile: Dict[str, Any],
+    role_title: str = "",
+    extracted_skills: Union[str, Sequence[str]] = (),
+) -> Dict[str, Any]:
+    """compute_fit_profile() on the event loop's shared AsyncOpenAI client."""
+
+    client = async_routed_client("fit")
+
+    scores = _fit_scores(role_profile, resume_profile, role_title, extracted_skills)
+
+    request = _fit_request(role_profile, resume_profile, scores)
+    response = await client.chat.completions.create(**request)
+
+    data, _ = await structured_output_async(client, request, response.choices[0].message.content, FIT_SCHEMA, "fit")
+    return _with_scores(data, scores)
+
+
+def _with_scores(data: Dict[str, Any], scores: Dict[str, Any]) -> Dict[str, Any]:
+    """Deterministic numbers always win over anything the LLM emitted."""
+    data["skill_match_score"] = scores["skill_match_score"]
+    data["fit_score_percentage"] = scores["fit_score_percentage"]
+    data["fit_summary_category"] = scores["fit_summary_category"]
+    data["score_breakdown"] = scores
     return data
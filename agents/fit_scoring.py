@@ -0,0 +1,317 @@
+# agents/fit_scoring.py
+#
+# Deterministic fit scoring core (no LLM).
+#
+#   skill match – role skills vs resume skills, mapped onto the fixed
+#                 skill-lexicon vocabulary and packed into bit-vectors
+#   seniority   – ordinal distance between role and resume levels
+#   domain      – affinity between role domain and resume domain
+#
+# Scoring N resumes against one role is a handful of NumPy ops over an
+# (N x vocab_bytes) uint8 matrix, so batch mode never loops in Python
+# over the score math.
+#
+# Profiles are read through agents/profiles.py (dicts or RoleProfile /
+# ResumeProfile), so older key names are mapped there, not probed here.
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from agents.profiles import ResumeProfile, RoleProfile
+from agents.skill_lexicon import SKILL_LEXICON, get_skill_matcher
+
+
+FIT_SCORING_VERSION = "fit-scoring-3"
+
+# overall = weighted mix of the three dimensions (0..1 each)
+WEIGHTS = {"skill": 0.6, "seniority": 0.2, "domain": 0.2}
+
+# nice-to-have skills count this much relative to required ones
+NICE_TO_HAVE_WEIGHT = 0.5
+
+# used when a dimension can't be determined from the profiles
+NEUTRAL = 0.5
+
+CATEGORY_THRESHOLDS = [
+    (85.0, "Excellent Fit"),
+    (70.0, "Strong Fit"),
+    (55.0, "Moderate Fit"),
+    (35.0, "Weak Fit"),
+    (0.0, "Misaligned"),
+]
+
+
+#############################################
+# SKILL VOCABULARY (bit-vectors)
+#############################################
+
+SKILL_VOCAB: List[str] = sorted(SKILL_LEXICON)
+SKILL_INDEX: Dict[str, int] = {s: i for i, s in enumerate(SKILL_VOCAB)}
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _texts(value: Any) -> Iterable[str]:
+    """Flatten strings out of nested lists/dicts from LLM profiles."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _texts(v)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            yield from _texts(v)
+
+
+def skills_to_bits(skills: Iterable[str]) -> np.ndarray:
+    """Canonical skill names -> packed uint8 bit-vector over SKILL_VOCAB."""
+    dense = np.zeros(len(SKILL_VOCAB), dtype=bool)
+    for s in skills:
+        i = SKILL_INDEX.get(s)
+        if i is not None:
+            dense[i] = True
+    return np.packbits(dense)
+
+
+def bits_to_skills(bits: np.ndarray) -> List[str]:
+    dense = np.unpackbits(bits)[: len(SKILL_VOCAB)]
+    return [SKILL_VOCAB[i] for i in np.flatnonzero(dense)]
+
+
+def _canonical_from(values: Iterable[Any]) -> List[str]:
+    matcher = get_skill_matcher()
+    out: List[str] = []
+    for text in _texts(list(values)):
+        known = matcher.canonicalize(text)
+        if known:
+            out.append(known)
+        else:
+            out.extend(matcher.canonical_skills(text))
+    return out
+
+
+def role_skill_bits(role_profile: Union[Dict[str, Any], RoleProfile]):
+    role = RoleProfile.from_dict(role_profile)
+    required = _canonical_from([role.skills_most_often_required])
+    nice = _canonical_from([role.skills_nice_to_have])
+    return skills_to_bits(required), skills_to_bits(nice)
+
+
+def resume_skill_bits(resume_profile: Union[Dict[str, Any], ResumeProfile], extracted_skills: Sequence[str] = ()) -> np.ndarray:
+    p = ResumeProfile.from_dict(resume_profile)
+    fields = [
+        p.skills_canonical,
+        p.skills_raw_exact,
+        p.tech_stack_clusters,
+        p.core_strengths_raw,
+        p.project_signals,
+        list(extracted_skills),
+    ]
+    return skills_to_bits(_canonical_from(fields))
+
+
+#############################################
+# SENIORITY
+#############################################
+
+# (keyword, level) – whole words only ("lead" is not in "leadership",
+# "intern" not in "international"), checked in order, first hit wins.
+# Explicit level phrases come before the generic words they contain or
+# sit next to ("mid-level engineer with team lead experience"). A space
+# in a keyword matches a space or a hyphen.
+_SENIORITY_KEYWORDS = [
+    ("mid level", 3), ("mid senior", 4),
+    ("new grad", 2), ("entry level", 2),
+    ("principal", 5), ("staff", 5), ("distinguished", 5),
+    ("senior", 4), ("sr", 4), ("lead", 4),
+    ("intermediate", 3), ("mid", 3),
+    ("junior", 2), ("jr", 2), ("entry", 2), ("graduate", 2),
+    ("fresher", 1), ("student", 1), ("intern", 1), ("internship", 1),
+]
+_SENIORITY_PATTERNS = [
+    (re.compile(r"\b" + re.escape(kw).replace(r"\ ", r"[\s-]") + r"\b"), level) for kw, level in _SENIORITY_KEYWORDS
+]
+_MAX_LEVEL_GAP = 3.0
+
+
+def seniority_level(text: str) -> Optional[int]:
+    text = (text or "").lower()
+    for pattern, level in _SENIORITY_PATTERNS:
+        if pattern.search(text):
+            return level
+    return None
+
+
+#############################################
+# DOMAIN
+#############################################
+
+DOMAINS = ["swe", "backend", "frontend", "fullstack", "data_eng", "data_sci_ml", "analytics", "devops", "other"]
+_DOMAIN_INDEX = {d: i for i, d in enumerate(DOMAINS)}
+
+# (keyword, domain) – checked in order, first hit wins
+_DOMAIN_KEYWORDS = [
+    ("full-stack", "fullstack"), ("full stack", "fullstack"), ("fullstack", "fullstack"),
+    ("front-end", "frontend"), ("frontend", "frontend"), ("front end", "frontend"), ("ui engineer", "frontend"),
+    ("back-end", "backend"), ("backend", "backend"), ("back end", "backend"),
+    ("data engineer", "data_eng"), ("data engineering", "data_eng"), ("etl", "data_eng"),
+    ("machine learning", "data_sci_ml"), ("ml", "data_sci_ml"), ("data scien", "data_sci_ml"), ("ai", "data_sci_ml"),
+    ("analytics", "analytics"), ("analyst", "analytics"), ("bi", "analytics"),
+    ("devops", "devops"), ("sre", "devops"), ("infra", "devops"), ("platform engineer", "devops"),
+    ("software", "swe"), ("swe", "swe"), ("developer", "swe"), ("engineer", "swe"), ("sde", "swe"),
+    ("product", "other"), ("business", "other"),
+]
+
+# symmetric affinity between domains (1 = same, 0 = unrelated)
+_AFFINITY_PAIRS = {
+    ("swe", "backend"): 0.9, ("swe", "frontend"): 0.8, ("swe", "fullstack"): 0.9,
+    ("swe", "data_eng"): 0.6, ("swe", "data_sci_ml"): 0.4, ("swe", "devops"): 0.6,
+    ("swe", "analytics"): 0.3,
+    ("backend", "fullstack"): 0.8, ("backend", "frontend"): 0.4, ("backend", "data_eng"): 0.6,
+    ("backend", "devops"): 0.6, ("backend", "data_sci_ml"): 0.3,
+    ("frontend", "fullstack"): 0.8,
+    ("fullstack", "data_eng"): 0.4, ("fullstack", "devops"): 0.4,
+    ("data_eng", "data_sci_ml"): 0.6, ("data_eng", "analytics"): 0.6, ("data_eng", "devops"): 0.5,
+    ("data_sci_ml", "analytics"): 0.7,
+}
+
+DOMAIN_AFFINITY = np.eye(len(DOMAINS), dtype=np.float32)
+for (a, b), v in _AFFINITY_PAIRS.items():
+    DOMAIN_AFFINITY[_DOMAIN_INDEX[a], _DOMAIN_INDEX[b]] = v
+    DOMAIN_AFFINITY[_DOMAIN_INDEX[b], _DOMAIN_INDEX[a]] = v
+
+
+def domain_of(text: str) -> Optional[str]:
+    text = " " + (text or "").lower().replace("/", " ").replace(",", " ") + " "
+    for kw, domain in _DOMAIN_KEYWORDS:
+        # pad short keywords so "ai" doesn't match inside "maintain"
+        needle = f" {kw} " if len(kw) <= 3 else kw
+        if needle in text:
+            return domain
+    return None
+
+
+#############################################
+# SCORING
+#############################################
+
+def category_for(score: float) -> str:
+    for threshold, name in CATEGORY_THRESHOLDS:
+        if score >= threshold:
+            return name
+    return CATEGORY_THRESHOLDS[-1][1]
+
+
+def score_batch(
+    role_profile: Union[Dict[str, Any], RoleProfile],
+    resume_profiles: Sequence[Union[Dict[str, Any], ResumeProfile]],
+    role_title: str = "",
+    extracted_skills: Optional[Sequence[Sequence[str]]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Score N resume profiles against one role profile.
+
+    Returns float32 arrays of length N (0..100): skill, seniority,
+    domain, overall – plus the packed resume skill matrix (N x bytes)
+    so callers can recover matched / missing skills.
+    """
+    role = RoleProfile.from_dict(role_profile)
+    profiles = [ResumeProfile.from_dict(p) for p in resume_profiles]
+    n = len(profiles)
+    extracted_skills = extracted_skills or [()] * n
+
+    req_bits, nice_bits = role_skill_bits(role)
+    resume_bits = (
+        np.stack([resume_skill_bits(p, s) for p, s in zip(profiles, extracted_skills)])
+        if n
+        else np.zeros((0, len(req_bits)), dtype=np.uint8)
+    )
+
+    # ---- skill overlap: popcount(resume & role) for all rows at once ----
+    n_req = int(_POPCOUNT[req_bits].sum())
+    n_nice = int(_POPCOUNT[nice_bits].sum())
+    hit_req = _POPCOUNT[resume_bits & req_bits].sum(axis=1, dtype=np.float32)
+    hit_nice = _POPCOUNT[resume_bits & nice_bits].sum(axis=1, dtype=np.float32)
+    denom = n_req + NICE_TO_HAVE_WEIGHT * n_nice
+    if denom > 0:
+        skill = (hit_req + NICE_TO_HAVE_WEIGHT * hit_nice) / denom
+    else:
+        skill = np.full(n, NEUTRAL, dtype=np.float32)
+
+    # ---- seniority distance ----
+    role_level = seniority_level(role.seniority_pattern) or seniority_level(role_title)
+    resume_levels = np.array(
+        [seniority_level(p.seniority_signal) or 0 for p in profiles],
+        dtype=np.float32,
+    )
+    if role_level is None:
+        seniority = np.full(n, NEUTRAL, dtype=np.float32)
+    else:
+        gap = role_level - resume_levels
+        # being under-levelled hurts more than being over-levelled
+        penalty = np.where(gap > 0, gap, -gap * 0.5) / _MAX_LEVEL_GAP
+        seniority = np.clip(1.0 - penalty, 0.0, 1.0).astype(np.float32)
+        seniority[resume_levels == 0] = NEUTRAL
+
+    # ---- domain affinity ----
+    role_domain = domain_of(role_title) or domain_of(" ".join(_texts(role.skills_most_often_required)))
+    resume_domains = np.array(
+        [_DOMAIN_INDEX.get(domain_of(p.resume_domain) or "", -1) for p in profiles],
+        dtype=np.int64,
+    )
+    if role_domain is None:
+        domain = np.full(n, NEUTRAL, dtype=np.float32)
+    else:
+        row = DOMAIN_AFFINITY[_DOMAIN_INDEX[role_domain]]
+        domain = np.where(resume_domains >= 0, row[np.clip(resume_domains, 0, None)], NEUTRAL).astype(np.float32)
+
+    overall = WEIGHTS["skill"] * skill + WEIGHTS["seniority"] * seniority + WEIGHTS["domain"] * domain
+
+    return {
+        "skill": np.round(skill * 100, 1),
+        "seniority": np.round(seniority * 100, 1),
+        "domain": np.round(domain * 100, 1),
+        "overall": np.round(overall * 100, 1),
+        "resume_bits": resume_bits,
+        "required_bits": req_bits,
+        "nice_bits": nice_bits,
+    }
+
+
+def _fit_result(s: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+    resume_bits = s["resume_bits"][i]
+    overall = round(float(s["overall"][i]), 1)
+    return {
+        "skill_match_score": round(float(s["skill"][i]), 1),
+        "seniority_score": round(float(s["seniority"][i]), 1),
+        "domain_score": round(float(s["domain"][i]), 1),
+        "fit_score_percentage": overall,
+        "fit_summary_category": category_for(overall),
+        "matched_required_skills": bits_to_skills(resume_bits & s["required_bits"]),
+        "missing_required_skills": bits_to_skills(~resume_bits & s["required_bits"]),
+        "matched_nice_to_have_skills": bits_to_skills(resume_bits & s["nice_bits"]),
+        "scoring_version": FIT_SCORING_VERSION,
+    }
+
+
+def score_fits(
+    role_profile: Union[Dict[str, Any], RoleProfile],
+    resume_profiles: Sequence[Union[Dict[str, Any], ResumeProfile]],
+    role_title: str = "",
+    extracted_skills: Optional[Sequence[Sequence[str]]] = None,
+) -> List[Dict[str, Any]]:
+    """score_fit() for N resumes with one score_batch() call; JSON-ready."""
+    s = score_batch(role_profile, resume_profiles, role_title, extracted_skills)
+    return [_fit_result(s, i) for i in range(len(resume_profiles))]
+
+
+def score_fit(
+    role_profile: Union[Dict[str, Any], RoleProfile],
+    resume_profile: Union[Dict[str, Any], ResumeProfile],
+    role_title: str = "",
+    extracted_skills: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """Single-resume convenience wrapper; JSON-ready."""
+    return score_fits(role_profile, [resume_profile], role_title, [extracted_skills])[0]
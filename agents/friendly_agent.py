@@ -1,40 +1,74 @@
 #############################################
-# HireSense – Friendly Agent v3.0
+# HireSense – Friendly Agent v4.0
+#
+# The report is written as independent sections, each its own (smaller)
+# LLM call, run concurrently and merged into one report dict:
+#
+#   summaries        – intro / summary / role, strengths, gaps, fit prose
+#   action_plan      – quick wins, 4-week plan, resume fixes, projects
+#   round_deep_dive  – round-by-round breakdown
+#
+# Every section only sees the profile fields it needs and is cached by
+# a hash of exactly those inputs, so e.g. new round data for a role
+# regenerates round_deep_dive and leaves the other sections cached.
+#
+# round_deep_dive depends on the role profile only: it is generated once
+# per role profile version (single-flight) and shared by every candidate.
+# What is candidate-specific about it is a short tip layer (round_tips,
+# one small call per resume) spliced into each round's "tips".
 #############################################
 
-from typing import Dict, Any
-import json
+from typing import Callable, Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
+import copy
+import time
+import queue
+import asyncio
+import weakref
+import contextvars
 from string import Template
-from agents.openai_client import get_client
+from concurrent.futures import ThreadPoolExecutor
+from agents.model_router import async_routed_client, route_version, routed_client
+from agents.cache_store import KeyLocks, LRUDiskCache, content_hash, normalize_text
+from agents.json_utils import parse_partial_json
+from agents.prompt_budget import FRIENDLY_DROP_ORDER, FRIENDLY_PROMPT_BUDGET, serialize_for_prompt
+from agents.schemas import (
+    ACTION_PLAN_SCHEMA,
+    ROUND_DEEP_DIVE_SCHEMA,
+    ROUND_TIPS_SCHEMA,
+    SUMMARIES_SCHEMA,
+    Schema,
+    StructuredResult,
+    structured_output,
+    structured_output_async,
+)
 
 
-def build_friendly_report(
-    company: str,
-    role: str,
-    resume_text: str,
-    role_profile: Dict[str, Any],
-    resume_profile: Dict[str, Any],
-    fit_profile: Dict[str, Any],
-    user_review_text: str = "",
-    user_insight_text: str = "",
-) -> Dict[str, Any]:
+#############################################
+# PROMPTS
+#############################################
 
-    client = get_client()
+_TONE = """
+- Match the tone of a supportive career mentor
+- Based ONLY on real data provided (NEVER hallucinate)
+"""
 
-    role_json = json.dumps(role_profile, indent=2)
-    resume_json = json.dumps(resume_profile, indent=2)
-    fit_json = json.dumps(fit_profile, indent=2)
+_DO_NOT = """
+DO NOT:
+- Output raw JSON dumps inside any field.
+- Copy large chunks of the profiles verbatim.
+- Invent technologies not seen in role_profile or resume_profile.
+"""
 
-    tmpl = Template(
-        """
-You are the FRIENDLY OUTPUT ENGINE for HireSense.
+_SUMMARIES_TEMPLATE = Template(
+    """
+You are the FRIENDLY OUTPUT ENGINE – SUMMARIES for HireSense.
 
 Your job:
-- Take all raw role, resume, and fit data
-- Produce a HUMAN, FRIENDLY, EASY-TO-READ analysis
-- Match the tone of a supportive career mentor
-- Based ONLY on real data provided (NEVER hallucinate)
-
+- Take the raw role, resume, and fit data
+- Write the prose part of a HUMAN, FRIENDLY, EASY-TO-READ analysis
+  (the action plan and round-by-round breakdown are written separately)"""
+    + _TONE
+    + """
 ========================================
 COMPANY: $company
 ROLE: $role
@@ -66,25 +100,7 @@ Return ONLY valid JSON:
   "role_expectations_explained": "",
   "resume_strengths_explained": "",
   "resume_gaps_explained": "",
-  "fit_explained": "",
-  "action_plan": {
-    "quick_wins": [],
-    "4_week_plan": [],
-    "resume_fixes": [],
-    "project_ideas": []
-  },
-  "round_deep_dive": [
-    {
-      "round_name": "",
-      "round_type": "",
-      "difficulty": "",
-      "what_they_look_for": [],
-      "common_concepts": [],
-      "question_patterns": [],
-      "example_question_themes": [],
-      "tips": []
-    }
-  ]
+  "fit_explained": ""
 }
 
 ========================================
@@ -109,7 +125,7 @@ ROLE EXPECTATIONS:
   - Skills expected
   - Behavioral expectations
   - Seniority expectations
-- Use info from role_profile: rounds, skills_most_often_required, projects_they_like, difficulty, etc.
+- Use info from role_profile: round_count, skills_most_often_required, projects_they_like, difficulty, etc.
 
 RESUME STRENGTHS:
 - Focus on positive matches:
@@ -133,8 +149,53 @@ FIT EXPLAINED:
   - Major risks
   - Overall conclusion
 - Reference fit_score_percentage and fit_summary_category, but do NOT dump numbers only – explain what they mean.
+"""
+    + _DO_NOT
+)
+
+_ACTION_PLAN_TEMPLATE = Template(
+    """
+You are the FRIENDLY OUTPUT ENGINE – ACTION PLAN for HireSense.
+
+Your job:
+- Turn the candidate's gaps against this role into a concrete, realistic plan"""
+    + _TONE
+    + """
+========================================
+COMPANY: $company
+ROLE: $role
+========================================
+
+ROLE_PROFILE (skills and projects, RAW JSON):
+$role_json
+
+RESUME_PROFILE (RAW JSON):
+$resume_json
+
+FIT_PROFILE (gaps and risks, RAW JSON):
+$fit_json
+
+USER INTERVIEW REVIEW (optional):
+$user_review_text
+
+========================================
+OUTPUT FORMAT (STRICT)
+========================================
+Return ONLY valid JSON:
+
+{
+  "action_plan": {
+    "quick_wins": [],
+    "4_week_plan": [],
+    "resume_fixes": [],
+    "project_ideas": []
+  }
+}
+
+========================================
+CONTENT RULES
+========================================
 
-ACTION PLAN:
 - quick_wins:
   - Things they can realistically do in 1–7 days.
 - 4_week_plan:
@@ -143,8 +204,53 @@ ACTION PLAN:
   - Specific bullet-level ideas to rewrite or add to the resume.
 - project_ideas:
   - 3–6 project ideas aligned with what this company likes to see for this role.
+"""
+    + _DO_NOT
+)
+
+_ROUND_DEEP_DIVE_TEMPLATE = Template(
+    """
+You are the FRIENDLY OUTPUT ENGINE – ROUND DEEP DIVE for HireSense.
+
+Your job:
+- Explain the MOST LIKELY interview rounds for this company + role"""
+    + _TONE
+    + """
+========================================
+COMPANY: $company
+ROLE: $role
+========================================
+
+ROLE_PROFILE (interview data, RAW JSON):
+$role_json
+
+USER INTERVIEW REVIEW (optional):
+$user_review_text
+
+========================================
+OUTPUT FORMAT (STRICT)
+========================================
+Return ONLY valid JSON:
+
+{
+  "round_deep_dive": [
+    {
+      "round_name": "",
+      "round_type": "",
+      "difficulty": "",
+      "what_they_look_for": [],
+      "common_concepts": [],
+      "question_patterns": [],
+      "example_question_themes": [],
+      "tips": []
+    }
+  ]
+}
+
+========================================
+CONTENT RULES
+========================================
 
-ROUND_DEEP_DIVE:
 - Build a breakdown of the MOST LIKELY interview rounds based on role_profile and public patterns:
   - examples: "Online Assessment (DSA)", "Technical Screening – Coding", "Onsite – System Design", "Behavioral / Leadership".
 - For each round:
@@ -159,57 +265,605 @@ ROUND_DEEP_DIVE:
        "Design an API for a ride-sharing app", "Compute metrics from event logs", "Debug a flaky data pipeline".
   - tips: concrete advice like:
        "Speak your thought process", "Clarify constraints before coding", "Use STAR for behavioral answers".
+"""
+    + _DO_NOT
+)
 
-DO NOT:
-- Output raw JSON dumps inside any field.
-- Copy large chunks of role_json or resume_json verbatim.
-- Invent technologies not seen in role_profile or resume_profile.
+_ROUND_TIPS_TEMPLATE = Template(
+    """
+You are the FRIENDLY OUTPUT ENGINE – ROUND TIPS for HireSense.
+
+Your job:
+- The interview rounds below were already explained in general terms
+- Add a FEW tips per round that are specific to THIS candidate"""
+    + _TONE
+    + """
+========================================
+COMPANY: $company
+ROLE: $role
+========================================
+
+ROUNDS (JSON):
+$rounds_json
+
+RESUME_PROFILE (RAW JSON):
+$resume_json
+
+FIT_PROFILE (strengths and gaps, RAW JSON):
+$fit_json
+
+========================================
+OUTPUT FORMAT (STRICT)
+========================================
+Return ONLY valid JSON:
+
+{
+  "round_tips": [
+    {
+      "round_name": "",
+      "tips": []
+    }
+  ]
+}
+
+========================================
+CONTENT RULES
+========================================
+
+- One entry per round, with round_name copied exactly from ROUNDS.
+- 1–2 tips per round, one sentence each, tied to the candidate's own
+  strengths, projects or gaps (e.g. "Use your payments reconciliation
+  service as the example for the scaling discussion").
+- Skip generic advice – that is already covered.
 """
+    + _DO_NOT
+)
+
+
+#############################################
+# SECTIONS
+#############################################
+
+class ReportSection(NamedTuple):
+    name: str
+    template: Template
+    # profile name -> fields sent to this section (None = whole profile)
+    parts: Dict[str, Optional[Tuple[str, ...]]]
+    user_texts: Tuple[str, ...]
+    # output fields and their types; `defaults` is what the report shows
+    # for a field that is still invalid after the re-ask
+    schema: Schema
+    defaults: Dict[str, Any]
+    # same for every candidate: single-flight, one cached copy per input version
+    shared: bool = False
+
+
+# "round data" (rounds, question patterns) only feeds round_deep_dive
+SECTIONS: List[ReportSection] = [
+    ReportSection(
+        "summaries",
+        _SUMMARIES_TEMPLATE,
+        {
+            "role": (
+                "round_count",
+                "difficulty",
+                "skills_most_often_required",
+                "skills_nice_to_have",
+                "common_interview_themes",
+                "projects_they_like",
+                "education_or_experience_expectations",
+                "seniority_pattern",
+                "public_interview_summary",
+            ),
+            "resume": None,
+            "fit": None,
+        },
+        ("user_review_text", "user_insight_text"),
+        SUMMARIES_SCHEMA,
+        {
+            "intro_message": "Thank you for choosing HireSense!",
+            "friendly_summary": "",
+            "role_expectations_explained": "",
+            "resume_strengths_explained": "",
+            "resume_gaps_explained": "",
+            "fit_explained": "",
+        },
+    ),
+    ReportSection(
+        "action_plan",
+        _ACTION_PLAN_TEMPLATE,
+        {
+            "role": (
+                "skills_most_often_required",
+                "skills_nice_to_have",
+                "projects_they_like",
+                "common_interview_themes",
+                "seniority_pattern",
+            ),
+            "resume": None,
+            "fit": (
+                "fit_score_percentage",
+                "fit_summary_category",
+                "score_breakdown",
+                "matched_strengths",
+                "mismatched_risks",
+                "priority_gaps",
+                "missing_role_requirements",
+            ),
+        },
+        ("user_review_text",),
+        ACTION_PLAN_SCHEMA,
+        {
+            "action_plan": {
+                "quick_wins": [],
+                "4_week_plan": [],
+                "resume_fixes": [],
+                "project_ideas": [],
+            },
+        },
+    ),
+    ReportSection(
+        "round_deep_dive",
+        _ROUND_DEEP_DIVE_TEMPLATE,
+        {
+            "role": (
+                "rounds",
+                "round_count",
+                "difficulty",
+                "common_interview_themes",
+                "common_questions_patterns",
+                "skills_most_often_required",
+                "seniority_pattern",
+            ),
+        },
+        ("user_review_text",),
+        ROUND_DEEP_DIVE_SCHEMA,
+        {"round_deep_dive": []},
+        shared=True,
+    ),
+]
+
+# per-candidate layer on top of round_deep_dive; not a report field itself
+ROUND_TIPS = ReportSection(
+    "round_tips",
+    _ROUND_TIPS_TEMPLATE,
+    {
+        "rounds": None,
+        "resume": (
+            "core_strengths_raw",
+            "core_weaknesses_raw",
+            "tech_stack_clusters",
+            "project_signals",
+            "seniority_signal",
+        ),
+        "fit": ("score_breakdown", "matched_strengths", "mismatched_risks", "priority_gaps"),
+    },
+    (),
+    ROUND_TIPS_SCHEMA,
+    {"round_tips": []},
+)
+
+
+def section_route(section: ReportSection) -> str:
+    """Model route (agents/model_router.py) of a section's LLM call."""
+    return f"friendly.{section.name}"
+
+
+# Cached sections are invalidated whenever their template, their route's
+# models or the prompt budget change. Computed per key: routes can change
+# at runtime (configure_routing).
+def section_version(section: ReportSection) -> str:
+    return content_hash(route_version(section_route(section)), section.template.template, FRIENDLY_PROMPT_BUDGET)
+
+
+# Pipeline checkpoints of the friendly stage are invalidated whenever any
+# section changes.
+def friendly_prompt_version() -> str:
+    return content_hash(*(section_version(s) for s in SECTIONS + [ROUND_TIPS]))
+
+_section_cache = LRUDiskCache("friendly_section", max_items=512)
+_key_locks = KeyLocks()
+# async single-flight for shared sections: per event loop, cache key -> task
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class _PlannedSection(NamedTuple):
+    section: ReportSection
+    inputs: Dict[str, Any]
+    key: str
+    cached: Optional[Dict[str, Any]]
+
+
+def _section_inputs(
+    section: ReportSection,
+    company: str,
+    role: str,
+    profiles: Dict[str, Dict[str, Any]],
+    user_texts: Dict[str, str],
+) -> Dict[str, Any]:
+    """Everything the section's prompt is built from – also its cache key."""
+    inputs: Dict[str, Any] = {"company": company, "role": role}
+    for name, fields in section.parts.items():
+        profile = profiles.get(name) or {}
+        inputs[name] = dict(profile) if fields is None else {f: profile[f] for f in fields if f in profile}
+    for name in section.user_texts:
+        inputs[name] = user_texts.get(name) or ""
+    return inputs
+
+
+def _plan_section(
+    section: ReportSection,
+    company: str,
+    role: str,
+    profiles: Dict[str, Dict[str, Any]],
+    user_texts: Dict[str, str],
+) -> _PlannedSection:
+    inputs = _section_inputs(section, company, role, profiles, user_texts)
+    # "Google" and "google " share one round_deep_dive
+    key = content_hash(
+        section_version(section),
+        section.name,
+        {**inputs, "company": normalize_text(company), "role": normalize_text(role)},
     )
+    cached = _section_cache.get(key)
+    return _PlannedSection(section, inputs, key, None if cached is None else copy.deepcopy(cached))
+
+
+def _plan(
+    company: str,
+    role: str,
+    profiles: Dict[str, Dict[str, Any]],
+    user_review_text: str,
+    user_insight_text: str,
+) -> List[_PlannedSection]:
+    user_texts = {"user_review_text": user_review_text, "user_insight_text": user_insight_text}
+    return [_plan_section(section, company, role, profiles, user_texts) for section in SECTIONS]
 
-    prompt = tmpl.substitute(
-        company=company,
-        role=role,
-        role_json=role_json,
-        resume_json=resume_json,
-        fit_json=fit_json,
-        user_review_text=user_review_text.replace('"', "'"),
-        user_insight_text=user_insight_text.replace('"', "'"),
+
+def _plan_tips(
+    deep_dive: Dict[str, Any],
+    company: str,
+    role: str,
+    profiles: Dict[str, Dict[str, Any]],
+) -> Optional[_PlannedSection]:
+    rounds = [
+        {"round_name": r.get("round_name", ""), "round_type": r.get("round_type", "")}
+        for r in deep_dive.get("round_deep_dive") or []
+        if isinstance(r, dict)
+    ]
+    if not rounds:
+        return None
+    return _plan_section(ROUND_TIPS, company, role, {**profiles, "rounds": {"rounds": rounds}}, {})
+
+
+def _splice_tips(deep_dive: Dict[str, Any], tips: Dict[str, Any]) -> StructuredResult:
+    """Copy of the shared deep dive with the candidate's tips first in each round."""
+    round_tips = [t for t in tips.get("round_tips") or [] if isinstance(t, dict)]
+    by_name = {t.get("round_name"): t.get("tips") or [] for t in round_tips}
+
+    rounds = []
+    for i, r in enumerate(deep_dive.get("round_deep_dive") or []):
+        if not isinstance(r, dict):
+            rounds.append(r)
+            continue
+        mine = by_name.get(r.get("round_name"))
+        if mine is None:
+            # renamed by the model – fall back to position
+            mine = round_tips[i].get("tips") or [] if i < len(round_tips) else []
+        general = [t for t in r.get("tips") or [] if t not in mine]
+        rounds.append({**r, "tips": list(mine) + general})
+    return StructuredResult({"round_deep_dive": rounds}, _failed(deep_dive) + _failed(tips))
+
+
+def _section_prompt(section: ReportSection, inputs: Dict[str, Any]) -> str:
+    parts = serialize_for_prompt(
+        "friendly" if section.name == "summaries" else f"friendly_{section.name}",
+        {name: inputs[name] for name in section.parts},
+        budget=FRIENDLY_PROMPT_BUDGET,
+        drop_order=FRIENDLY_DROP_ORDER,
     )
 
-    resp = client.chat.completions.create(
-        model="gpt-4.1",
+    values = {f"{name}_json": text for name, text in parts.items()}
+    for name in section.user_texts:
+        values[name] = inputs[name].replace('"', "'")
+
+    return section.template.substitute(company=inputs["company"], role=inputs["role"], **values)
+
+
+def _friendly_request(prompt: str, stream: bool = False) -> Dict[str, Any]:
+    request = dict(
         messages=[{"role": "user", "content": prompt}],
         temperature=0.25,
         response_format={"type": "json_object"},
     )
+    if stream:
+        request["stream"] = True
+    return request
 
-    raw = resp.choices[0].message.content
 
-    try:
-        data = json.loads(raw)
-    except Exception:
-        data = {}
-
-    # defaults
-    defaults = {
-        "intro_message": "Thank you for choosing HireSense!",
-        "friendly_summary": "",
-        "role_expectations_explained": "",
-        "resume_strengths_explained": "",
-        "resume_gaps_explained": "",
-        "fit_explained": "",
-        "action_plan": {
-            "quick_wins": [],
-            "4_week_plan": [],
-            "resume_fixes": [],
-            "project_ideas": [],
-        },
-        "round_deep_dive": [],
-    }
+def _failed(result: Dict[str, Any]) -> List[str]:
+    return list(getattr(result, "failed", ()))
+
+
+def _store(planned: _PlannedSection, data: Dict[str, Any], failed: List[str]) -> StructuredResult:
+    """The section's fields from a validated response; cached if complete."""
+    section = planned.section
+    result = StructuredResult(
+        {k: copy.deepcopy(section.defaults[k]) if k in failed else data[k] for k in section.schema}, failed
+    )
+    # a response with defaulted or only empty fields is not pinned – the next report retries it
+    if not failed and any(result.values()):
+        # stored as its own copy: callers edit the report they get back
+        _section_cache.set(planned.key, copy.deepcopy(result))
+    return result
+
+
+def _merge(sections: Dict[str, Dict[str, Any]]) -> StructuredResult:
+    """Section outputs in SECTIONS order, as one report dict (failed: every section's defaulted fields)."""
+    report = StructuredResult()
+    for section in SECTIONS:
+        result = sections.get(section.name) or {}
+        report.update(result)
+        report.failed.extend(_failed(result))
+    return report
+
+
+def _finalize(report: Dict[str, Any]) -> Dict[str, Any]:
+    for section in SECTIONS:
+        for k, v in section.defaults.items():
+            if k not in report:
+                report[k] = copy.deepcopy(v)
+    return report
 
-    for k, v in defaults.items():
-        if k not in data:
-            data[k] = v
 
-    return data
+#############################################
+# FRIENDLY AGENT
+#############################################
+
+def _call_section(planned: _PlannedSection) -> Dict[str, Any]:
+    client = routed_client(section_route(planned.section))
+    request = _friendly_request(_section_prompt(planned.section, planned.inputs))
+    resp = client.chat.completions.create(**request)
+    data, failed = structured_output(
+        client, request, resp.choices[0].message.content, planned.section.schema, section_route(planned.section)
+    )
+    return _store(planned, data, failed)
+
+
+def _generate_section(
+    planned: _PlannedSection,
+    call: Callable[[_PlannedSection], Dict[str, Any]] = _call_section,
+) -> Dict[str, Any]:
+    if not planned.section.shared:
+        return call(planned)
+
+    # single-flight: concurrent candidates for the same role wait for one call
+    with _key_locks.hold(planned.key):
+        cached = _section_cache.get(planned.key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        return call(planned)
+
+
+def _run_section(
+    planned: _PlannedSection,
+    company: str,
+    role: str,
+    profiles: Dict[str, Dict[str, Any]],
+    call: Callable[[_PlannedSection], Dict[str, Any]] = _call_section,
+) -> Dict[str, Any]:
+    """The section's result (cached or generated), with round tips spliced in."""
+    result = planned.cached if planned.cached is not None else _generate_section(planned, call)
+
+    if planned.section.name == "round_deep_dive":
+        tips = _plan_tips(result, company, role, profiles)
+        if tips is not None:
+            result = _splice_tips(result, tips.cached if tips.cached is not None else _call_section(tips))
+    return result
+
+
+async def _call_section_async(planned: _PlannedSection) -> Dict[str, Any]:
+    client = async_routed_client(section_route(planned.section))
+    request = _friendly_request(_section_prompt(planned.section, planned.inputs))
+    resp = await client.chat.completions.create(**request)
+    data, failed = await structured_output_async(
+        client, request, resp.choices[0].message.content, planned.section.schema, section_route(planned.section)
+    )
+    return _store(planned, data, failed)
+
+
+async def _generate_section_async(planned: _PlannedSection) -> Dict[str, Any]:
+    if not planned.section.shared:
+        return await _call_section_async(planned)
+
+    # single-flight within the loop: later callers await the first call's task
+    inflight = _inflight.setdefault(asyncio.get_running_loop(), {})
+    task = inflight.get(planned.key)
+    if task is None:
+        task = inflight[planned.key] = asyncio.ensure_future(_call_section_async(planned))
+        task.add_done_callback(lambda _: inflight.pop(planned.key, None))
+
+    # shield: one cancelled caller must not cancel the call the others wait on;
+    # every waiter gets its own copy of the one result
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+async def _run_section_async(
+    planned: _PlannedSection,
+    company: str,
+    role: str,
+    profiles: Dict[str, Dict[str, Any]],
+) -> Dict[str, Any]:
+    result = planned.cached if planned.cached is not None else await _generate_section_async(planned)
+
+    if planned.section.name == "round_deep_dive":
+        tips = _plan_tips(result, company, role, profiles)
+        if tips is not None:
+            result = _splice_tips(result, tips.cached if tips.cached is not None else await _call_section_async(tips))
+    return result
+
+
+def _pending(planned: List[_PlannedSection]) -> List[_PlannedSection]:
+    # round_deep_dive always runs: even with the shared part cached, its tips are per candidate
+    return [p for p in planned if p.cached is None or p.section.name == "round_deep_dive"]
+
+
+def build_friendly_report(
+    company: str,
+    role: str,
+    resume_text: str,
+    role_profile: Dict[str, Any],
+    resume_profile: Dict[str, Any],
+    fit_profile: Dict[str, Any],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+) -> Dict[str, Any]:
+
+    profiles = {"role": role_profile, "resume": resume_profile, "fit": fit_profile}
+    planned = _plan(company, role, profiles, user_review_text, user_insight_text)
+
+    sections = {p.section.name: p.cached for p in planned if p.cached is not None}
+    pending = _pending(planned)
+
+    if pending:
+        # one section on this thread, the rest alongside it
+        with ThreadPoolExecutor(max_workers=max(1, len(pending) - 1), thread_name_prefix="hiresense-section") as pool:
+            futures = {
+                p.section.name: pool.submit(contextvars.copy_context().run, _run_section, p, company, role, profiles)
+                for p in pending[1:]
+            }
+            sections[pending[0].section.name] = _run_section(pending[0], company, role, profiles)
+            for name, future in futures.items():
+                sections[name] = future.result()
+
+    return _finalize(_merge(sections))
+
+
+async def build_friendly_report_async(
+    company: str,
+    role: str,
+    resume_text: str,
+    role_profile: Dict[str, Any],
+    resume_profile: Dict[str, Any],
+    fit_profile: Dict[str, Any],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+) -> Dict[str, Any]:
+    """build_friendly_report() on the event loop's shared AsyncOpenAI client."""
+
+    profiles = {"role": role_profile, "resume": resume_profile, "fit": fit_profile}
+    planned = _plan(company, role, profiles, user_review_text, user_insight_text)
+
+    sections = {p.section.name: p.cached for p in planned if p.cached is not None}
+    pending = _pending(planned)
+
+    results = await asyncio.gather(*(_run_section_async(p, company, role, profiles) for p in pending))
+    for p, result in zip(pending, results):
+        sections[p.section.name] = result
+
+    return _finalize(_merge(sections))
+
+
+def stream_friendly_report(
+    company: str,
+    role: str,
+    resume_text: str,
+    role_profile: Dict[str, Any],
+    resume_profile: Dict[str, Any],
+    fit_profile: Dict[str, Any],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+    min_interval: float = 0.15,
+    deadline: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of build_friendly_report().
+
+    Sections stream concurrently; yields the merged, partially-filled
+    report as tokens arrive (at most one every `min_interval` seconds),
+    then the final report with the same defaults build_friendly_report()
+    applies as the LAST item. Cached sections are filled from the start;
+    round tips are added when round_deep_dive completes.
+
+    Raises TimeoutError once `deadline` (time.monotonic()) passes, even
+    while no section sends anything.
+    """
+    profiles = {"role": role_profile, "resume": resume_profile, "fit": fit_profile}
+    planned = _plan(company, role, profiles, user_review_text, user_insight_text)
+
+    sections = {p.section.name: p.cached for p in planned if p.cached is not None}
+    pending = _pending(planned)
+
+    # workers post ("partial", name, dict) / ("done", name, result) / ("error", name, exc)
+    updates: "queue.Queue[Tuple[str, str, Any]]" = queue.Queue()
+
+    def stream_section(p: _PlannedSection) -> Dict[str, Any]:
+        client = routed_client(section_route(p.section))
+        request = _friendly_request(_section_prompt(p.section, p.inputs), stream=True)
+        stream = client.chat.completions.create(**request)
+        raw = ""
+        last_parse = 0.0
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if not delta:
+                continue
+            raw += delta
+
+            now = time.monotonic()
+            if now - last_parse < min_interval:
+                continue
+            partial = parse_partial_json(raw)
+            if isinstance(partial, dict):
+                last_parse = now
+                updates.put(("partial", p.section.name, partial))
+        # a re-ask for failed fields is not streamed
+        data, failed = structured_output(client, request, raw, p.section.schema, section_route(p.section))
+        return _store(p, data, failed)
+
+    def run(p: _PlannedSection) -> None:
+        try:
+            updates.put(("done", p.section.name, _run_section(p, company, role, profiles, stream_section)))
+        except BaseException as e:
+            updates.put(("error", p.section.name, e))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, len(pending)), thread_name_prefix="hiresense-section")
+    try:
+        for p in pending:
+            pool.submit(contextvars.copy_context().run, run, p)
+
+        by_name = {p.section.name: p for p in pending}
+        partials: Dict[str, Dict[str, Any]] = {}
+        done = 0
+        last_emit = 0.0
+        while done < len(pending):
+            try:
+                if deadline is None:
+                    kind, name, value = updates.get()
+                else:
+                    kind, name, value = updates.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise TimeoutError("friendly report streaming passed its deadline") from None
+            if kind == "error":
+                raise value
+            if kind == "done":
+                sections[name] = value
+                partials.pop(name, None)
+                done += 1
+                continue
+
+            keys = by_name[name].section.defaults
+            partials[name] = {k: v for k, v in value.items() if k in keys}
+            now = time.monotonic()
+            if now - last_emit < min_interval:
+                continue
+            last_emit = now
+            yield _merge({**partials, **sections})
+    finally:
+        # don't block on abandoned sections
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    yield _finalize(_merge(sections))
@@ -0,0 +1,161 @@
+# agents/json_utils.py
+#
+# JSON helpers shared by the agents.
+
+import re
+import json
+from typing import Any, List, Optional, Tuple
+
+
+def _closers(stack: List[str]) -> str:
+    return "".join(reversed(stack))
+
+
+def parse_partial_json(text: str) -> Optional[Any]:
+    """
+    Best-effort parse of a JSON document that is still being streamed.
+
+    Open strings, objects and arrays are closed; a key still waiting for
+    its value becomes null or is dropped. Returns None when nothing
+    parseable has arrived yet.
+
+        parse_partial_json('{"a": "hel')          -> {"a": "hel"}
+        parse_partial_json('{"a": [1, 2], "b": ') -> {"a": [1, 2], "b": None}
+        parse_partial_json('{"a": 1, "b"')        -> {"a": 1}
+    """
+    if not text:
+        return None
+
+    stack: List[str] = []
+    # (index, open containers) for each comma outside a string: cutting
+    # the text at a comma always leaves a syntactically complete prefix
+    cut_points: List[Tuple[int, List[str]]] = []
+    in_string = False
+    escaped = False
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch == "{":
+            stack.append("}")
+        elif ch == "[":
+            stack.append("]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+        elif ch == ",":
+            cut_points.append((i, list(stack)))
+
+    candidate = text
+    if in_string:
+        if escaped:
+            candidate = candidate[:-1]
+        candidate += '"'
+    candidate = candidate.rstrip()
+
+    attempts = [candidate + _closers(stack)]
+    if candidate.endswith(","):
+        attempts.append(candidate[:-1] + _closers(stack))
+    if candidate.endswith(":"):
+        attempts.append(candidate + " null" + _closers(stack))
+    for idx, cut_stack in reversed(cut_points[-2:]):
+        attempts.append(text[:idx] + _closers(cut_stack))
+
+    for attempt in attempts:
+        try:
+            return json.loads(attempt)
+        except ValueError:
+            continue
+
+    return None
+
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+
+def _strip_noise(text: str) -> str:
+    """Drop // comments and trailing commas outside strings."""
+    out: List[str] = []
+    in_string = False
+    escaped = False
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        elif ch == ",":
+            j = i + 1
+            while j < n and text[j] in " \t\r\n":
+                j += 1
+            if j < n and text[j] in "}]":
+                i = j
+                continue
+            out.append(ch)
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def repair_json(text: str) -> Optional[Any]:
+    """
+    Parse an LLM's JSON answer that json.loads() may reject, without
+    another call: markdown fences, prose around the document, // comments
+    (the prompts' format examples have them), trailing commas, and a
+    response cut off mid-document (closed like parse_partial_json).
+    Returns None when no JSON object or array can be recovered.
+
+        repair_json('```json {"a": [1, 2,],} ```')     -> {"a": [1, 2]}
+        repair_json('Sure! {"a": "x"} Hope this helps') -> {"a": "x"}
+        repair_json('{"a": ["x", "y')                 -> {"a": ["x", "y"]}
+    """
+    return repair_json_truncated(text)[0]
+
+
+def repair_json_truncated(text: str) -> Tuple[Optional[Any], bool]:
+    """repair_json(), plus whether the document was cut off (its last value may be incomplete)."""
+    if not text:
+        return None, False
+    try:
+        return json.loads(text), False
+    except ValueError:
+        pass
+
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        return None, False
+    text = _strip_noise(text[min(starts):]).rstrip()
+
+    try:
+        # raw_decode ignores whatever follows the document
+        return json.JSONDecoder().raw_decode(text)[0], False
+    except ValueError:
+        pass
+    value = parse_partial_json(text)
+    return value, value is not None
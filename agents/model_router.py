@@ -0,0 +1,340 @@
+# agents/model_router.py
+#
+# Per-stage model routing. Every LLM call names its route ("fit",
+# "resume_parser.exact_skills", ...), and a route is an ordered list of
+# model tiers:
+#
+#   small – fast, cheap model for extraction and JSON reformatting
+#   large – the reasoning model
+#   local – optional OpenAI-compatible server (vLLM, llama.cpp, Ollama);
+#           off until HIRESENSE_TIER_LOCAL_MODEL is set
+#
+# A call goes to the route's first tier. If it times out, cannot connect,
+# or still fails with a 5xx after the scheduler's retries, the call falls
+# back to the next tier. A timeout on a tier that has a fallback is not
+# retried (rate_limit.fallback_scope): the next tier is the retry.
+#
+# Tiers: HIRESENSE_TIER_<NAME>_MODEL / _BASE_URL / _TIMEOUT (seconds, 0 =
+# the SDK default). A tier without a base URL uses the default backend
+# (HIRESENSE_LLM_BACKEND). Point each tier's base URL at its own
+# agents/fake_openai.serve() stub to test routing offline.
+#
+# Routes: HIRESENSE_MODEL_ROUTES="fit=local>large,resume_parser.exact_skills=local>small"
+# overrides entries of DEFAULT_ROUTES. Tiers without a model are skipped.
+#
+# route_report() / format_route_report() give calls, fallbacks, latency
+# and estimated cost per route; the same numbers are exported as
+# hiresense_route_* metrics.
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from agents import openai_client, rate_limit, telemetry
+from agents.cache_store import content_hash
+
+logger = logging.getLogger("hiresense.model_router")
+
+
+#############################################
+# TIERS AND ROUTES
+#############################################
+
+class Tier(NamedTuple):
+    name: str
+    model: str
+    base_url: Optional[str]
+    timeout: Optional[float]
+
+
+def _tier_from_env(name: str, model: str, base_url: Optional[str], timeout: float) -> Tier:
+    prefix = f"HIRESENSE_TIER_{name.upper()}_"
+    seconds = float(os.getenv(prefix + "TIMEOUT", str(timeout)))
+    return Tier(
+        name=name,
+        model=os.getenv(prefix + "MODEL", model),
+        base_url=os.getenv(prefix + "BASE_URL", base_url or "") or None,
+        timeout=seconds if seconds > 0 else None,
+    )
+
+
+TIERS: Dict[str, Tier] = {
+    "small": _tier_from_env("small", "gpt-4.1-mini", None, 30.0),
+    "large": _tier_from_env("large", "gpt-4.1", None, 90.0),
+    "local": _tier_from_env("local", "", os.getenv("HIRESENSE_LLM_BASE_URL", "http://127.0.0.1:8000/v1"), 60.0),
+}
+
+DEFAULT_ROUTES: Dict[str, Tuple[str, ...]] = {
+    # extraction / reformatting
+    "resume_parser.structured": ("small", "large"),
+    "resume_parser.exact_skills": ("small", "large"),
+    "resume_parser.combined": ("small", "large"),
+    "friendly.round_tips": ("small", "large"),
+    # reasoning
+    "role_reality": ("large", "small"),
+    "resume_reality": ("large", "small"),
+    "fit": ("large", "small"),
+    "friendly.summaries": ("large", "small"),
+    "friendly.action_plan": ("large", "small"),
+    "friendly.round_deep_dive": ("large", "small"),
+}
+
+# routes not listed anywhere
+DEFAULT_CHAIN: Tuple[str, ...] = ("large",)
+
+
+def parse_routes(spec: str) -> Dict[str, Tuple[str, ...]]:
+    """'fit=local>large,resume_parser.exact_skills=small' -> {route: tiers}."""
+    routes: Dict[str, Tuple[str, ...]] = {}
+    for item in spec.split(","):
+        route, sep, chain = item.partition("=")
+        if not sep or not route.strip():
+            continue
+        tiers = tuple(t.strip() for t in chain.split(">") if t.strip())
+        unknown = [t for t in tiers if t not in TIERS]
+        if unknown:
+            logger.warning(f"HIRESENSE_MODEL_ROUTES: ignoring unknown tier(s) {unknown} in route {route.strip()!r}")
+        routes[route.strip()] = tuple(t for t in tiers if t in TIERS)
+    return routes
+
+
+ROUTES: Dict[str, Tuple[str, ...]] = {**DEFAULT_ROUTES, **parse_routes(os.getenv("HIRESENSE_MODEL_ROUTES", ""))}
+
+
+def configure_routing(
+    tiers: Optional[Dict[str, Tier]] = None,
+    routes: Optional[Dict[str, Tuple[str, ...]]] = None,
+) -> None:
+    """Replace tiers and/or routes at runtime (tests, benchmarks)."""
+    if tiers:
+        TIERS.update(tiers)
+    if routes:
+        ROUTES.update(routes)
+
+
+def route_tiers(route: str) -> List[Tier]:
+    """The enabled tiers `route` tries, in order."""
+    chain = ROUTES.get(route, DEFAULT_CHAIN)
+    return [TIERS[t] for t in chain if t in TIERS and TIERS[t].model]
+
+
+def route_version(route: str) -> str:
+    """Part of cache keys: the models a route's answers come from.
+
+    Callers hash it when they build a key, not at import, so routes changed
+    with configure_routing() invalidate the entries they affect."""
+    return content_hash(route, [t.model for t in route_tiers(route)])
+
+
+#############################################
+# REPORT
+#############################################
+
+_SAMPLES = 2048
+
+_stats: Dict[str, Dict[str, Any]] = {}
+_stats_lock = threading.Lock()
+
+
+def _route_stats(route: str) -> Dict[str, Any]:
+    stats = _stats.get(route)
+    if stats is None:
+        stats = _stats[route] = {
+            "calls": 0,
+            "errors": 0,
+            "fallbacks": 0,
+            "cost_usd": 0.0,
+            "tiers": {},
+            "seconds": deque(maxlen=_SAMPLES),
+        }
+    return stats
+
+
+def _record(route: str, tier: Tier, wall: float, usage: Any) -> None:
+    prompt_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+    completion_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+    cost = telemetry.estimate_cost(tier.model, prompt_tokens, completion_tokens)
+
+    telemetry.ROUTE_CALLS.inc(route=route, tier=tier.name, status="ok")
+    telemetry.ROUTE_LATENCY.observe(wall, route=route, tier=tier.name)
+    telemetry.ROUTE_COST.inc(cost, route=route, tier=tier.name)
+    with _stats_lock:
+        stats = _route_stats(route)
+        stats["calls"] += 1
+        stats["cost_usd"] += cost
+        stats["tiers"][tier.name] = stats["tiers"].get(tier.name, 0) + 1
+        stats["seconds"].append(wall)
+
+
+def _record_failure(route: str, tier: Tier, wall: float, exc: BaseException, has_next: bool) -> bool:
+    """Count a failed attempt; True if the call should move on to the next tier."""
+    fall_back = has_next and (rate_limit.is_timeout(exc) or rate_limit.is_retryable(exc))
+
+    telemetry.ROUTE_CALLS.inc(route=route, tier=tier.name, status="error")
+    with _stats_lock:
+        stats = _route_stats(route)
+        stats["errors"] += 1
+        if fall_back:
+            stats["fallbacks"] += 1
+    if fall_back:
+        telemetry.ROUTE_FALLBACKS.inc(route=route, tier=tier.name, reason=type(exc).__name__)
+        logger.warning(f"{route}: {tier.name} tier ({tier.model}) failed after {wall:.1f}s ({type(exc).__name__}); falling back")
+    return fall_back
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))]
+
+
+def route_report() -> Dict[str, Dict[str, Any]]:
+    """Per route: calls, errors, fallbacks, calls per tier, p50/p95 seconds, cost."""
+    with _stats_lock:
+        snapshot = {route: dict(s, tiers=dict(s["tiers"]), seconds=sorted(s["seconds"])) for route, s in _stats.items()}
+
+    report = {}
+    for route, s in sorted(snapshot.items()):
+        report[route] = {
+            "calls": s["calls"],
+            "errors": s["errors"],
+            "fallbacks": s["fallbacks"],
+            "tiers": s["tiers"],
+            "p50_seconds": round(_percentile(s["seconds"], 50), 4),
+            "p95_seconds": round(_percentile(s["seconds"], 95), 4),
+            "cost_usd": round(s["cost_usd"], 6),
+        }
+    return report
+
+
+def format_route_report(report: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    report = route_report() if report is None else report
+    lines = [f"{'route':<28} {'calls':>6} {'fallbk':>6} {'p50 s':>7} {'p95 s':>7} {'cost $':>9}  tiers"]
+    for route, r in report.items():
+        tiers = ", ".join(f"{t} {n}" for t, n in sorted(r["tiers"].items()))
+        lines.append(
+            f"{route:<28} {r['calls']:>6} {r['fallbacks']:>6} {r['p50_seconds']:>7.3f}"
+            f" {r['p95_seconds']:>7.3f} {r['cost_usd']:>9.4f}  {tiers}"
+        )
+    return "\n".join(lines)
+
+
+def reset_route_report() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+#############################################
+# ROUTED CLIENTS
+#
+# Look like client.chat.completions.create(); `model` is set per tier.
+# Endpoint clients are resolved per call, so set_client(..., base_url=...)
+# applies to routed clients that already exist.
+#############################################
+
+def _attempts(route: str, kwargs: Dict[str, Any]) -> Iterator[Tuple[Tier, Dict[str, Any], bool]]:
+    tiers = route_tiers(route)
+    if not tiers:
+        raise RuntimeError(f"model route {route!r} has no enabled tier (check HIRESENSE_MODEL_ROUTES)")
+    for i, tier in enumerate(tiers):
+        request = dict(kwargs, model=tier.model)
+        if tier.timeout is not None:
+            request.setdefault("timeout", tier.timeout)
+        yield tier, request, i + 1 < len(tiers)
+
+
+class _RoutedCompletions:
+    def __init__(self, route: str):
+        self.route = route
+
+    def create(self, **kwargs: Any) -> Any:
+        # latency is the whole call, fallbacks included
+        start = time.perf_counter()
+        for tier, request, has_next in _attempts(self.route, kwargs):
+            client = openai_client.get_endpoint_client(tier.base_url)
+            attempt_start = time.perf_counter()
+            try:
+                with rate_limit.fallback_scope(has_next):
+                    result = client.chat.completions.create(**request)
+            except Exception as e:
+                if not _record_failure(self.route, tier, time.perf_counter() - attempt_start, e, has_next):
+                    raise
+                continue
+
+            if request.get("stream"):
+                return self._wrap_stream(result, tier, start)
+            _record(self.route, tier, time.perf_counter() - start, getattr(result, "usage", None))
+            return result
+
+    def _wrap_stream(self, stream, tier: Tier, start: float):
+        # once tokens flow there is no falling back; recorded when drained
+        usage = None
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            yield chunk
+        _record(self.route, tier, time.perf_counter() - start, usage)
+
+
+class _AsyncRoutedCompletions(_RoutedCompletions):
+    async def create(self, **kwargs: Any) -> Any:
+        # latency is the whole call, fallbacks included
+        start = time.perf_counter()
+        for tier, request, has_next in _attempts(self.route, kwargs):
+            client = openai_client.get_async_endpoint_client(tier.base_url)
+            attempt_start = time.perf_counter()
+            try:
+                with rate_limit.fallback_scope(has_next):
+                    result = await client.chat.completions.create(**request)
+            except Exception as e:
+                if not _record_failure(self.route, tier, time.perf_counter() - attempt_start, e, has_next):
+                    raise
+                continue
+
+            if request.get("stream"):
+                return self._wrap_astream(result, tier, start)
+            _record(self.route, tier, time.perf_counter() - start, getattr(result, "usage", None))
+            return result
+
+    async def _wrap_astream(self, stream, tier: Tier, start: float):
+        usage = None
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            yield chunk
+        _record(self.route, tier, time.perf_counter() - start, usage)
+
+
+class RoutedClient:
+    """client.chat.completions.create() for one route."""
+
+    _completions_cls = _RoutedCompletions
+
+    def __init__(self, route: str):
+        self.route = route
+        self.chat = type("_RoutedChat", (), {})()
+        self.chat.completions = self._completions_cls(route)
+
+
+class AsyncRoutedClient(RoutedClient):
+    _completions_cls = _AsyncRoutedCompletions
+
+
+_routed: Dict[Tuple[str, bool], RoutedClient] = {}
+
+
+def routed_client(route: str) -> RoutedClient:
+    client = _routed.get((route, False))
+    if client is None:
+        client = _routed.setdefault((route, False), RoutedClient(route))
+    return client
+
+
+def async_routed_client(route: str) -> AsyncRoutedClient:
+    client = _routed.get((route, True))
+    if client is None:
+        client = _routed.setdefault((route, True), AsyncRoutedClient(route))
+    return client
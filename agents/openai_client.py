@@ -1,22 +1,246 @@
 # agents/openai_client.py
+#
+# Lazily constructed, shared LLM client. Importing this module (and so
+# any agent) has no side effects: .env is read, the backend chosen and the
+# OpenAI SDK imported on the first get_client() call.
+#
+# HIRESENSE_LLM_BACKEND:
+#   openai (default) – api.openai.com, needs OPENAI_API_KEY
+#   local            – any OpenAI-compatible server at HIRESENSE_LLM_BASE_URL
+#                      (vLLM, llama.cpp, Ollama, agents/fake_openai.serve())
+#   fake             – in-process replay of recorded responses
+#                      (agents/fake_openai.py, latency via HIRESENSE_FAKE_LATENCY)
+#
+# get_async_client() is the asyncio counterpart: one AsyncOpenAI per event
+# loop on a pooled httpx client (HIRESENSE_LLM_MAX_CONNECTIONS /
+# HIRESENSE_LLM_MAX_KEEPALIVE / HIRESENSE_LLM_KEEPALIVE_EXPIRY), so one
+# process can keep hundreds of calls in flight over a few connections.
+# Both go through the process-wide request scheduler (agents/rate_limit.py:
+# RPM/TPM budget, priorities, retries – the SDK's own retries are off).
+#
+# get_endpoint_client(base_url) / get_async_endpoint_client(base_url) are
+# the same for another OpenAI-compatible endpoint (a model tier with its
+# own server, see agents/model_router.py); each endpoint gets its own
+# scheduler budget.
 
 import os
+import asyncio
+import threading
+import weakref
 from pathlib import Path
-from dotenv import load_dotenv
-from openai import OpenAI
+from typing import Dict, Optional
+from agents.telemetry import TELEMETRY_ENABLED, AsyncInstrumentedClient, InstrumentedClient
+from agents.rate_limit import AsyncRateLimitedClient, RateLimitedClient, RateLimiter
 
-# Load .env from project root
 ROOT_DIR = Path(__file__).resolve().parent.parent
 ENV_PATH = ROOT_DIR / ".env"
-load_dotenv(ENV_PATH)
 
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError(
-        f"OPENAI_API_KEY not found. Make sure .env file exists at: {ENV_PATH}"
+BACKENDS = ("openai", "local", "fake")
+
+client = None          # the raw backend client, once built
+_instrumented = None   # what get_client() hands out
+_lock = threading.Lock()
+_env_loaded = False
+
+MAX_CONNECTIONS = int(os.getenv("HIRESENSE_LLM_MAX_CONNECTIONS", "64"))
+MAX_KEEPALIVE = int(os.getenv("HIRESENSE_LLM_MAX_KEEPALIVE", "32"))
+KEEPALIVE_EXPIRY = float(os.getenv("HIRESENSE_LLM_KEEPALIVE_EXPIRY", "30"))
+
+# async clients hold connections bound to their event loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, object]" = weakref.WeakKeyDictionary()
+_async_override = None
+
+# other endpoints, keyed by base URL
+_endpoints: Dict[str, object] = {}
+_endpoint_limiters: Dict[str, RateLimiter] = {}
+_async_endpoints: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, object]]" = weakref.WeakKeyDictionary()
+_async_endpoint_overrides: Dict[str, object] = {}
+
+
+def load_env() -> None:
+    """Read .env from the project root once (also used for SERPAPI_API_KEY)."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv(ENV_PATH)
+
+
+def _backend() -> str:
+    load_env()
+    backend = os.getenv("HIRESENSE_LLM_BACKEND", "openai").lower()
+    if backend not in BACKENDS:
+        raise RuntimeError(f"Unknown HIRESENSE_LLM_BACKEND {backend!r}; expected one of {BACKENDS}")
+    return backend
+
+
+def _api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            f"OPENAI_API_KEY not found. Make sure .env file exists at: {ENV_PATH}"
+        )
+    return api_key
+
+
+def _build_client(base_url: Optional[str] = None):
+    backend = _backend()
+
+    if backend == "fake":
+        from agents.fake_openai import FakeOpenAI, LatencyModel
+
+        return FakeOpenAI(latency=LatencyModel(os.getenv("HIRESENSE_FAKE_LATENCY", "0")))
+
+    from openai import OpenAI
+
+    if base_url is None and backend == "local":
+        base_url = os.getenv("HIRESENSE_LLM_BASE_URL", "http://127.0.0.1:8000/v1")
+    if base_url is not None:
+        # local servers usually ignore the key, but the SDK requires one
+        return OpenAI(base_url=base_url, api_key=os.getenv("OPENAI_API_KEY") or "local", max_retries=0)
+
+    return OpenAI(api_key=_api_key(), max_retries=0)
+
+
+def _build_async_client(base_url: Optional[str] = None):
+    backend = _backend()
+
+    if backend == "fake":
+        from agents.fake_openai import AsyncFakeOpenAI, LatencyModel
+
+        return AsyncFakeOpenAI(latency=LatencyModel(os.getenv("HIRESENSE_FAKE_LATENCY", "0")))
+
+    import httpx
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        )
     )
 
-client = OpenAI(api_key=api_key)
+    if base_url is None and backend == "local":
+        base_url = os.getenv("HIRESENSE_LLM_BASE_URL", "http://127.0.0.1:8000/v1")
+    if base_url is not None:
+        return AsyncOpenAI(
+            base_url=base_url,
+            api_key=os.getenv("OPENAI_API_KEY") or "local",
+            http_client=http_client,
+            max_retries=0,
+        )
+
+    return AsyncOpenAI(api_key=_api_key(), http_client=http_client, max_retries=0)
+
 
 def get_client():
-    return client
+    if _instrumented is None:
+        with _lock:
+            if _instrumented is None:
+                set_client(_build_client())
+    return _instrumented
+
+
+def set_client(new_client, base_url: Optional[str] = None):
+    """
+    Swap the backend (e.g. agents/fake_openai.py); keeps the instrumentation.
+    With `base_url`, swap only that endpoint's client.
+    """
+    global client, _instrumented
+    if base_url is not None:
+        with _lock:
+            _endpoints[base_url] = _wrap(new_client, _endpoint_limiter(base_url))
+        return
+    client = new_client
+    _instrumented = _wrap(new_client)
+
+
+def _wrap(raw_client, limiter: Optional[RateLimiter] = None):
+    scheduled = RateLimitedClient(raw_client, limiter)
+    return InstrumentedClient(scheduled) if TELEMETRY_ENABLED else scheduled
+
+
+def _wrap_async(raw_client, limiter: Optional[RateLimiter] = None):
+    scheduled = AsyncRateLimitedClient(raw_client, limiter)
+    return AsyncInstrumentedClient(scheduled) if TELEMETRY_ENABLED else scheduled
+
+
+def _endpoint_limiter(base_url: str) -> RateLimiter:
+    # shared by the endpoint's sync client and its async client on every loop
+    limiter = _endpoint_limiters.get(base_url)
+    if limiter is None:
+        limiter = _endpoint_limiters.setdefault(base_url, RateLimiter())
+    return limiter
+
+
+def get_endpoint_client(base_url: Optional[str]):
+    """get_client() for another OpenAI-compatible endpoint (None = the default one)."""
+    if base_url is None:
+        return get_client()
+    wrapped = _endpoints.get(base_url)
+    if wrapped is None:
+        with _lock:
+            wrapped = _endpoints.get(base_url)
+            if wrapped is None:
+                wrapped = _endpoints[base_url] = _wrap(_build_client(base_url), _endpoint_limiter(base_url))
+    return wrapped
+
+
+def get_async_client():
+    """The AsyncOpenAI client for the running event loop (built on first use)."""
+    loop = asyncio.get_running_loop()
+    wrapped = _async_clients.get(loop)
+    if wrapped is None:
+        raw_client = _async_override if _async_override is not None else _build_async_client()
+        with _lock:
+            wrapped = _async_clients.setdefault(loop, _wrap_async(raw_client))
+    return wrapped
+
+
+def set_async_client(new_client, base_url: Optional[str] = None):
+    """
+    Use `new_client` (e.g. AsyncFakeOpenAI) for every event loop from now on.
+    With `base_url`, only for that endpoint.
+    """
+    global _async_override
+    with _lock:
+        if base_url is not None:
+            _async_endpoint_overrides[base_url] = new_client
+            for clients in _async_endpoints.values():
+                clients.pop(base_url, None)
+            return
+        _async_override = new_client
+        _async_clients.clear()
+
+
+def get_async_endpoint_client(base_url: Optional[str]):
+    """get_async_client() for another OpenAI-compatible endpoint (None = the default one)."""
+    if base_url is None:
+        return get_async_client()
+    clients = _async_endpoints.setdefault(asyncio.get_running_loop(), {})
+    wrapped = clients.get(base_url)
+    if wrapped is None:
+        raw_client = _async_endpoint_overrides.get(base_url)
+        if raw_client is None:
+            raw_client = _build_async_client(base_url)
+        with _lock:
+            wrapped = clients.setdefault(base_url, _wrap_async(raw_client, _endpoint_limiter(base_url)))
+    return wrapped
+
+
+async def aclose_async_client() -> None:
+    """Close the running loop's pooled clients; call before the loop shuts down."""
+    loop = asyncio.get_running_loop()
+    wrapped = _async_clients.pop(loop, None)
+    # an override from set_async_client() is shared across loops – leave it open
+    owned = [] if wrapped is None or _async_override is not None else [wrapped]
+    owned += [c for url, c in _async_endpoints.pop(loop, {}).items() if url not in _async_endpoint_overrides]
+    for c in owned:
+        close = getattr(c, "close", None)
+        if close is not None:
+            await close()
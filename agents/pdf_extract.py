@@ -0,0 +1,180 @@
+# agents/pdf_extract.py
+#
+# Pluggable PDF -> text extraction for the resume parser.
+#
+#   "pypdf"      – fast, pure-python text extraction (PyPDF2 / pypdf)
+#   "pdfplumber" – slower, layout-aware extraction
+#   "auto"       – pypdf first; pages that fail the quality heuristic
+#                  are re-extracted with pdfplumber
+#
+# Large documents are split across a process pool by page range.
+
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+EXTRACTOR_VERSION = "pdf-extract-1"
+
+# Documents with at least this many pages are extracted in a process pool.
+PARALLEL_MIN_PAGES = int(os.getenv("HIRESENSE_PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_WORKERS = int(os.getenv("HIRESENSE_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Pages scoring below this are re-extracted with the layout-aware backend.
+QUALITY_THRESHOLD = 0.6
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+#############################################
+# BACKENDS
+#############################################
+
+def _pypdf_reader(data: bytes):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        from PyPDF2 import PdfReader
+    return PdfReader(io.BytesIO(data))
+
+
+def _extract_pypdf(data: bytes, page_numbers: Optional[Sequence[int]] = None) -> List[str]:
+    reader = _pypdf_reader(data)
+    if page_numbers is None:
+        page_numbers = range(len(reader.pages))
+    out = []
+    for i in page_numbers:
+        try:
+            out.append(reader.pages[i].extract_text() or "")
+        except Exception:
+            out.append("")
+    return out
+
+
+def _extract_pdfplumber(data: bytes, page_numbers: Optional[Sequence[int]] = None) -> List[str]:
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        if page_numbers is None:
+            page_numbers = range(len(pdf.pages))
+        out = []
+        for i in page_numbers:
+            try:
+                out.append(pdf.pages[i].extract_text() or "")
+            except Exception:
+                out.append("")
+        return out
+
+
+BACKENDS: Dict[str, Callable[[bytes, Optional[Sequence[int]]], List[str]]] = {
+    "pypdf": _extract_pypdf,
+    "pdfplumber": _extract_pdfplumber,
+}
+
+
+#############################################
+# QUALITY HEURISTIC
+#############################################
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def page_quality(text: str) -> float:
+    """
+    0.0 (unusable) .. 1.0 (clean prose) for one page of extracted text.
+
+    Penalizes what the fast extractor gets wrong on tricky layouts:
+    near-empty pages, runs of glued words with the spaces dropped,
+    and high ratios of non-text characters.
+    """
+    stripped = text.strip()
+    if len(stripped) < 40:
+        return 0.0
+
+    words = _WORD_RE.findall(stripped)
+    if not words:
+        return 0.0
+
+    glued = sum(1 for w in words if len(w) > 25) / len(words)
+    printable = sum(1 for c in stripped if c.isalnum() or c.isspace() or c in ".,;:-()/+#&@%'\"") / len(stripped)
+    avg_word = sum(len(w) for w in words) / len(words)
+    word_len_ok = 1.0 if 2.0 <= avg_word <= 12.0 else 0.5
+
+    score = printable * word_len_ok * (1.0 - min(1.0, glued * 5))
+    return max(0.0, min(1.0, score))
+
+
+#############################################
+# PAGE-PARALLEL EXTRACTION
+#############################################
+
+def _page_count(data: bytes) -> int:
+    try:
+        return len(_pypdf_reader(data).pages)
+    except Exception:
+        return 0
+
+
+def _extract_chunk(backend: str, data: bytes, page_numbers: List[int]) -> List[str]:
+    # top-level so it can be pickled into worker processes
+    return BACKENDS[backend](data, page_numbers)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _pool
+
+
+def _extract_pages(backend: str, data: bytes, page_numbers: List[int]) -> List[str]:
+    if len(page_numbers) < PARALLEL_MIN_PAGES or PDF_WORKERS <= 1:
+        return _extract_chunk(backend, data, page_numbers)
+
+    # contiguous chunks, one per worker, reassembled in page order
+    size = -(-len(page_numbers) // PDF_WORKERS)
+    chunks = [page_numbers[i : i + size] for i in range(0, len(page_numbers), size)]
+    try:
+        pool = _get_pool()
+        futures = [pool.submit(_extract_chunk, backend, data, chunk) for chunk in chunks]
+        return [text for f in futures for text in f.result()]
+    except Exception as e:
+        print("Parallel PDF extraction failed, falling back to serial:", e)
+        return _extract_chunk(backend, data, page_numbers)
+
+
+def extract_pdf_pages(data: bytes, backend: str = "auto") -> List[str]:
+    """Return extracted text per page using the chosen backend."""
+    n_pages = _page_count(data)
+
+    if backend in BACKENDS:
+        if not n_pages:
+            return BACKENDS[backend](data, None)
+        return _extract_pages(backend, data, list(range(n_pages)))
+
+    if backend != "auto":
+        raise ValueError(f"Unknown PDF backend: {backend!r} (expected auto, {', '.join(BACKENDS)})")
+
+    if not n_pages:
+        # pypdf couldn't even read the page tree – let pdfplumber try
+        return _extract_pdfplumber(data, None)
+
+    pages = _extract_pages("pypdf", data, list(range(n_pages)))
+
+    weak = [i for i, text in enumerate(pages) if page_quality(text) < QUALITY_THRESHOLD]
+    if weak:
+        try:
+            redone = _extract_pages("pdfplumber", data, weak)
+        except Exception as e:
+            print("pdfplumber fallback failed:", e)
+            redone = []
+        for i, text in zip(weak, redone):
+            if page_quality(text) >= page_quality(pages[i]):
+                pages[i] = text
+
+    return pages
+
+
+def extract_pdf_text(data: bytes, backend: str = "auto") -> str:
+    return "\n".join(extract_pdf_pages(data, backend=backend))
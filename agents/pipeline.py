@@ -0,0 +1,516 @@
+#############################################
+# HireSense – Pipeline Orchestrator
+#
+# Stage graph:
+#
+#   role_reality ──┐
+#                  ├──> fit ──> friendly
+#   resume_reality ┘
+#
+# Role Reality and Resume Reality don't depend on each other,
+# so they run concurrently; Fit waits for both. Results are
+# yielded stage by stage so the UI can render progressively.
+#
+# run_hire_sense_async() is the same graph as coroutines, for
+# running many analyses on one event loop (batch.py --async).
+#
+# Each stage result is checkpointed under a hash of its inputs, so
+# running the same analysis again (e.g. after the friendly stage timed
+# out) resumes from the last stage that finished.
+#############################################
+
+from typing import Dict, Any, List, Optional, Iterator, Tuple, Callable
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    Future,
+    FIRST_COMPLETED,
+    wait,
+    TimeoutError as FutureTimeout,
+)
+import os
+import copy
+import time
+import asyncio
+
+from agents.role_reality_agent import build_role_profile_cached, build_role_profile_cached_async, role_prompt_version
+from agents.resume_reality_agent import build_resume_profile, build_resume_profile_async, resume_prompt_version
+from agents.fit_agent import compute_fit_profile, compute_fit_profile_async, fit_prompt_version
+from agents.friendly_agent import (
+    build_friendly_report,
+    build_friendly_report_async,
+    friendly_prompt_version,
+    stream_friendly_report,
+)
+from agents.cache_store import LRUDiskCache, content_hash
+from agents.schemas import complete
+from agents import telemetry
+
+
+# Seconds per stage. Set a stage to None to wait forever.
+DEFAULT_STAGE_TIMEOUTS: Dict[str, Optional[float]] = {
+    "role_reality": 120.0,
+    "resume_reality": 120.0,
+    "fit": 120.0,
+    "friendly": 180.0,
+}
+
+
+class StageTimeoutError(RuntimeError):
+    """Raised when a pipeline stage exceeds its timeout."""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"HireSense stage '{stage}' timed out after {timeout:g}s")
+        self.stage = stage
+        self.timeout = timeout
+
+
+#############################################
+# STAGE CHECKPOINTS
+#
+# A stage's key is its prompt version plus its inputs; downstream stages
+# see upstream ones through their outputs, not their keys. So a prompt
+# change re-runs only that stage – and the stages after it only if its
+# new output differs.
+#############################################
+
+STAGE_CHECKPOINTS = os.getenv("HIRESENSE_STAGE_CHECKPOINTS", "1") != "0"
+
+# called per key, so a route changed at runtime (configure_routing) is picked up
+STAGE_VERSIONS: Dict[str, Callable[[], str]] = {
+    "role_reality": role_prompt_version,
+    "resume_reality": resume_prompt_version,
+    "fit": fit_prompt_version,
+    "friendly": friendly_prompt_version,
+}
+
+# a result with none of these filled came from an unparseable response – don't pin it
+_CHECKPOINT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "role_reality": ("rounds", "skills_most_often_required", "public_interview_summary"),
+    "resume_reality": ("resume_domain", "core_strengths_raw", "tech_stack_clusters"),
+    "fit": ("seniority_fit", "domain_fit", "project_fit", "matched_strengths"),
+    "friendly": ("friendly_summary", "fit_explained", "round_deep_dive"),
+}
+
+_checkpoints = LRUDiskCache("stage_checkpoint", max_items=256)
+
+
+def stage_checkpoint_key(stage: str, **inputs: Any) -> str:
+    return content_hash(STAGE_VERSIONS[stage](), stage, inputs)
+
+
+def _load_checkpoint(stage: str, key: Optional[str]) -> Optional[Dict[str, Any]]:
+    if key is None:
+        return None
+    saved = _checkpoints.get(key)
+    if saved is None:
+        return None
+    telemetry.STAGE_CHECKPOINT_HITS.inc(stage=stage)
+    # the caller's copy – app.py and batch.py add keys to stage results
+    return copy.deepcopy(saved)
+
+
+def _save_checkpoint(stage: str, key: Optional[str], result: Dict[str, Any]) -> None:
+    # a stage that defaulted any field is not a "last good" result – rerun it next time
+    if key is not None and complete(result) and any(result.get(f) for f in _CHECKPOINT_FIELDS[stage]):
+        _checkpoints.set(key, copy.deepcopy(result))
+
+
+def _checkpointed(stage: str, enabled: bool, fn: Callable[..., Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+    """fn(**kwargs), or its saved result for the same stage version and inputs."""
+    key = stage_checkpoint_key(stage, **kwargs) if enabled else None
+    saved = _load_checkpoint(stage, key)
+    if saved is not None:
+        return saved
+    result = fn(**kwargs)
+    _save_checkpoint(stage, key, result)
+    return result
+
+
+async def _checkpointed_async(stage: str, enabled: bool, fn, **kwargs: Any) -> Dict[str, Any]:
+    key = stage_checkpoint_key(stage, **kwargs) if enabled else None
+    saved = _load_checkpoint(stage, key)
+    if saved is not None:
+        return saved
+    result = await fn(**kwargs)
+    _save_checkpoint(stage, key, result)
+    return result
+
+
+#############################################
+# PIPELINE
+#############################################
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def _wait(stage: str, future: Future, deadline: Optional[float], timeout: Optional[float]) -> Any:
+    try:
+        return future.result(timeout=_remaining(deadline))
+    except FutureTimeout:
+        raise StageTimeoutError(stage, timeout or 0.0) from None
+
+
+def iter_hire_sense(
+    company: str,
+    role: str,
+    resume_text: str,
+    extracted_skills: str,
+    results: List[Dict[str, str]],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+    stage_timeouts: Optional[Dict[str, Optional[float]]] = None,
+    stream_friendly: bool = False,
+    trace_id: Optional[str] = None,
+    checkpoints: Optional[bool] = None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run the pipeline and yield (stage, result) as each stage finishes:
+
+      "role_reality" / "resume_reality"  – in completion order
+      "fit"
+      "friendly_partial"                 – only with stream_friendly=True,
+                                           partially-parsed report as tokens arrive
+      "friendly"                         – final report
+
+    On a stage timeout or failure, stages that haven't started yet are
+    cancelled and the error propagates to the caller. Stages already
+    running in a worker thread finish in the background; their results
+    are discarded. Closing the generator early cancels the same way.
+
+    Stage timings and LLM calls are recorded under `trace_id` (the
+    caller's current trace, or a new one) – see agents/telemetry.py.
+
+    With `checkpoints` on (default: HIRESENSE_STAGE_CHECKPOINTS) a stage
+    whose prompt version and inputs match a finished earlier run returns
+    that run's result instead of calling the LLM again.
+    """
+    with telemetry.trace_scope(trace_id or telemetry.current_trace_id() or None):
+        yield from _iter_stages(
+            company,
+            role,
+            resume_text,
+            extracted_skills,
+            results,
+            user_review_text,
+            user_insight_text,
+            stage_timeouts,
+            stream_friendly,
+            STAGE_CHECKPOINTS if checkpoints is None else checkpoints,
+        )
+
+
+def _iter_stages(
+    company: str,
+    role: str,
+    resume_text: str,
+    extracted_skills: str,
+    results: List[Dict[str, str]],
+    user_review_text: str,
+    user_insight_text: str,
+    stage_timeouts: Optional[Dict[str, Optional[float]]],
+    stream_friendly: bool,
+    checkpoints: bool,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    timeouts = dict(DEFAULT_STAGE_TIMEOUTS)
+    if stage_timeouts:
+        timeouts.update(stage_timeouts)
+
+    def deadline(stage: str) -> Optional[float]:
+        t = timeouts.get(stage)
+        return None if t is None else time.monotonic() + t
+
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hiresense-stage")
+    try:
+        # Stage 1 + 2 — Role Reality and Resume Reality (independent, fan out)
+        role_future = telemetry.submit(
+            pool,
+            "role_reality",
+            _checkpointed,
+            "role_reality",
+            checkpoints,
+            build_role_profile_cached,
+            company=company,
+            role=role,
+            results=results,
+            user_review_text=user_review_text,
+            user_insight_text=user_insight_text,
+        )
+        resume_future = telemetry.submit(
+            pool,
+            "resume_reality",
+            _checkpointed,
+            "resume_reality",
+            checkpoints,
+            build_resume_profile,
+            resume_text=resume_text,
+            extracted_skills=extracted_skills,
+            user_review_text=user_review_text,
+            user_insight_text=user_insight_text,
+        )
+
+        pending = {
+            role_future: ("role_reality", deadline("role_reality")),
+            resume_future: ("resume_reality", deadline("resume_reality")),
+        }
+        outputs: Dict[str, Dict[str, Any]] = {}
+
+        # join before the fit stage, yielding whichever finishes first
+        while pending:
+            deadlines = [d for _, d in pending.values() if d is not None]
+            wait_for = min(_remaining(d) for d in deadlines) if deadlines else None
+            done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stage, _ = pending.pop(future)
+                outputs[stage] = future.result()
+                yield stage, outputs[stage]
+
+            for stage, d in pending.values():
+                if d is not None and time.monotonic() >= d:
+                    raise StageTimeoutError(stage, timeouts[stage] or 0.0)
+
+        role_profile = outputs["role_reality"]
+        resume_profile = outputs["resume_reality"]
+
+        # Stage 3 — Fit Engine
+        fit_profile = _wait(
+            "fit",
+            telemetry.submit(
+                pool,
+                "fit",
+                _checkpointed,
+                "fit",
+                checkpoints,
+                compute_fit_profile,
+                role_profile=role_profile,
+                resume_profile=resume_profile,
+                role_title=role,
+                extracted_skills=extracted_skills,
+            ),
+            deadline("fit"),
+            timeouts["fit"],
+        )
+        yield "fit", fit_profile
+
+        # Stage 4 — Friendly Final Report
+        friendly_kwargs = dict(
+            company=company,
+            role=role,
+            resume_text=resume_text,
+            role_profile=role_profile,
+            resume_profile=resume_profile,
+            fit_profile=fit_profile,
+            user_review_text=user_review_text,
+            user_insight_text=user_insight_text,
+        )
+
+        if stream_friendly:
+            friendly_key = stage_checkpoint_key("friendly", **friendly_kwargs) if checkpoints else None
+            friendly_deadline = deadline("friendly")
+            friendly_report = _load_checkpoint("friendly", friendly_key) or {}
+            if not friendly_report:
+                # the last item from the stream is the finalized report
+                with telemetry.stage_scope("friendly"):
+                    try:
+                        # a stalled section can't hold the stream past the deadline
+                        for partial in stream_friendly_report(**friendly_kwargs, deadline=friendly_deadline):
+                            if friendly_deadline is not None and time.monotonic() >= friendly_deadline:
+                                raise StageTimeoutError("friendly", timeouts["friendly"] or 0.0)
+                            friendly_report = partial
+                            yield "friendly_partial", partial
+                    except TimeoutError:
+                        raise StageTimeoutError("friendly", timeouts["friendly"] or 0.0) from None
+                _save_checkpoint("friendly", friendly_key, friendly_report)
+        else:
+            friendly_report = _wait(
+                "friendly",
+                telemetry.submit(
+                    pool, "friendly", _checkpointed, "friendly", checkpoints, build_friendly_report, **friendly_kwargs
+                ),
+                deadline("friendly"),
+                timeouts["friendly"],
+            )
+
+        yield "friendly", friendly_report
+    finally:
+        # don't block on abandoned stages; drop anything not yet started
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_hire_sense(
+    company: str,
+    role: str,
+    resume_text: str,
+    extracted_skills: str,
+    results: List[Dict[str, str]],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+    stage_timeouts: Optional[Dict[str, Optional[float]]] = None,
+    on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    trace_id: Optional[str] = None,
+    checkpoints: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    Run all four stages and return the same dict shape as before:
+    role_profile_raw / resume_profile_raw / fit_profile_raw / friendly_report.
+
+    `on_stage(stage, result)` is called as each stage completes
+    (see iter_hire_sense for stage names).
+    """
+    outputs: Dict[str, Dict[str, Any]] = {}
+    for stage, result in iter_hire_sense(
+        company=company,
+        role=role,
+        resume_text=resume_text,
+        extracted_skills=extracted_skills,
+        results=results,
+        user_review_text=user_review_text,
+        user_insight_text=user_insight_text,
+        stage_timeouts=stage_timeouts,
+        trace_id=trace_id,
+        checkpoints=checkpoints,
+    ):
+        outputs[stage] = result
+        if on_stage is not None:
+            on_stage(stage, result)
+
+    return {
+        "role_profile_raw": outputs["role_reality"],
+        "resume_profile_raw": outputs["resume_reality"],
+        "fit_profile_raw": outputs["fit"],
+        "friendly_report": outputs["friendly"],
+    }
+
+
+#############################################
+# ASYNC PIPELINE
+#############################################
+
+async def _run_stage_async(
+    stage: str,
+    timeout: Optional[float],
+    coro,
+    on_stage: Optional[Callable[[str, Dict[str, Any]], None]],
+) -> Dict[str, Any]:
+    with telemetry.stage_scope(stage):
+        try:
+            result = await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            raise StageTimeoutError(stage, timeout or 0.0) from None
+    if on_stage is not None:
+        on_stage(stage, result)
+    return result
+
+
+async def run_hire_sense_async(
+    company: str,
+    role: str,
+    resume_text: str,
+    extracted_skills: str,
+    results: List[Dict[str, str]],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+    stage_timeouts: Optional[Dict[str, Optional[float]]] = None,
+    on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    trace_id: Optional[str] = None,
+    checkpoints: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    run_hire_sense() as a coroutine: same stages, timeouts, callbacks and
+    result shape, with the LLM calls on the loop's shared AsyncOpenAI
+    client instead of worker threads. If one of the first two stages
+    fails, the other is cancelled.
+    """
+    timeouts = dict(DEFAULT_STAGE_TIMEOUTS)
+    if stage_timeouts:
+        timeouts.update(stage_timeouts)
+    if checkpoints is None:
+        checkpoints = STAGE_CHECKPOINTS
+
+    with telemetry.trace_scope(trace_id or telemetry.current_trace_id() or None):
+        # Stage 1 + 2 — Role Reality and Resume Reality (independent, fan out)
+        first = [
+            asyncio.ensure_future(
+                _run_stage_async(
+                    "role_reality",
+                    timeouts["role_reality"],
+                    _checkpointed_async(
+                        "role_reality",
+                        checkpoints,
+                        build_role_profile_cached_async,
+                        company=company,
+                        role=role,
+                        results=results,
+                        user_review_text=user_review_text,
+                        user_insight_text=user_insight_text,
+                    ),
+                    on_stage,
+                )
+            ),
+            asyncio.ensure_future(
+                _run_stage_async(
+                    "resume_reality",
+                    timeouts["resume_reality"],
+                    _checkpointed_async(
+                        "resume_reality",
+                        checkpoints,
+                        build_resume_profile_async,
+                        resume_text=resume_text,
+                        extracted_skills=extracted_skills,
+                        user_review_text=user_review_text,
+                        user_insight_text=user_insight_text,
+                    ),
+                    on_stage,
+                )
+            ),
+        ]
+        try:
+            role_profile, resume_profile = await asyncio.gather(*first)
+        except BaseException:
+            for task in first:
+                task.cancel()
+            raise
+
+        # Stage 3 — Fit Engine
+        fit_profile = await _run_stage_async(
+            "fit",
+            timeouts["fit"],
+            _checkpointed_async(
+                "fit",
+                checkpoints,
+                compute_fit_profile_async,
+                role_profile=role_profile,
+                resume_profile=resume_profile,
+                role_title=role,
+                extracted_skills=extracted_skills,
+            ),
+            on_stage,
+        )
+
+        # Stage 4 — Friendly Final Report
+        friendly_report = await _run_stage_async(
+            "friendly",
+            timeouts["friendly"],
+            _checkpointed_async(
+                "friendly",
+                checkpoints,
+                build_friendly_report_async,
+                company=company,
+                role=role,
+                resume_text=resume_text,
+                role_profile=role_profile,
+                resume_profile=resume_profile,
+                fit_profile=fit_profile,
+                user_review_text=user_review_text,
+                user_insight_text=user_insight_text,
+            ),
+            on_stage,
+        )
+
+    return {
+        "role_profile_raw": role_profile,
+        "resume_profile_raw": resume_profile,
+        "fit_profile_raw": fit_profile,
+        "friendly_report": friendly_report,
+    }
@@ -0,0 +1,209 @@
+# agents/profiles.py
+#
+# Typed, compact profiles: RoleProfile, ResumeProfile, FitProfile
+# (with its ScoreBreakdown).
+#
+#   - slotted dataclasses: no per-instance __dict__
+#   - list fields are tuples; skills and short labels (domain, seniority,
+#     difficulty, category) are interned, so thousands of profiles share
+#     one "Python" / "Data Engineering" string
+#   - one key set: the output schemas of agents/schemas.py. Key names of
+#     older prompt versions (likely_resume_domain, core_strengths,
+#     seniority_guess, ...), still found in cached results, batch output
+#     and embedding payloads, are mapped once in from_dict() – readers
+#     use attributes and never probe alternatives
+#   - from_dict / to_dict / from_json / to_json; to_dict() gives the
+#     plain dict the agents, caches and prompts work with
+#
+# The stages still hand each other dicts (prompt budgets, caches and
+# checkpoints work on JSON); convert at the edges that read or hold many
+# profiles.
+
+import sys
+import json
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, ClassVar, Dict, Optional, Tuple, TypeVar, Union
+
+Strs = Tuple[str, ...]
+
+P = TypeVar("P", bound="_Profile")
+
+
+#############################################
+# FIELD CONVERTERS
+#############################################
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def _label(value: Any) -> str:
+    """Short, often repeated value – interned."""
+    return sys.intern(_text(value))
+
+
+def _texts(value: Any) -> Tuple[Any, ...]:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    return tuple(value)
+
+
+def _skills(value: Any) -> Tuple[Any, ...]:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        return (sys.intern(value),)
+    return tuple(sys.intern(v) if isinstance(v, str) else v for v in value)
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _field(convert: Callable[[Any], Any], default: Any = "") -> Any:
+    return field(default=default, metadata={"convert": convert})
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return list(value)
+    if isinstance(value, _Profile):
+        return value.to_dict()
+    return value
+
+
+#############################################
+# BASE
+#############################################
+
+class _Profile:
+    __slots__ = ()
+
+    # field -> reader of an older key name, used when the field is empty
+    _LEGACY: ClassVar[Dict[str, Callable[[Dict[str, Any]], Any]]] = {}
+
+    @classmethod
+    def _converters(cls) -> Tuple[Tuple[str, Callable[[Any], Any]], ...]:
+        converters = _CONVERTERS.get(cls)
+        if converters is None:
+            converters = _CONVERTERS[cls] = tuple((f.name, f.metadata["convert"]) for f in fields(cls))
+        return converters
+
+    @classmethod
+    def from_dict(cls: "type[P]", data: Union[Dict[str, Any], "P", None]) -> "P":
+        """Profile from an agent's dict (or the profile itself)."""
+        if isinstance(data, cls):
+            return data
+        data = data or {}
+        legacy = cls._LEGACY
+        kwargs = {}
+        for name, convert in cls._converters():
+            value = data.get(name)
+            # empty, but not a real 0 score
+            if name in legacy and not value and value != 0:
+                value = legacy[name](data)
+            kwargs[name] = convert(value)
+        return cls(**kwargs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: _plain(getattr(self, name)) for name, _ in self._converters()}
+
+    @classmethod
+    def from_json(cls: "type[P]", text: str) -> "P":
+        return cls.from_dict(json.loads(text))
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+
+_CONVERTERS: Dict[type, Tuple[Tuple[str, Callable[[Any], Any]], ...]] = {}
+
+
+#############################################
+# PROFILES
+#############################################
+
+@dataclass(slots=True)
+class RoleProfile(_Profile):
+    rounds: Tuple[Dict[str, Any], ...] = _field(_texts, ())
+    round_count: str = _field(_label)
+    difficulty: str = _field(_label)
+    skills_most_often_required: Strs = _field(_skills, ())
+    skills_nice_to_have: Strs = _field(_skills, ())
+    common_interview_themes: Strs = _field(_texts, ())
+    common_questions_patterns: Strs = _field(_texts, ())
+    projects_they_like: Strs = _field(_texts, ())
+    education_or_experience_expectations: Strs = _field(_texts, ())
+    seniority_pattern: str = _field(_label)
+    public_interview_summary: str = _field(_text)
+
+
+@dataclass(slots=True)
+class ResumeProfile(_Profile):
+    resume_domain: str = _field(_label)
+    core_strengths_raw: Strs = _field(_texts, ())
+    core_weaknesses_raw: Strs = _field(_texts, ())
+    tech_stack_clusters: Strs = _field(_skills, ())
+    project_signals: Strs = _field(_texts, ())
+    seniority_signal: str = _field(_label)
+    missing_signals_for_role: Strs = _field(_texts, ())
+    # added by the parser / batch, not the resume reality prompt
+    skills_canonical: Strs = _field(_skills, ())
+    skills_raw_exact: Strs = _field(_skills, ())
+
+    _LEGACY: ClassVar[Dict[str, Callable[[Dict[str, Any]], Any]]] = {
+        "resume_domain": lambda d: d.get("likely_resume_domain"),
+        "core_strengths_raw": lambda d: d.get("core_strengths"),
+        "core_weaknesses_raw": lambda d: d.get("core_weaknesses"),
+        "project_signals": lambda d: (d.get("project_summary") or {}).get("project_themes"),
+        "seniority_signal": lambda d: d.get("seniority_guess"),
+        "missing_signals_for_role": lambda d: (d.get("skill_summary") or {}).get("missing_common_skills"),
+    }
+
+
+@dataclass(slots=True)
+class ScoreBreakdown(_Profile):
+    skill_match_score: float = _field(_number, 0.0)
+    seniority_score: float = _field(_number, 0.0)
+    domain_score: float = _field(_number, 0.0)
+    fit_score_percentage: float = _field(_number, 0.0)
+    fit_summary_category: str = _field(_label)
+    matched_required_skills: Strs = _field(_skills, ())
+    missing_required_skills: Strs = _field(_skills, ())
+    matched_nice_to_have_skills: Strs = _field(_skills, ())
+    scoring_version: str = _field(_label)
+
+
+def _breakdown(value: Any) -> Optional[ScoreBreakdown]:
+    return ScoreBreakdown.from_dict(value) if value else None
+
+
+@dataclass(slots=True)
+class FitProfile(_Profile):
+    skill_match_score: Optional[float] = _field(_number, None)
+    fit_score_percentage: Optional[float] = _field(_number, None)
+    fit_summary_category: str = _field(_label)
+    score_breakdown: Optional[ScoreBreakdown] = _field(_breakdown, None)
+    seniority_fit: str = _field(_text)
+    domain_fit: str = _field(_text)
+    experience_fit: str = _field(_text)
+    project_fit: str = _field(_text)
+    overall_alignment_notes: Strs = _field(_texts, ())
+    matched_strengths: Strs = _field(_texts, ())
+    mismatched_risks: Strs = _field(_texts, ())
+    priority_gaps: Strs = _field(_texts, ())
+    missing_role_requirements: Strs = _field(_texts, ())
+
+    _LEGACY: ClassVar[Dict[str, Callable[[Dict[str, Any]], Any]]] = {
+        # fit profiles from before the deterministic scores had only this one
+        "fit_score_percentage": lambda d: d.get("skill_match_score"),
+    }
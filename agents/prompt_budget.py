@@ -0,0 +1,216 @@
+# agents/prompt_budget.py
+#
+# Token budgeting for the prompts that embed whole profiles as JSON
+# (fit + friendly stages).
+#
+#   1. serialize compactly (no indent, no empty fields)
+#   2. if still over budget: cap long lists / long strings, tighter each pass
+#   3. if still over budget: drop fields in the stage's low-value order
+#
+# Token counts use tiktoken when it is installed (optional dependency),
+# otherwise a local chars-per-token estimate.
+
+import os
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger("hiresense.prompt_budget")
+
+FIT_PROMPT_BUDGET = int(os.getenv("HIRESENSE_FIT_PROMPT_BUDGET", "6000"))
+FRIENDLY_PROMPT_BUDGET = int(os.getenv("HIRESENSE_FRIENDLY_PROMPT_BUDGET", "8000"))
+
+# (max list items, max string chars) per trimming pass
+_TRIM_PASSES: List[Tuple[int, int]] = [(12, 800), (8, 400), (5, 240), (3, 160)]
+
+
+#############################################
+# TOKEN COUNTING
+#############################################
+
+_encoder = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+
+def _get_encoder():
+    global _encoder, _encoder_loaded
+    if not _encoder_loaded:
+        with _encoder_lock:
+            if not _encoder_loaded:
+                try:
+                    import tiktoken
+
+                    _encoder = tiktoken.get_encoding("o200k_base")
+                except Exception:
+                    _encoder = None
+                _encoder_loaded = True
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    enc = _get_encoder()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    # ~4 chars/token for English; JSON punctuation and indentation
+    # whitespace tokenize denser, so count them separately
+    punct = sum(1 for c in text if c in '{}[]",:')
+    spaces = text.count("  ")
+    return max(1, (len(text) - punct - 2 * spaces) // 4 + punct // 2 + spaces // 2)
+
+
+#############################################
+# SERIALIZATION
+#############################################
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _prune(value: Any) -> Any:
+    """Drop empty strings/lists/dicts recursively – they carry no signal."""
+    if isinstance(value, dict):
+        out = {}
+        for k, v in value.items():
+            v = _prune(v)
+            if not _is_empty(v):
+                out[k] = v
+        return out
+    if isinstance(value, list):
+        return [v for v in (_prune(v) for v in value) if not _is_empty(v)]
+    return value
+
+
+def _trim(value: Any, max_items: int, max_chars: int) -> Any:
+    if isinstance(value, dict):
+        return {k: _trim(v, max_items, max_chars) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_trim(v, max_items, max_chars) for v in value[:max_items]]
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[: max_chars - 1].rstrip() + "…"
+    return value
+
+
+def compact_json(value: Any) -> str:
+    return json.dumps(_prune(value), ensure_ascii=False, separators=(",", ":"))
+
+
+#############################################
+# BUDGETING
+#############################################
+
+# running totals per stage, e.g. {"fit": {"calls": 3, "tokens_saved": 4100, ...}}
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def budget_stats() -> Dict[str, Dict[str, int]]:
+    with _stats_lock:
+        return {k: dict(v) for k, v in _stats.items()}
+
+
+def _record(stage: str, before: int, after: int, trimmed: bool, dropped: List[str]) -> None:
+    with _stats_lock:
+        s = _stats.setdefault(stage, {"calls": 0, "tokens_before": 0, "tokens_after": 0, "tokens_saved": 0, "trimmed": 0})
+        s["calls"] += 1
+        s["tokens_before"] += before
+        s["tokens_after"] += after
+        s["tokens_saved"] += before - after
+        s["trimmed"] += int(trimmed or bool(dropped))
+
+    logger.info(
+        json.dumps(
+            {
+                "event": "prompt_budget",
+                "stage": stage,
+                "tokens_before": before,
+                "tokens_after": after,
+                "tokens_saved": before - after,
+                "trimmed": trimmed,
+                "dropped_fields": dropped,
+            }
+        )
+    )
+
+
+def serialize_for_prompt(
+    stage: str,
+    parts: Dict[str, Dict[str, Any]],
+    budget: int,
+    drop_order: Sequence[Tuple[str, str]] = (),
+) -> Dict[str, str]:
+    """
+    Serialize named profiles (e.g. {"role": ..., "resume": ...}) so that,
+    together, they fit in `budget` tokens.
+
+    drop_order: (part_name, field) pairs, least valuable first, removed
+    only if compaction and trimming weren't enough.
+
+    Returns {part_name: json_string}. Savings are measured against the
+    old json.dumps(indent=2) form and logged per stage.
+    """
+    before = sum(count_tokens(json.dumps(p, indent=2)) for p in parts.values())
+
+    working = {name: _prune(p or {}) for name, p in parts.items()}
+
+    def render() -> Dict[str, str]:
+        return {name: json.dumps(p, ensure_ascii=False, separators=(",", ":")) for name, p in working.items()}
+
+    def size(out: Dict[str, str]) -> int:
+        return sum(count_tokens(s) for s in out.values())
+
+    out = render()
+    trimmed = False
+    dropped: List[str] = []
+
+    for max_items, max_chars in _TRIM_PASSES:
+        if size(out) <= budget:
+            break
+        working = {name: _trim(p, max_items, max_chars) for name, p in working.items()}
+        trimmed = True
+        out = render()
+
+    for part_name, field in drop_order:
+        if size(out) <= budget:
+            break
+        part = working.get(part_name)
+        if isinstance(part, dict) and field in part:
+            del part[field]
+            dropped.append(f"{part_name}.{field}")
+            out = render()
+
+    after = size(out)
+    if after > budget:
+        logger.warning(f"{stage} prompt still over budget after compaction: {after} > {budget} tokens")
+
+    _record(stage, before, after, trimmed, dropped)
+    return out
+
+
+#############################################
+# STAGE POLICIES
+#############################################
+
+# Fit doesn't need interview-round detail; friendly's round_deep_dive section does.
+FIT_DROP_ORDER: List[Tuple[str, str]] = [
+    ("role", "common_questions_patterns"),
+    ("role", "rounds"),
+    ("role", "common_interview_themes"),
+    ("role", "public_interview_summary"),
+    ("resume", "missing_signals_for_role"),
+    ("role", "education_or_experience_expectations"),
+]
+
+FRIENDLY_DROP_ORDER: List[Tuple[str, str]] = [
+    ("fit", "score_breakdown"),
+    ("fit", "overall_alignment_notes"),
+    ("resume", "missing_signals_for_role"),
+    ("resume", "project_signals"),
+    ("role", "education_or_experience_expectations"),
+    ("role", "skills_nice_to_have"),
+    ("fit", "missing_role_requirements"),
+]
+
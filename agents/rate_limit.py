@@ -0,0 +1,769 @@
+# agents/rate_limit.py
+#
+# Process-wide LLM request scheduler, shared by the sync client
+# (get_client) and every async client (get_async_client).
+#
+#   - two token buckets (requests/min, tokens/min) refilled continuously;
+#     a call takes 1 request + its estimated tokens before it is sent, and
+#     the estimate is settled against the usage the API reports
+#   - waiting calls form one priority queue: "interactive" (the UI, the
+#     default) before "batch" (batch.py, shortlist.py); only the head of
+#     the queue is timed against the buckets, the rest sleep until woken
+#   - x-ratelimit-* response headers keep the buckets in line with the
+#     server's view, and adopt its limits when none are configured
+#   - 429 / 408 / 409 / 5xx / connection errors are retried with jittered
+#     exponential backoff (at least retry-after). A 429 pauses the whole
+#     queue until retry-after instead of letting every caller retry on its
+#     own, so a burst does not turn into a retry storm
+#   - under sustained overload batch calls are shed (LoadShedError) once
+#     they would wait longer than HIRESENSE_LLM_BATCH_MAX_WAIT; interactive
+#     calls are never shed
+#
+# HIRESENSE_LLM_RPM / HIRESENSE_LLM_TPM / HIRESENSE_LLM_MAX_IN_FLIGHT
+# (0 = unlimited). Limits are per process: when several processes share
+# one API key, give each its share. The scheduler owns retries, so the
+# OpenAI clients are built with max_retries=0.
+
+import os
+import re
+import time
+import heapq
+import inspect
+import random
+import asyncio
+import itertools
+import threading
+import contextvars
+import weakref
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+from agents import telemetry
+from agents.prompt_budget import count_tokens
+
+RPM = float(os.getenv("HIRESENSE_LLM_RPM", "0"))
+TPM = float(os.getenv("HIRESENSE_LLM_TPM", "0"))
+MAX_IN_FLIGHT = int(os.getenv("HIRESENSE_LLM_MAX_IN_FLIGHT", "0"))
+
+# completion tokens assumed when a request sets no max_tokens
+COMPLETION_ESTIMATE = int(os.getenv("HIRESENSE_LLM_COMPLETION_ESTIMATE", "800"))
+
+# follow x-ratelimit-* headers (and adopt the server's limits if none are set)
+ADAPTIVE = os.getenv("HIRESENSE_LLM_ADAPTIVE", "1") != "0"
+
+MAX_RETRIES = int(os.getenv("HIRESENSE_LLM_MAX_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("HIRESENSE_LLM_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("HIRESENSE_LLM_BACKOFF_MAX", "30"))
+
+# seconds a batch call may wait for budget before it is shed
+BATCH_MAX_WAIT = float(os.getenv("HIRESENSE_LLM_BATCH_MAX_WAIT", "120"))
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+RETRY_STATUS = {408, 409, 429}
+
+# non-head waiters re-check at least this often (guards against a lost wake-up)
+_POLL_SECONDS = 1.0
+
+
+#############################################
+# PRIORITY
+#############################################
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("hiresense_llm_priority", default="interactive")
+
+
+@contextmanager
+def priority_scope(priority: str) -> Iterator[None]:
+    """LLM calls made inside are queued as `priority` ("interactive" or "batch")."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"unknown priority {priority!r}; expected one of {sorted(PRIORITIES)}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class LoadShedError(RuntimeError):
+    """A batch LLM call gave up waiting so interactive calls keep the quota."""
+
+
+_has_fallback: contextvars.ContextVar[bool] = contextvars.ContextVar("hiresense_llm_has_fallback", default=False)
+
+
+@contextmanager
+def fallback_scope(has_fallback: bool = True) -> Iterator[None]:
+    """
+    Inside, a timed-out call is not retried: the caller (agents/model_router.py)
+    has another model tier to try instead.
+    """
+    token = _has_fallback.set(has_fallback)
+    try:
+        yield
+    finally:
+        _has_fallback.reset(token)
+
+
+def is_timeout(exc: BaseException) -> bool:
+    return type(exc).__name__ in ("APITimeoutError", "TimeoutError")
+
+
+#############################################
+# RATE-LIMIT HEADERS
+#############################################
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """'1s', '6m0s', '20ms', '0.5' -> seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def _header(headers: Optional[Mapping[str, str]], name: str) -> Optional[str]:
+    if not headers:
+        return None
+    try:
+        return headers.get(name)
+    except AttributeError:
+        return None
+
+
+def _header_float(headers: Optional[Mapping[str, str]], name: str) -> Optional[float]:
+    value = _header(headers, name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    ms = _header_float(headers, "retry-after-ms")
+    if ms is not None:
+        return ms / 1000.0
+    return parse_duration(_header(headers, "retry-after"))
+
+
+#############################################
+# LIMITER
+#############################################
+
+class _Bucket:
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def deficit(self, amount: float) -> float:
+        """Seconds until `amount` (capped at capacity) is available."""
+        need = min(amount, self.capacity)
+        return 0.0 if self.level >= need else (need - self.level) / self.rate
+
+    def sync(self, remaining: float) -> None:
+        self.level = min(self.level, remaining)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "event", "loop", "removed")
+
+    def __init__(self, priority: int, seq: int, tokens: int, event: Any, loop: Optional[asyncio.AbstractEventLoop]):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.event = event
+        self.loop = loop
+        self.removed = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        elif not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.event.set)
+
+
+class RateLimiter:
+    def __init__(self, rpm: float = 0, tpm: float = 0, max_in_flight: int = 0, adaptive: bool = ADAPTIVE):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_in_flight = max_in_flight
+        self.adaptive = adaptive
+        self._requests = _Bucket(rpm) if rpm > 0 else None
+        self._tokens = _Bucket(tpm) if tpm > 0 else None
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._thread_slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight > 0 else None
+        # asyncio semaphores are bound to one event loop
+        self._loop_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    # ---------------- queue ----------------
+
+    def _enqueue(self, tokens: int, priority: str, event: Any, loop=None) -> _Waiter:
+        waiter = _Waiter(PRIORITIES.get(priority, 0), next(self._seq), tokens, event, loop)
+        with self._lock:
+            heapq.heappush(self._queue, waiter)
+        return waiter
+
+    def _head(self) -> Optional[_Waiter]:
+        while self._queue and self._queue[0].removed:
+            heapq.heappop(self._queue)
+        return self._queue[0] if self._queue else None
+
+    def _remove(self, waiter: _Waiter) -> None:
+        with self._lock:
+            was_head = self._head() is waiter
+            waiter.removed = True
+            head = self._head()
+        if was_head and head is not None:
+            head.wake()
+
+    def _try_grant(self, waiter: _Waiter) -> Optional[float]:
+        """0 = granted; > 0 = seconds the head must wait; None = not at the head."""
+        with self._lock:
+            if self._head() is not waiter:
+                return None
+            now = time.monotonic()
+            wait = self._blocked_until - now
+            if self._requests is not None:
+                self._requests.refill(now)
+                wait = max(wait, self._requests.deficit(1))
+            if self._tokens is not None:
+                self._tokens.refill(now)
+                wait = max(wait, self._tokens.deficit(waiter.tokens))
+            if wait > 0:
+                return wait
+
+            if self._requests is not None:
+                self._requests.level -= 1
+            if self._tokens is not None:
+                self._tokens.level -= min(waiter.tokens, self._tokens.capacity)
+            heapq.heappop(self._queue)
+            waiter.removed = True
+            head = self._head()
+        if head is not None:
+            head.wake()
+        return 0.0
+
+    def _check_shed(self, waiter: _Waiter, waited: float, wait: Optional[float]) -> None:
+        if waiter.priority < PRIORITIES["batch"]:
+            return
+        if waited + (wait or 0.0) > BATCH_MAX_WAIT:
+            telemetry.LLM_SHED.inc()
+            raise LoadShedError(
+                f"batch LLM call shed after {waited:.1f}s waiting for rate-limit budget "
+                f"(HIRESENSE_LLM_BATCH_MAX_WAIT={BATCH_MAX_WAIT:g})"
+            )
+
+    # ---------------- server feedback ----------------
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Correct the token bucket once the real usage is known."""
+        if actual is None:
+            return
+        with self._lock:
+            if self._tokens is None:
+                return
+            self._tokens.refill(time.monotonic())
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level + estimated - actual)
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Align the buckets with x-ratelimit-* headers from a response."""
+        if not self.adaptive or not headers:
+            return
+        now = time.monotonic()
+        with self._lock:
+            for kind in ("requests", "tokens"):
+                limit = _header_float(headers, f"x-ratelimit-limit-{kind}")
+                remaining = _header_float(headers, f"x-ratelimit-remaining-{kind}")
+                bucket = self._requests if kind == "requests" else self._tokens
+                if bucket is None and limit:
+                    bucket = _Bucket(limit)
+                    if kind == "requests":
+                        self._requests = bucket
+                    else:
+                        self._tokens = bucket
+                if bucket is None or remaining is None:
+                    continue
+                bucket.refill(now)
+                bucket.sync(remaining)
+                if remaining < 1:
+                    reset = parse_duration(_header(headers, f"x-ratelimit-reset-{kind}"))
+                    if reset:
+                        self._blocked_until = max(self._blocked_until, now + reset)
+
+    def rate_limited(self, pause: float, headers: Optional[Mapping[str, str]] = None) -> None:
+        """A 429: pause the whole queue and empty the buckets."""
+        self.observe_headers(headers)
+        now = time.monotonic()
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, now + pause)
+            for bucket in (self._requests, self._tokens):
+                if bucket is not None:
+                    bucket.refill(now)
+                    bucket.sync(0)
+
+    # ---------------- sync ----------------
+
+    def acquire_blocking(self, tokens: int) -> float:
+        """Wait for budget (and an in-flight slot); returns seconds waited."""
+        start = time.monotonic()
+        waiter = self._enqueue(tokens, current_priority(), threading.Event())
+        try:
+            while True:
+                waiter.event.clear()
+                wait = self._try_grant(waiter)
+                if wait == 0:
+                    break
+                self._check_shed(waiter, time.monotonic() - start, wait)
+                waiter.event.wait(min(wait, _POLL_SECONDS) if wait is not None else _POLL_SECONDS)
+        except BaseException:
+            self._remove(waiter)
+            raise
+        if self._thread_slots is not None:
+            self._thread_slots.acquire()
+        return time.monotonic() - start
+
+    def release_blocking(self) -> None:
+        if self._thread_slots is not None:
+            self._thread_slots.release()
+
+    # ---------------- async ----------------
+
+    def _slots(self) -> Optional[asyncio.Semaphore]:
+        if self.max_in_flight <= 0:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sem = self._loop_slots.get(loop)
+            if sem is None:
+                sem = self._loop_slots[loop] = asyncio.Semaphore(self.max_in_flight)
+        return sem
+
+    async def acquire(self, tokens: int) -> float:
+        start = time.monotonic()
+        waiter = self._enqueue(tokens, current_priority(), asyncio.Event(), asyncio.get_running_loop())
+        try:
+            while True:
+                waiter.event.clear()
+                wait = self._try_grant(waiter)
+                if wait == 0:
+                    break
+                self._check_shed(waiter, time.monotonic() - start, wait)
+                try:
+                    await asyncio.wait_for(
+                        waiter.event.wait(), min(wait, _POLL_SECONDS) if wait is not None else _POLL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._remove(waiter)
+            raise
+        sem = self._slots()
+        if sem is not None:
+            await sem.acquire()
+        return time.monotonic() - start
+
+    def release(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Give back the slot acquire() took on `loop` (default: the running
+        loop). Works from any thread or with no loop running – e.g. a
+        stream's finalizer – by handing the release to `loop`.
+        """
+        if self.max_in_flight <= 0:
+            return
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        # no self._lock: this may run in a finalizer on a thread that holds it
+        sem = self._loop_slots.get(loop)
+        if sem is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            sem.release()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(sem.release)
+
+
+_limiter = RateLimiter(RPM, TPM, MAX_IN_FLIGHT)
+
+
+def get_rate_limiter() -> RateLimiter:
+    return _limiter
+
+
+def configure_rate_limiter(
+    rpm: float = 0, tpm: float = 0, max_in_flight: int = 0, adaptive: bool = ADAPTIVE
+) -> RateLimiter:
+    """Replace the process-wide limiter (e.g. batch.py giving each shard its share)."""
+    global _limiter
+    _limiter = RateLimiter(rpm, tpm, max_in_flight, adaptive)
+    return _limiter
+
+
+def estimate_tokens(kwargs: Dict[str, Any]) -> int:
+    prompt = "\n".join(str(m.get("content", "")) for m in kwargs.get("messages") or [])
+    completion = kwargs.get("max_tokens") or kwargs.get("max_completion_tokens") or COMPLETION_ESTIMATE
+    return count_tokens(prompt) + int(completion)
+
+
+def _total_tokens(usage: Any) -> Optional[int]:
+    total = getattr(usage, "total_tokens", None)
+    return int(total) if total is not None else None
+
+
+#############################################
+# RETRIES
+#############################################
+
+def _error_headers(exc: BaseException) -> Optional[Mapping[str, str]]:
+    return getattr(getattr(exc, "response", None), "headers", None)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in RETRY_STATUS or status >= 500
+    # openai.APIConnectionError / APITimeoutError carry no status
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def backoff_delay(attempt: int, priority: str = "interactive", rng: random.Random = random) -> float:
+    """Exponential backoff with jitter (half to full step); batch calls back off twice as far."""
+    cap = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    if priority == "batch":
+        cap = min(BACKOFF_MAX, cap * 2)
+    return rng.uniform(cap / 2, cap)
+
+
+def _retry_delay(exc: BaseException, attempt: int, limiter: RateLimiter) -> Optional[float]:
+    """Seconds to sleep before retrying `exc`, or None to give up."""
+    if attempt >= MAX_RETRIES or not is_retryable(exc):
+        return None
+    if is_timeout(exc) and _has_fallback.get():
+        return None
+    priority = current_priority()
+    headers = _error_headers(exc)
+    delay = max(backoff_delay(attempt, priority), retry_after(headers) or 0.0)
+
+    if getattr(exc, "status_code", None) == 429:
+        telemetry.LLM_RATE_LIMITED.inc(priority=priority)
+        # everyone waits out the server's retry-after, not just this caller
+        limiter.rate_limited(retry_after(headers) or delay, headers)
+        if priority == "batch" and delay > BATCH_MAX_WAIT:
+            telemetry.LLM_SHED.inc()
+            raise LoadShedError(f"batch LLM call shed: rate limited for {delay:.0f}s") from exc
+    return delay
+
+
+#############################################
+# CLIENT WRAPPERS
+#
+# Innermost layer, directly around the backend client. Exposes
+# with_raw_response.create() like the SDK: the result's parse() gives the
+# completion, retries_taken the scheduler's retries, wait_seconds the
+# time spent queued or backing off (telemetry subtracts it from the LLM
+# latency). The limiter is looked up per call, so configure_rate_limiter()
+# applies to clients that already exist – unless the client was given its
+# own (a separate endpoint with its own limits, e.g. a local server).
+#############################################
+
+class _Scheduled:
+    def __init__(self, result: Any, headers: Any, retries: int, wait_seconds: float):
+        self._result = result
+        self.headers = headers
+        self.retries_taken = retries
+        self.wait_seconds = wait_seconds
+
+    def parse(self) -> Any:
+        return self._result
+
+
+class _StreamSlot(ABC):
+    """
+    A streamed completion that holds its in-flight slot until it is
+    drained, fails, is closed (close() or a with-block) or is dropped –
+    never until a suspended generator happens to be collected.
+    """
+
+    # class-level defaults so __del__ / __getattr__ are safe if __init__ failed
+    _stream: Any = None
+    _released = True
+
+    def __init__(self, stream: Any, limiter: RateLimiter, estimate: int):
+        self._stream = stream
+        self._limiter = limiter
+        self._estimate = estimate
+        self._usage = None
+        self._released = False
+
+    def __getattr__(self, name: str) -> Any:
+        if self._stream is None:
+            raise AttributeError(name)
+        return getattr(self._stream, name)
+
+    def _seen(self, chunk: Any) -> Any:
+        if getattr(chunk, "usage", None) is not None:
+            self._usage = chunk.usage
+        return chunk
+
+    @abstractmethod
+    def _give_back(self) -> None:
+        """Return the in-flight slot to the limiter."""
+
+    def _release(self, settle: bool = True) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._give_back()
+        if settle:
+            self._limiter.settle(self._estimate, _total_tokens(self._usage))
+
+    def __del__(self) -> None:
+        # the estimate stays charged: settle() takes the limiter's lock
+        self._release(settle=False)
+
+
+class _ScheduledStream(_StreamSlot):
+    def __init__(self, stream: Any, limiter: RateLimiter, estimate: int):
+        super().__init__(stream, limiter, estimate)
+        self._chunks = iter(stream)
+
+    def __iter__(self) -> "_ScheduledStream":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._release()
+            raise
+        except BaseException:
+            self.close()
+            raise
+        return self._seen(chunk)
+
+    def __enter__(self) -> "_ScheduledStream":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._release()
+
+    def _give_back(self) -> None:
+        self._limiter.release_blocking()
+
+
+class _AsyncScheduledStream(_StreamSlot):
+    """The slot belongs to the loop that took it; given back even with no loop running."""
+
+    def __init__(self, stream: Any, limiter: RateLimiter, estimate: int, loop: asyncio.AbstractEventLoop):
+        super().__init__(stream, limiter, estimate)
+        self._chunks = stream.__aiter__()
+        self._loop = loop
+
+    def __aiter__(self) -> "_AsyncScheduledStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self._release()
+            raise
+        except BaseException:
+            await self.close()
+            raise
+        return self._seen(chunk)
+
+    async def __aenter__(self) -> "_AsyncScheduledStream":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        try:
+            # openai's AsyncStream has close(), an async generator aclose()
+            close = getattr(self._stream, "close", None) or getattr(self._stream, "aclose", None)
+            if close is not None:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+        finally:
+            self._release()
+
+    aclose = close
+
+    def _give_back(self) -> None:
+        self._limiter.release(self._loop)
+
+
+class _ScheduledCompletions:
+    def __init__(self, completions: Any, limiter: Optional[RateLimiter] = None):
+        self._completions = completions
+        self._limiter = limiter
+        self.with_raw_response = _RawCreate(self._raw_create)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._completions, name)
+
+    def _send(self, kwargs: Dict[str, Any]):
+        raw_api = getattr(self._completions, "with_raw_response", None)
+        if raw_api is None:
+            return self._completions.create(**kwargs), None
+        raw = raw_api.create(**kwargs)
+        return raw.parse(), getattr(raw, "headers", None)
+
+    def create(self, **kwargs: Any) -> Any:
+        return self._raw_create(**kwargs).parse()
+
+    def _raw_create(self, **kwargs: Any) -> _Scheduled:
+        limiter = self._limiter or get_rate_limiter()
+        estimate = estimate_tokens(kwargs)
+        waited = 0.0
+        attempt = 0
+        while True:
+            queued = limiter.acquire_blocking(estimate)
+            telemetry.RATE_LIMIT_WAIT.observe(queued, priority=current_priority())
+            waited += queued
+            try:
+                result, headers = self._send(kwargs)
+            except Exception as e:
+                limiter.release_blocking()
+                delay = _retry_delay(e, attempt, limiter)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                waited += delay
+                attempt += 1
+                continue
+            except BaseException:
+                # KeyboardInterrupt and friends must not keep the slot either
+                limiter.release_blocking()
+                raise
+            break
+
+        limiter.observe_headers(headers)
+        if kwargs.get("stream"):
+            # the slot is held until the stream is drained or closed
+            result = _ScheduledStream(result, limiter, estimate)
+        else:
+            limiter.release_blocking()
+            limiter.settle(estimate, _total_tokens(getattr(result, "usage", None)))
+        return _Scheduled(result, headers, attempt, waited)
+
+
+class _AsyncScheduledCompletions(_ScheduledCompletions):
+    async def _send(self, kwargs: Dict[str, Any]):
+        raw_api = getattr(self._completions, "with_raw_response", None)
+        if raw_api is None:
+            return await self._completions.create(**kwargs), None
+        raw = await raw_api.create(**kwargs)
+        return raw.parse(), getattr(raw, "headers", None)
+
+    async def create(self, **kwargs: Any) -> Any:
+        return (await self._raw_create(**kwargs)).parse()
+
+    async def _raw_create(self, **kwargs: Any) -> _Scheduled:
+        limiter = self._limiter or get_rate_limiter()
+        estimate = estimate_tokens(kwargs)
+        waited = 0.0
+        attempt = 0
+        while True:
+            queued = await limiter.acquire(estimate)
+            telemetry.RATE_LIMIT_WAIT.observe(queued, priority=current_priority())
+            waited += queued
+            try:
+                result, headers = await self._send(kwargs)
+            except Exception as e:
+                limiter.release()
+                delay = _retry_delay(e, attempt, limiter)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                waited += delay
+                attempt += 1
+                continue
+            except BaseException:
+                # a stage timeout (wait_for) or a cancelled sibling stage cancels
+                # the call mid-request; its slot goes back before CancelledError does
+                limiter.release()
+                raise
+            break
+
+        limiter.observe_headers(headers)
+        if kwargs.get("stream"):
+            result = _AsyncScheduledStream(result, limiter, estimate, asyncio.get_running_loop())
+        else:
+            limiter.release()
+            limiter.settle(estimate, _total_tokens(getattr(result, "usage", None)))
+        return _Scheduled(result, headers, attempt, waited)
+
+
+class _RawCreate:
+    def __init__(self, create):
+        self.create = create
+
+
+class _ScheduledChat:
+    def __init__(self, chat: Any, completions_cls: type, limiter: Optional[RateLimiter] = None):
+        self._chat = chat
+        self.completions = completions_cls(chat.completions, limiter)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._chat, name)
+
+
+class RateLimitedClient:
+    """client.chat.completions.create() goes through the scheduler; the rest passes through."""
+
+    _completions_cls = _ScheduledCompletions
+
+    def __init__(self, client: Any, limiter: Optional[RateLimiter] = None):
+        self._client = client
+        self.chat = _ScheduledChat(client.chat, self._completions_cls, limiter)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class AsyncRateLimitedClient(RateLimitedClient):
+    _completions_cls = _AsyncScheduledCompletions
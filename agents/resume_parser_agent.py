@@ -4,7 +4,8 @@
 # - Uses LLM for deep structured parsing
 # - Extracts:
 #     * clean_text
-#     * skills_raw_exact (as written in resume)
+#     * skills_raw_exact (as written in resume – local skill lexicon,
+#       LLM only as optional enrichment)
 #     * skills_grouped (normalized/grouped skills)
 #     * education / experience / projects / certifications
 #     * summary_points
@@ -12,13 +13,19 @@
 #     * tech_stack_clusters
 #############################################
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import io
+import os
 import re
-import json
+import copy
+import asyncio
 from string import Template
 
-import pdfplumber
-from agents.openai_client import get_client
+from agents.model_router import async_routed_client, route_version, routed_client
+from agents.pdf_extract import extract_pdf_text, EXTRACTOR_VERSION
+from agents.skill_lexicon import SKILL_LEXICON, CASE_SENSITIVE_ALIASES, CONTEXT_ALIASES, get_skill_matcher
+from agents.cache_store import LRUDiskCache, content_hash
+from agents.json_utils import repair_json, repair_json_truncated
 
 
 #############################################
@@ -37,6 +44,16 @@ def _clean_text(text: str) -> str:
     return text.strip()
 
 
+def _read_upload_bytes(uploaded_file) -> bytes:
+    """Read all bytes from a Streamlit UploadedFile / file-like without consuming it."""
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    data = uploaded_file.read()
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    return data
+
+
 def _fallback_sections(text: str) -> Dict[str, Any]:
     """Very rough fallback if LLM parsing fails."""
     sections = {
@@ -73,17 +90,17 @@ def _fallback_sections(text: str) -> Dict[str, Any]:
 
 
 #############################################
-# LLM HELPERS
+# PROMPTS
 #############################################
 
-def _llm_structured_parse(resume_text: str) -> Dict[str, Any]:
-    """
-    Use LLM to parse resume into structured sections + grouped skills.
-    """
-    client = get_client()
+# model routes (agents/model_router.py) of the three parser calls
+_PARSER_ROUTES = ("resume_parser.structured", "resume_parser.exact_skills", "resume_parser.combined")
+
+# "auto" (fast pypdf, pdfplumber fallback per page), "pypdf", or "pdfplumber"
+PDF_BACKEND = os.getenv("HIRESENSE_PDF_BACKEND", "auto")
 
-    tmpl = Template(
-        """
+_STRUCTURED_PARSE_TEMPLATE = Template(
+    """
 You are the ADVANCED RESUME PARSER for HireSense.
 
 Your job is to read the resume text below and extract a clean, structured JSON representation.
@@ -119,24 +136,166 @@ Guidelines:
 - Do NOT invent experience or degrees that are not in the resume.
 - Only extract what is actually supported by the text.
 """
-    )
+)
+
+
+_EXACT_SKILLS_TEMPLATE = Template(
+    """
+You are the EXACT SKILL EXTRACTOR AGENT for HireSense.
+
+Your task:
+- Read the resume text below.
+- Extract ALL technical skills, tools, libraries, frameworks, cloud services, databases, platforms, and languages.
+- Return them EXACTLY as written in the resume:
+  - Preserve capitalization (e.g., "Python", "AWS Lambda", "Google BigQuery", "C++", "PyTorch").
+  - Preserve spaces and punctuation.
+- Do NOT:
+  - Normalize or reword skills.
+  - Add skills that are not present.
+  - Merge or group skills.
+  - Expand abbreviations.
 
-    prompt = tmpl.substitute(
+Return ONLY valid JSON:
+
+{
+  "skills_raw_exact": []
+}
+
+Resume text:
+$resume_text
+"""
+)
+
+
+_COMBINED_PARSE_TEMPLATE = Template(
+    """
+You are the ADVANCED RESUME PARSER for HireSense.
+
+Your job is to read the resume text below ONCE and return BOTH a clean,
+structured representation AND the exact skills as written.
+
+Resume text:
+$resume_text
+
+Return ONLY valid JSON in this exact structure:
+
+{
+  "clean_text": "",
+  "education": [],
+  "experience": [],
+  "projects": [],
+  "certifications": [],
+  "summary_points": [],
+  "detected_resume_domain": "",
+  "tech_stack_clusters": [],
+  "skills_extracted": [],
+  "skills_raw_exact": []
+}
+
+Guidelines:
+- "clean_text": a lightly cleaned version of the resume in plain text.
+- "education": list of concise strings summarizing degrees, schools, years.
+- "experience": list of concise strings summarizing roles, companies, durations, and key impacts.
+- "projects": list of concise descriptions of projects + tech stack + outcomes.
+- "certifications": list of certifications, licenses, or notable courses.
+- "summary_points": high-level bullet-style points capturing the candidate profile.
+- "detected_resume_domain": one of: "SWE", "Data Engineering", "Data Science / Analytics", "ML / AI", "DevOps / SRE", "Full-Stack", "Backend", "Frontend", "Other".
+- "tech_stack_clusters": high-level groupings like:
+    ["Python + Pandas + SQL (data analytics stack)", "Java + Spring Boot (backend)", "React + TypeScript (frontend)", "AWS Lambda + DynamoDB + S3 (cloud)"].
+- "skills_extracted": a list of normalized skill names (e.g., "Python", "Apache Spark", "AWS Lambda", "Google BigQuery", "React", "Docker").
+- "skills_raw_exact": ALL technical skills, tools, libraries, frameworks, cloud services, databases, platforms, and languages EXACTLY as written in the resume:
+  - Preserve capitalization, spaces and punctuation (e.g., "Python", "AWS Lambda", "C++", "PyTorch").
+  - Do NOT normalize, reword, merge, or expand abbreviations.
+  - Every entry must appear verbatim in the resume text.
+- Do NOT invent experience, degrees, or skills that are not in the resume.
+- Only extract what is actually supported by the text.
+"""
+)
+
+
+# "combined" = one LLM call for sections + exact skills (default)
+# "two_call" = legacy path: structured parse and exact skills as separate calls
+PARSE_MODE = os.getenv("HIRESENSE_PARSE_MODE", "combined")
+
+# "local" = skills_raw_exact from the skill lexicon, no LLM (default)
+# "llm"   = skills_raw_exact from the LLM (see PARSE_MODE)
+SKILL_EXTRACTOR = os.getenv("HIRESENSE_SKILL_EXTRACTOR", "local")
+
+# With the local extractor, also ask the LLM for skills and keep the ones
+# the lexicon doesn't know. Costs the combined call instead of the structured one.
+SKILL_LLM_ENRICH = os.getenv("HIRESENSE_SKILL_LLM_ENRICH", "0") == "1"
+
+# Any change to extraction, prompts or model must invalidate cached parses.
+# The models are hashed per key (parser_version()): routes can change at
+# runtime (configure_routing); everything else is fixed at import.
+_PARSER_SETTINGS_VERSION = content_hash(
+    EXTRACTOR_VERSION,
+    PDF_BACKEND,
+    PARSE_MODE,
+    SKILL_EXTRACTOR,
+    SKILL_LLM_ENRICH,
+    SKILL_LEXICON,
+    sorted(CASE_SENSITIVE_ALIASES),
+    sorted(CONTEXT_ALIASES),
+    _STRUCTURED_PARSE_TEMPLATE.template,
+    _EXACT_SKILLS_TEMPLATE.template,
+    _COMBINED_PARSE_TEMPLATE.template,
+)
+
+
+def parser_version() -> str:
+    return content_hash(_PARSER_SETTINGS_VERSION, [route_version(r) for r in _PARSER_ROUTES])
+
+
+#############################################
+# LLM HELPERS
+#############################################
+
+def _parser_request(template: Template, resume_text: str, temperature: float) -> Dict[str, Any]:
+    """chat.completions.create() kwargs – shared by the sync and async helpers."""
+    prompt = template.substitute(
         resume_text=resume_text.replace('"', "'")
     )
 
-    resp = client.chat.completions.create(
-        model="gpt-4.1",
+    return dict(
         messages=[{"role": "user", "content": prompt}],
-        temperature=0.1,
+        temperature=temperature,
         response_format={"type": "json_object"},
     )
 
+
+def _llm_structured_parse(resume_text: str) -> Dict[str, Any]:
+    """
+    Use LLM to parse resume into structured sections + grouped skills.
+    """
+    client = routed_client("resume_parser.structured")
+
+    resp = client.chat.completions.create(
+        **_parser_request(_STRUCTURED_PARSE_TEMPLATE, resume_text, temperature=0.1)
+    )
+
     raw = resp.choices[0].message.content
-    try:
-        data = json.loads(raw)
-    except Exception:
+    return _structured_with_defaults(raw, resume_text)
+
+
+async def _llm_structured_parse_async(resume_text: str) -> Dict[str, Any]:
+    client = async_routed_client("resume_parser.structured")
+
+    resp = await client.chat.completions.create(
+        **_parser_request(_STRUCTURED_PARSE_TEMPLATE, resume_text, temperature=0.1)
+    )
+
+    return _structured_with_defaults(resp.choices[0].message.content, resume_text)
+
+
+def _structured_with_defaults(raw: str, resume_text: str) -> Dict[str, Any]:
+    data, truncated = repair_json_truncated(raw)
+    if not isinstance(data, dict):
         data = _fallback_sections(resume_text)
+        data["_fallback"] = True
+    elif truncated:
+        # a cut-off answer parses, but its last section may be missing items
+        data["_fallback"] = True
 
     # ensure all keys exist
     defaults = {
@@ -157,67 +316,115 @@ Guidelines:
     return data
 
 
-def _llm_exact_skills(resume_text: str) -> List[str]:
+def _llm_exact_skills(resume_text: str) -> Optional[List[str]]:
     """
     Use LLM to extract EXACT skills as they appear in the resume text.
     No normalization, no rewriting – literal phrases.
     """
-    client = get_client()
+    client = routed_client("resume_parser.exact_skills")
 
-    tmpl = Template(
-        """
-You are the EXACT SKILL EXTRACTOR AGENT for HireSense.
+    resp = client.chat.completions.create(
+        **_parser_request(_EXACT_SKILLS_TEMPLATE, resume_text, temperature=0.0)
+    )
 
-Your task:
-- Read the resume text below.
-- Extract ALL technical skills, tools, libraries, frameworks, cloud services, databases, platforms, and languages.
-- Return them EXACTLY as written in the resume:
-  - Preserve capitalization (e.g., "Python", "AWS Lambda", "Google BigQuery", "C++", "PyTorch").
-  - Preserve spaces and punctuation.
-- Do NOT:
-  - Normalize or reword skills.
-  - Add skills that are not present.
-  - Merge or group skills.
-  - Expand abbreviations.
+    return _exact_skills_result(resp.choices[0].message.content)
 
-Return ONLY valid JSON:
 
-{
-  "skills_raw_exact": []
-}
+async def _llm_exact_skills_async(resume_text: str) -> Optional[List[str]]:
+    client = async_routed_client("resume_parser.exact_skills")
 
-Resume text:
-$resume_text
-"""
+    resp = await client.chat.completions.create(
+        **_parser_request(_EXACT_SKILLS_TEMPLATE, resume_text, temperature=0.0)
     )
 
-    prompt = tmpl.substitute(
-        resume_text=resume_text.replace('"', "'")
-    )
+    return _exact_skills_result(resp.choices[0].message.content)
+
+
+def _exact_skills_result(raw: str) -> Optional[List[str]]:
+    """The exact skills the LLM listed, or None if its answer could not be read."""
+    data = repair_json(raw)
+    if not isinstance(data, dict):
+        return None
+    skills = data.get("skills_raw_exact", [])
+    # ensure list of strings
+    return [s for s in skills if isinstance(s, str)] if isinstance(skills, list) else []
+
+
+def _validate_exact_skills(skills: List[Any], resume_text: str) -> List[str]:
+    """Keep only skills that literally occur in the resume (whitespace-insensitive), deduped."""
+    haystack = " ".join(resume_text.replace('"', "'").split())
+    out: List[str] = []
+    seen = set()
+    for s in skills:
+        if not isinstance(s, str):
+            continue
+        needle = " ".join(s.split())
+        if not needle or needle in seen or needle not in haystack:
+            continue
+        seen.add(needle)
+        out.append(needle)
+    return out
+
+
+def _llm_combined_parse(resume_text: str) -> Dict[str, Any]:
+    """
+    Single LLM call returning the structured sections AND skills_raw_exact.
+    Same input tokens as each of the two legacy calls, paid once.
+    """
+    client = routed_client("resume_parser.combined")
 
     resp = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.0,
-        response_format={"type": "json_object"},
+        **_parser_request(_COMBINED_PARSE_TEMPLATE, resume_text, temperature=0.0)
     )
 
-    raw = resp.choices[0].message.content
-    try:
-        data = json.loads(raw)
-        skills = data.get("skills_raw_exact", [])
-        # ensure list of strings
-        skills = [s for s in skills if isinstance(s, str)]
-        return skills
-    except Exception:
-        return []
+    return _combined_result(resp.choices[0].message.content, resume_text)
+
+
+async def _llm_combined_parse_async(resume_text: str) -> Dict[str, Any]:
+    client = async_routed_client("resume_parser.combined")
+
+    resp = await client.chat.completions.create(
+        **_parser_request(_COMBINED_PARSE_TEMPLATE, resume_text, temperature=0.0)
+    )
+
+    return _combined_result(resp.choices[0].message.content, resume_text)
+
+
+def _combined_result(raw: str, resume_text: str) -> Dict[str, Any]:
+    data = _structured_with_defaults(raw, resume_text)
+    data["skills_raw_exact"] = _validate_exact_skills(
+        data.get("skills_raw_exact", []) or [], resume_text
+    )
+    return data
+
+
+def _merge_skills(local_skills: List[str], llm_skills: List[str]) -> List[str]:
+    """Local lexicon hits first; LLM skills only fill in what the lexicon doesn't know."""
+    matcher = get_skill_matcher()
+    seen = set()
+    out: List[str] = []
+    for s in [*local_skills, *llm_skills]:
+        key = matcher.canonicalize(s) or s.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(s)
+    return out
 
 
 #############################################
 # MAIN ENTRYPOINT
 #############################################
 
-def parse_resume(uploaded_file_or_text) -> Dict[str, Any]:
+class ParsedResume(dict):
+    """parse_resume() output, plus whether no local fallback stood in for an LLM answer (`complete`)."""
+
+    def __init__(self, parsed: Any = (), complete: bool = True):
+        super().__init__(parsed)
+        self.complete = complete
+
+
+def parse_resume(uploaded_file_or_text, parse_mode: str = None) -> ParsedResume:
     """
     Main function used by app.py
 
@@ -225,27 +432,90 @@ def parse_resume(uploaded_file_or_text) -> Dict[str, Any]:
       - A Streamlit UploadedFile (PDF)
       - A raw text string
 
+    parse_mode: "combined" (one LLM call) or "two_call" (legacy);
+    defaults to HIRESENSE_PARSE_MODE.
+
     Returns a dict with at least:
       - "resume_text": cleaned resume text
       - "skills_raw_exact": list[str]
+      - "skills_canonical": list[str] (lexicon names for skills_raw_exact)
       - "skills_grouped": list[str]
       - "education", "experience", "projects", "certifications"
       - "summary_points"
       - "detected_resume_domain"
       - "tech_stack_clusters"
+
+    `complete` is False when the PDF text could not be extracted or an
+    LLM answer was unreadable or cut off and local fallbacks filled in.
+    """
+
+    resume_text = _input_text(uploaded_file_or_text)
+
+    if not resume_text:
+        # Return empty skeleton if nothing to parse
+        return _empty_parse()
+
+    plan = _llm_plan(parse_mode)
+
+    if plan == "structured":
+        # ---- hot path: LLM only for sections, skills matched locally ----
+        structured = _llm_structured_parse(resume_text)
+        llm_skills: List[str] = []
+    elif plan == "two_call":
+        # ---- LLM structured parse ----
+        structured = _llm_structured_parse(resume_text)
+
+        # ---- LLM exact skills ----
+        llm_skills = _llm_exact_skills(resume_text)
+    else:
+        # ---- LLM combined parse (sections + exact skills) ----
+        structured = _llm_combined_parse(resume_text)
+        llm_skills = structured.get("skills_raw_exact", [])
+
+    return _assemble(resume_text, structured, llm_skills)
+
+
+async def parse_resume_async(uploaded_file_or_text, parse_mode: str = None) -> ParsedResume:
+    """
+    parse_resume() for asyncio callers: PDF extraction runs in a worker
+    thread, the LLM calls on the loop's shared AsyncOpenAI client (the two
+    legacy calls concurrently).
     """
+    if hasattr(uploaded_file_or_text, "read"):
+        resume_text = await asyncio.to_thread(_input_text, uploaded_file_or_text)
+    else:
+        resume_text = _input_text(uploaded_file_or_text)
+
+    if not resume_text:
+        return _empty_parse()
 
+    plan = _llm_plan(parse_mode)
+
+    if plan == "structured":
+        structured = await _llm_structured_parse_async(resume_text)
+        llm_skills: List[str] = []
+    elif plan == "two_call":
+        structured, llm_skills = await asyncio.gather(
+            _llm_structured_parse_async(resume_text),
+            _llm_exact_skills_async(resume_text),
+        )
+    else:
+        structured = await _llm_combined_parse_async(resume_text)
+        llm_skills = structured.get("skills_raw_exact", [])
+
+    return _assemble(resume_text, structured, llm_skills)
+
+
+def _input_text(uploaded_file_or_text) -> str:
     resume_text = ""
 
     # Case 1: Streamlit UploadedFile (PDF)
     if hasattr(uploaded_file_or_text, "read"):
         try:
-            with pdfplumber.open(uploaded_file_or_text) as pdf:
-                pages = []
-                for page in pdf.pages:
-                    extracted = page.extract_text() or ""
-                    pages.append(extracted)
-                resume_text = "\n".join(pages)
+            resume_text = extract_pdf_text(
+                _read_upload_bytes(uploaded_file_or_text),
+                backend=PDF_BACKEND,
+            )
         except Exception as e:
             print("PDF parsing failed in resume_parser_agent:", e)
             resume_text = ""
@@ -254,37 +524,54 @@ def parse_resume(uploaded_file_or_text) -> Dict[str, Any]:
     elif isinstance(uploaded_file_or_text, str):
         resume_text = uploaded_file_or_text
 
-    resume_text = _clean_text(resume_text)
+    return _clean_text(resume_text)
 
-    if not resume_text:
-        # Return empty skeleton if nothing to parse
-        return {
-            "resume_text": "",
-            "skills_raw_exact": [],
-            "skills_grouped": [],
-            "education": [],
-            "experience": [],
-            "projects": [],
-            "certifications": [],
-            "summary_points": [],
-            "detected_resume_domain": "",
-            "tech_stack_clusters": [],
-        }
-
-    # ---- LLM structured parse ----
-    structured = _llm_structured_parse(resume_text)
-
-    # ---- LLM exact skills ----
-    skills_exact = _llm_exact_skills(resume_text)
-
-    # Backfill if exact skills LLM fails
+
+def _empty_parse() -> ParsedResume:
+    return ParsedResume({
+        "resume_text": "",
+        "skills_raw_exact": [],
+        "skills_canonical": [],
+        "skills_grouped": [],
+        "education": [],
+        "experience": [],
+        "projects": [],
+        "certifications": [],
+        "summary_points": [],
+        "detected_resume_domain": "",
+        "tech_stack_clusters": [],
+    }, complete=False)
+
+
+def _llm_plan(parse_mode: str = None) -> str:
+    """Which LLM calls to make: structured (sections only), two_call or combined."""
+    if SKILL_EXTRACTOR == "local" and not SKILL_LLM_ENRICH:
+        return "structured"
+    if (parse_mode or PARSE_MODE) == "two_call":
+        return "two_call"
+    return "combined"
+
+
+def _assemble(resume_text: str, structured: Dict[str, Any], llm_skills: Optional[List[str]]) -> ParsedResume:
+    # llm_skills is None when the exact-skills answer was unreadable
+    complete = llm_skills is not None and not structured.get("_fallback")
+    llm_skills = llm_skills or []
+    use_local_skills = SKILL_EXTRACTOR == "local"
+
+    local_skills = get_skill_matcher().exact_skills(resume_text) if use_local_skills else []
+    skills_exact = _merge_skills(local_skills, llm_skills)
+
+    # Backfill if neither the lexicon nor the LLM found skills
     if not skills_exact:
         # fallback: use structured["skills_extracted"] as approximate
         skills_exact = structured.get("skills_extracted", [])
 
-    return {
+    return ParsedResume({
         "resume_text": structured.get("clean_text", resume_text),
         "skills_raw_exact": skills_exact,
+        "skills_canonical": [
+            get_skill_matcher().canonicalize(sk) or sk for sk in skills_exact
+        ],
         "skills_grouped": structured.get("skills_extracted", []),
         "education": structured.get("education", []),
         "experience": structured.get("experience", []),
@@ -293,4 +580,70 @@ def parse_resume(uploaded_file_or_text) -> Dict[str, Any]:
         "summary_points": structured.get("summary_points", []),
         "detected_resume_domain": structured.get("detected_resume_domain", ""),
         "tech_stack_clusters": structured.get("tech_stack_clusters", []),
-    }
+    }, complete)
+
+
+#############################################
+# CACHED ENTRYPOINT
+#############################################
+
+_parse_cache = LRUDiskCache("resume_parse", max_items=64)
+
+
+def parse_resume_cached(uploaded_file_or_text) -> Dict[str, Any]:
+    """
+    Same contract as parse_resume(), but keyed by a hash of the uploaded
+    bytes (or text) + parser_version().
+
+    Streamlit reruns the whole script on every widget change, so an
+    unchanged resume costs a hash lookup instead of two LLM calls.
+
+    Callers get their own copy, never the cached dict. Only complete
+    parses are stored: one that fell back to local output is parsed
+    again next time.
+    """
+    if hasattr(uploaded_file_or_text, "read"):
+        data = _read_upload_bytes(uploaded_file_or_text)
+        key = content_hash(parser_version(), "pdf", data)
+        source = io.BytesIO(data)
+    elif isinstance(uploaded_file_or_text, str):
+        key = content_hash(parser_version(), "text", uploaded_file_or_text)
+        source = uploaded_file_or_text
+    else:
+        return parse_resume(uploaded_file_or_text)
+
+    cached = _parse_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    parsed = parse_resume(source)
+
+    # don't pin a failed extraction or a fallback parse – a retry may succeed
+    if parsed.complete:
+        _parse_cache.set(key, copy.deepcopy(parsed))
+
+    return parsed
+
+
+async def parse_resume_cached_async(uploaded_file_or_text) -> Dict[str, Any]:
+    """parse_resume_cached() for asyncio callers; same store and keys."""
+    if hasattr(uploaded_file_or_text, "read"):
+        data = _read_upload_bytes(uploaded_file_or_text)
+        key = content_hash(parser_version(), "pdf", data)
+        source = io.BytesIO(data)
+    elif isinstance(uploaded_file_or_text, str):
+        key = content_hash(parser_version(), "text", uploaded_file_or_text)
+        source = uploaded_file_or_text
+    else:
+        return await parse_resume_async(uploaded_file_or_text)
+
+    cached = _parse_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    parsed = await parse_resume_async(source)
+
+    if parsed.complete:
+        _parse_cache.set(key, copy.deepcopy(parsed))
+
+    return parsed
@@ -2,27 +2,17 @@
 
 from typing import Dict, Any, List
 from string import Template
-import json
-from agents.openai_client import get_client
+from agents.cache_store import content_hash
+from agents.model_router import async_routed_client, route_version, routed_client
+from agents.schemas import RESUME_SCHEMA, structured_output, structured_output_async
 
 
-def build_resume_profile(
-    resume_text: str,
-    extracted_skills: str = "",
-    user_review_text: str = "",
-    user_insight_text: str = "",
-    parsed: Dict[str, Any] = None,
-) -> Dict[str, Any]:
+#############################################
+# PROMPT
+#############################################
 
+_RESUME_REALITY_TEMPLATE = Template(
     """
-    Stage 2: Resume Reality Engine
-    - Infer the resume's real domain, strengths, weaknesses, tech stack, and signals.
-    - RAW, honest, recruiter-style judgment (will be softened later).
-    """
-
-    client = get_client()
-
-    prompt_template = """
 You are HireSense's RESUME REALITY ENGINE.
 
 Your job:
@@ -56,43 +46,68 @@ Return ONLY valid JSON with this exact structure:
   "missing_signals_for_role": []  // generic gaps that would matter for most tech roles (even before knowing exact role)
 }
 """
+)
+
+# Pipeline checkpoints of the resume stage are invalidated whenever the
+# template or the route's models change.
+def resume_prompt_version() -> str:
+    return content_hash(route_version("resume_reality"), _RESUME_REALITY_TEMPLATE.template)
 
-    prompt = Template(prompt_template).substitute(
+
+def _resume_request(resume_text: str, extracted_skills: str) -> Dict[str, Any]:
+    """chat.completions.create() kwargs – shared by the sync and async agent."""
+    prompt = _RESUME_REALITY_TEMPLATE.substitute(
         extracted_skills=extracted_skills or "Not provided.",
         resume_text=resume_text or "Not provided.",
     )
 
-    response = client.chat.completions.create(
-        model="gpt-4.1",
+    return dict(
         messages=[{"role": "user", "content": prompt}],
         temperature=0.2,
         response_format={"type": "json_object"},
     )
 
-    raw = response.choices[0].message.content
-
-    try:
-        data = json.loads(raw)
-    except Exception:
-        try:
-            start = raw.find("{")
-            end = raw.rfind("}")
-            data = json.loads(raw[start : end + 1])
-        except Exception:
-            data = {}
-
-    defaults = {
-        "resume_domain": "",
-        "core_strengths_raw": [],
-        "core_weaknesses_raw": [],
-        "tech_stack_clusters": [],
-        "project_signals": [],
-        "seniority_signal": "",
-        "missing_signals_for_role": [],
-    }
-
-    for k, v in defaults.items():
-        if k not in data:
-            data[k] = v
 
+#############################################
+# RESUME REALITY AGENT
+#############################################
+
+def build_resume_profile(
+    resume_text: str,
+    extracted_skills: str = "",
+    user_review_text: str = "",
+    user_insight_text: str = "",
+    parsed: Dict[str, Any] = None,
+) -> Dict[str, Any]:
+
+    """
+    Stage 2: Resume Reality Engine
+    - Infer the resume's real domain, strengths, weaknesses, tech stack, and signals.
+    - RAW, honest, recruiter-style judgment (will be softened later).
+    """
+
+    client = routed_client("resume_reality")
+    request = _resume_request(resume_text, extracted_skills)
+
+    response = client.chat.completions.create(**request)
+
+    data, _ = structured_output(client, request, response.choices[0].message.content, RESUME_SCHEMA, "resume")
+    return data
+
+
+async def build_resume_profile_async(
+    resume_text: str,
+    extracted_skills: str = "",
+    user_review_text: str = "",
+    user_insight_text: str = "",
+    parsed: Dict[str, Any] = None,
+) -> Dict[str, Any]:
+    """build_resume_profile() on the event loop's shared AsyncOpenAI client."""
+
+    client = async_routed_client("resume_reality")
+    request = _resume_request(resume_text, extracted_skills)
+
+    response = await client.chat.completions.create(**request)
+
+    data, _ = await structured_output_async(client, request, response.choices[0].message.content, RESUME_SCHEMA, "resume")
     return data
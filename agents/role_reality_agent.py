@@ -5,35 +5,21 @@
 
 from typing import Dict, Any, List
 from string import Template
-import json
-from agents.openai_client import get_client
+import copy
+import asyncio
+import weakref
+from agents.model_router import async_routed_client, route_version, routed_client
+from agents.cache_store import KeyLocks, LRUDiskCache, content_hash, normalize_text
+from agents.schemas import ROLE_SCHEMA, StructuredResult, complete, structured_output, structured_output_async
+from agents.snippet_select import SELECTOR_VERSION, select_snippets
 
 
-def build_role_profile(
-    company: str,
-    role: str,
-    results: List[Dict[str, str]],
-    user_review_text: str = "",
-    user_insight_text: str = "",
-) -> Dict[str, Any]:
-    """
-    Builds the REAL role expectations using:
-    - SERP API search results
-    - Public interview review patterns
-    - User-provided review (optional)
-    - User-provided insights (optional)
-    """
-
-    client = get_client()
-
-    # Convert search results to text
-    collected_reviews = ""
-    for r in results:
-        collected_reviews += f"[{r.get('source')}] {r.get('title')}\n{r.get('snippet')}\n\n"
+#############################################
+# PROMPT
+#############################################
 
-    # -------------- PROMPT TEMPLATE -------------------
-    tmpl = Template(
-        """
+_ROLE_REALITY_TEMPLATE = Template(
+    """
 You are the ROLE REALITY ENGINE for HireSense.
 
 Your job is to create a **realistic role profile** for the company and role below,
@@ -84,9 +70,37 @@ RULES:
 - Include the most common interview concepts, rounds, and themes.
 - Summarize ROUND BY ROUND (OA, DSA, System Design, Behavioral, ML/DE rounds).
 """
-    )
+)
+
+# Cached role profiles are invalidated whenever the template, the route's
+# models or the snippet selection settings change. Computed per key: routes
+# can change at runtime (configure_routing).
+def role_prompt_version() -> str:
+    return content_hash(route_version("role_reality"), _ROLE_REALITY_TEMPLATE.template, SELECTOR_VERSION)
 
-    prompt = tmpl.substitute(
+
+#############################################
+# ROLE REALITY AGENT
+#############################################
+
+def _role_request(
+    company: str,
+    role: str,
+    results: List[Dict[str, str]],
+    user_review_text: str,
+    user_insight_text: str,
+) -> Dict[str, Any]:
+    """chat.completions.create() kwargs – shared by the sync and async agent."""
+
+    # Keep only relevant, distinct snippets within the token budget
+    selected = select_snippets(company, role, results)
+
+    # Convert search results to text
+    collected_reviews = ""
+    for r in selected:
+        collected_reviews += f"[{r.get('source')}] {r.get('title')}\n{r.get('snippet')}\n\n"
+
+    prompt = _ROLE_REALITY_TEMPLATE.substitute(
         company=company,
         role=role,
         collected_reviews=collected_reviews.replace('"', "'"),
@@ -94,31 +108,171 @@ RULES:
         user_insight_text=user_insight_text.replace('"', "'"),
     )
 
-    # ------------------- LLM CALL -------------------
-    response = client.chat.completions.create(
-        model="gpt-4.1",
+    return dict(
         messages=[{"role": "user", "content": prompt}],
         temperature=0.2,
         response_format={"type": "json_object"},
     )
 
-    raw = response.choices[0].message.content
-
-    try:
-        data = json.loads(raw)
-    except Exception:
-        data = {
-            "rounds": [],
-            "round_count": "",
-            "difficulty": "",
-            "skills_most_often_required": [],
-            "skills_nice_to_have": [],
-            "common_interview_themes": [],
-            "common_questions_patterns": [],
-            "projects_they_like": [],
-            "education_or_experience_expectations": [],
-            "seniority_pattern": "",
-            "public_interview_summary": "",
-        }
 
+def build_role_profile(
+    company: str,
+    role: str,
+    results: List[Dict[str, str]],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+) -> StructuredResult:
+    """
+    Builds the REAL role expectations using:
+    - SERP API search results
+    - Public interview review patterns
+    - User-provided review (optional)
+    - User-provided insights (optional)
+
+    `failed` on the result lists fields the model never answered validly
+    (left at their defaults).
+    """
+
+    client = routed_client("role_reality")
+    request = _role_request(company, role, results, user_review_text, user_insight_text)
+
+    # ------------------- LLM CALL -------------------
+    response = client.chat.completions.create(**request)
+
+    data, _ = structured_output(client, request, response.choices[0].message.content, ROLE_SCHEMA, "role")
+    return data
+
+
+async def build_role_profile_async(
+    company: str,
+    role: str,
+    results: List[Dict[str, str]],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+) -> StructuredResult:
+    """build_role_profile() on the event loop's shared AsyncOpenAI client."""
+
+    client = async_routed_client("role_reality")
+    request = _role_request(company, role, results, user_review_text, user_insight_text)
+
+    response = await client.chat.completions.create(**request)
+
+    data, _ = await structured_output_async(client, request, response.choices[0].message.content, ROLE_SCHEMA, "role")
+    return data
+
+
+#############################################
+# SHARED ROLE-PROFILE CACHE
+#
+# The role profile depends only on company, role and search results –
+# not on the candidate – so it is computed once and shared.
+#############################################
+
+_role_cache = LRUDiskCache("role_profile", max_items=256)
+_key_locks = KeyLocks()
+# async single-flight: per event loop, cache key -> task building it
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def role_profile_cache_key(
+    company: str,
+    role: str,
+    results: List[Dict[str, str]],
+) -> str:
+    return content_hash(
+        role_prompt_version(),
+        normalize_text(company),
+        normalize_text(role),
+        content_hash(results),
+    )
+
+
+def build_role_profile_cached(
+    company: str,
+    role: str,
+    results: List[Dict[str, str]],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+) -> Dict[str, Any]:
+    """
+    build_role_profile() with a shared store keyed by
+    (normalized company, normalized role, hash of search results, prompt version).
+
+    User-contributed review/insight text changes the profile for that user
+    only, so those requests bypass the cache entirely.
+
+    Callers get their own copy, never the cached profile.
+    """
+    if user_review_text.strip() or user_insight_text.strip():
+        return build_role_profile(
+            company=company,
+            role=role,
+            results=results,
+            user_review_text=user_review_text,
+            user_insight_text=user_insight_text,
+        )
+
+    key = role_profile_cache_key(company, role, results)
+
+    cached = _role_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    # single-flight: concurrent candidates for the same role wait for one call
+    with _key_locks.hold(key):
+        cached = _role_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        data = build_role_profile(company=company, role=role, results=results)
+
+        # a partly defaulted or truncated profile would be served to every
+        # later candidate for this role – only complete ones are shared
+        if complete(data) and any(data.values()):
+            _role_cache.set(key, copy.deepcopy(data))
+
+    return data
+
+
+async def build_role_profile_cached_async(
+    company: str,
+    role: str,
+    results: List[Dict[str, str]],
+    user_review_text: str = "",
+    user_insight_text: str = "",
+) -> Dict[str, Any]:
+    """build_role_profile_cached() for asyncio callers; same store and key."""
+    if user_review_text.strip() or user_insight_text.strip():
+        return await build_role_profile_async(
+            company=company,
+            role=role,
+            results=results,
+            user_review_text=user_review_text,
+            user_insight_text=user_insight_text,
+        )
+
+    key = role_profile_cache_key(company, role, results)
+
+    cached = _role_cache.get(key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    # single-flight within the loop: later callers await the first call's task
+    inflight = _inflight.setdefault(asyncio.get_running_loop(), {})
+    task = inflight.get(key)
+    if task is None:
+        task = inflight[key] = asyncio.ensure_future(_build_and_store_async(key, company, role, results))
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+
+    # shield: one cancelled caller must not cancel the call the others wait on;
+    # every waiter gets its own copy of the one result
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+async def _build_and_store_async(key: str, company: str, role: str, results: List[Dict[str, str]]) -> Dict[str, Any]:
+    data = await build_role_profile_async(company=company, role=role, results=results)
+    if complete(data) and any(data.values()):
+        _role_cache.set(key, copy.deepcopy(data))
     return data
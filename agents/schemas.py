@@ -0,0 +1,323 @@
+# agents/schemas.py
+#
+# Output schemas of the LLM stages, and the structured-output path every
+# agent sends its JSON answer through:
+#
+#   raw text -> json.loads, else json_utils.repair_json (fences, trailing
+#            commas, truncation – no call)
+#            -> validate() against the stage's schema
+#            -> one re-ask for ONLY the fields still missing or invalid
+#            -> defaults for whatever is left, counted per field
+#            (hiresense_structured_defaulted_total)
+#
+# A schema is a dict mirroring the prompt's OUTPUT FORMAT:
+#
+#   str      string (numbers are stringified, null becomes "")
+#   [str]    list of strings (a lone string becomes a one-item list)
+#   [dict]   list of objects with any keys
+#   [{...}]  list of objects with these fields (missing ones defaulted)
+#   {...}    nested object
+#
+# Keys outside the schema are kept as they are.
+
+import os
+import json
+import logging
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents import telemetry
+from agents.json_utils import repair_json_truncated
+
+logger = logging.getLogger("hiresense.schemas")
+
+Schema = Dict[str, Any]
+
+# HIRESENSE_STRUCTURED_REASK=0: default failed fields without asking again
+REASK_ENABLED = os.getenv("HIRESENSE_STRUCTURED_REASK", "1") != "0"
+
+
+#############################################
+# SCHEMAS
+#############################################
+
+ROLE_SCHEMA: Schema = {
+    "rounds": [dict],
+    "round_count": str,
+    "difficulty": str,
+    "skills_most_often_required": [str],
+    "skills_nice_to_have": [str],
+    "common_interview_themes": [str],
+    "common_questions_patterns": [str],
+    "projects_they_like": [str],
+    "education_or_experience_expectations": [str],
+    "seniority_pattern": str,
+    "public_interview_summary": str,
+}
+
+RESUME_SCHEMA: Schema = {
+    "resume_domain": str,
+    "core_strengths_raw": [str],
+    "core_weaknesses_raw": [str],
+    "tech_stack_clusters": [str],
+    "project_signals": [str],
+    "seniority_signal": str,
+    "missing_signals_for_role": [str],
+}
+
+# the LLM part of the fit profile; scores are computed, not parsed
+FIT_SCHEMA: Schema = {
+    "seniority_fit": str,
+    "domain_fit": str,
+    "experience_fit": str,
+    "project_fit": str,
+    "overall_alignment_notes": [str],
+    "matched_strengths": [str],
+    "mismatched_risks": [str],
+    "priority_gaps": [str],
+    "missing_role_requirements": [str],
+}
+
+SUMMARIES_SCHEMA: Schema = {
+    "intro_message": str,
+    "friendly_summary": str,
+    "role_expectations_explained": str,
+    "resume_strengths_explained": str,
+    "resume_gaps_explained": str,
+    "fit_explained": str,
+}
+
+ACTION_PLAN_SCHEMA: Schema = {
+    "action_plan": {
+        "quick_wins": [str],
+        "4_week_plan": [str],
+        "resume_fixes": [str],
+        "project_ideas": [str],
+    },
+}
+
+ROUND_DEEP_DIVE_SCHEMA: Schema = {
+    "round_deep_dive": [
+        {
+            "round_name": str,
+            "round_type": str,
+            "difficulty": str,
+            "what_they_look_for": [str],
+            "common_concepts": [str],
+            "question_patterns": [str],
+            "example_question_themes": [str],
+            "tips": [str],
+        }
+    ],
+}
+
+ROUND_TIPS_SCHEMA: Schema = {
+    "round_tips": [{"round_name": str, "tips": [str]}],
+}
+
+
+#############################################
+# VALIDATION
+#############################################
+
+_INVALID = object()
+
+
+class StructuredResult(dict):
+    """A validated answer, plus the fields that still hold defaults (`failed`)."""
+
+    def __init__(self, data: Any = (), failed: Any = ()):
+        super().__init__(data)
+        self.failed = list(failed)
+
+
+def complete(data: Any) -> bool:
+    """False for a StructuredResult with defaulted fields; other dicts count as complete."""
+    return not getattr(data, "failed", None)
+
+
+def _default(spec: Any) -> Any:
+    if isinstance(spec, dict):
+        return {k: _default(v) for k, v in spec.items()}
+    if isinstance(spec, list):
+        return []
+    if spec is dict:
+        return {}
+    return ""
+
+
+def _skeleton(spec: Any) -> Any:
+    """Format example for a re-ask prompt: like _default, but lists show their items."""
+    if isinstance(spec, dict):
+        return {k: _skeleton(v) for k, v in spec.items()}
+    if isinstance(spec, list):
+        return [] if spec[0] is str else [_skeleton(spec[0])]
+    return _default(spec)
+
+
+def _coerce(spec: Any, value: Any) -> Any:
+    """`value` in the shape of `spec` (lossless fixes only), or _INVALID."""
+    if value is None:
+        return _default(spec)
+
+    if spec is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return _INVALID
+
+    if spec is dict:
+        return value if isinstance(value, dict) else _INVALID
+
+    if isinstance(spec, list):
+        if isinstance(value, str) and spec[0] is str:
+            return [value] if value.strip() else []
+        if not isinstance(value, list):
+            return _INVALID
+        items = [_coerce(spec[0], v) for v in value]
+        kept = [v for v in items if v is not _INVALID]
+        # a few bad items are dropped; a list of nothing but bad items is invalid
+        return kept if kept or not value else _INVALID
+
+    # nested object
+    if not isinstance(value, dict):
+        return _INVALID
+    out = dict(value)
+    for k, sub in spec.items():
+        v = _coerce(sub, value[k]) if k in value else _default(sub)
+        if v is _INVALID:
+            return _INVALID
+        out[k] = v
+    return out
+
+
+def defaults(schema: Schema) -> Dict[str, Any]:
+    return _default(schema)
+
+
+def validate(schema: Schema, data: Any) -> Tuple[Dict[str, Any], List[str]]:
+    """(data in the schema's shape, top-level fields that were missing or invalid and got defaults)."""
+    if not isinstance(data, dict):
+        data = {}
+    out = dict(data)
+    failed: List[str] = []
+    for key, spec in schema.items():
+        value = _coerce(spec, data[key]) if key in data else _INVALID
+        if value is _INVALID:
+            failed.append(key)
+            value = _default(spec)
+        out[key] = value
+    return out, failed
+
+
+def parse_output(raw: Optional[str], schema: Schema, name: str) -> Tuple[Dict[str, Any], List[str]]:
+    """validate() of the model's text, repaired locally if json.loads rejects it."""
+    truncated = False
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        data, truncated = repair_json_truncated(raw or "")
+        telemetry.STRUCTURED_REPAIRS.inc(schema=name, status="ok" if isinstance(data, dict) else "failed")
+
+    # a top level that is not an object (a list, a bare string) fails every field
+    out, failed = validate(schema, data)
+    if truncated and isinstance(data, dict):
+        # the field the answer was cut off in parses, but may be missing items
+        last = next((k for k in reversed(list(data)) if k in schema), None)
+        if last is not None and last not in failed:
+            failed.append(last)
+    return out, failed
+
+
+#############################################
+# TARGETED RE-ASK
+#
+# The failed fields are asked for in a follow-up turn of the same
+# conversation, so the model writes only those instead of the whole
+# document again. One round at most; what still fails keeps its default.
+#############################################
+
+_REASK_TEMPLATE = Template(
+    """
+Your previous answer was missing or had invalid values for: $fields.
+
+Return ONLY valid JSON with exactly these keys, in this format:
+$skeleton
+"""
+)
+
+
+def reask_request(request: Dict[str, Any], raw: Optional[str], schema: Schema, failed: List[str]) -> Dict[str, Any]:
+    """chat.completions.create() kwargs asking again for the `failed` fields of `request`."""
+    messages = list(request["messages"])
+    if raw:
+        messages.append({"role": "assistant", "content": raw})
+    messages.append(
+        {
+            "role": "user",
+            "content": _REASK_TEMPLATE.substitute(
+                fields=", ".join(failed),
+                skeleton=json.dumps({k: _skeleton(schema[k]) for k in failed}, ensure_ascii=False, indent=2),
+            ),
+        }
+    )
+    out = {k: v for k, v in request.items() if k not in ("stream", "stream_options")}
+    out["messages"] = messages
+    return out
+
+
+def _merge_reask(
+    data: Dict[str, Any], failed: List[str], raw: Optional[str], schema: Schema, name: str
+) -> Tuple[Dict[str, Any], List[str]]:
+    fixed, still = parse_output(raw, {k: schema[k] for k in failed}, name)
+    for k in failed:
+        if k not in still:
+            data[k] = fixed[k]
+    return data, still
+
+
+def _defaulted(name: str, failed: List[str]) -> None:
+    for k in failed:
+        telemetry.STRUCTURED_DEFAULTED.inc(schema=name, field=k)
+    if failed:
+        logger.warning(f"{name}: no valid value for {failed}; using defaults")
+
+
+def structured_output(
+    client: Any, request: Dict[str, Any], raw: Optional[str], schema: Schema, name: str
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    The answer to `request` (text `raw`) as a dict in the shape of `schema`,
+    re-asking `client` once for the fields that failed. Returns
+    (data, fields that still failed and hold defaults); `data` is a
+    StructuredResult carrying the same list, so callers that cache it
+    can tell a degraded answer from a complete one.
+    """
+    data, failed = parse_output(raw, schema, name)
+    if failed and REASK_ENABLED:
+        telemetry.STRUCTURED_REASKS.inc(schema=name)
+        try:
+            resp = client.chat.completions.create(**reask_request(request, raw, schema, failed))
+            data, failed = _merge_reask(data, failed, resp.choices[0].message.content, schema, name)
+        except Exception as e:
+            # the first answer already arrived; keep it with defaults
+            logger.warning(f"{name}: re-ask for {failed} failed ({type(e).__name__}: {e})")
+    _defaulted(name, failed)
+    return StructuredResult(data, failed), failed
+
+
+async def structured_output_async(
+    client: Any, request: Dict[str, Any], raw: Optional[str], schema: Schema, name: str
+) -> Tuple[Dict[str, Any], List[str]]:
+    """structured_output() with an async client."""
+    data, failed = parse_output(raw, schema, name)
+    if failed and REASK_ENABLED:
+        telemetry.STRUCTURED_REASKS.inc(schema=name)
+        try:
+            resp = await client.chat.completions.create(**reask_request(request, raw, schema, failed))
+            data, failed = _merge_reask(data, failed, resp.choices[0].message.content, schema, name)
+        except Exception as e:
+            logger.warning(f"{name}: re-ask for {failed} failed ({type(e).__name__}: {e})")
+    _defaulted(name, failed)
+    return StructuredResult(data, failed), failed
@@ -1,34 +1,151 @@
 # agents/search_agent.py
 
 import os
-import requests
-from typing import List, Dict
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Any, List, Dict, Optional
 
+from agents.openai_client import load_env
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger("hiresense.search")
 
 SERPAPI_KEY = os.getenv("SERPAPI_API_KEY")
 
+# Overridable so tests can point at a local fake SerpAPI server.
+SERPAPI_URL = os.getenv("SERPAPI_URL", "https://serpapi.com/search")
 
-def _query_serpapi(q: str, num_results: int = 8) -> List[Dict[str, str]]:
-    """Low-level helper to query SerpAPI Google Search."""
-    if not SERPAPI_KEY:
-        # Fail soft: if no key, return empty list so app still runs
-        return []
+# Max in-flight SerpAPI requests (thread pool size == HTTP pool size).
+SEARCH_POOL_SIZE = int(os.getenv("HIRESENSE_SEARCH_POOL_SIZE", "8"))
+
+# Overall wall-clock budget for one search_public_interview_data() call.
+SEARCH_DEADLINE_SECONDS = float(os.getenv("HIRESENSE_SEARCH_DEADLINE", "20"))
+
+_CONNECT_TIMEOUT = 3.05
+_READ_TIMEOUT = 15.0
+
+_session: Optional["requests.Session"] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_init_lock = threading.Lock()
+_warned_no_key = False
+
+
+def _get_session() -> "requests.Session":
+    """Shared keep-alive session with a bounded connection pool."""
+    global _session
+    if _session is None:
+        with _init_lock:
+            if _session is None:
+                # imported on first search, not at app start-up
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=2,
+                    pool_maxsize=SEARCH_POOL_SIZE,
+                    pool_block=True,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=SEARCH_POOL_SIZE,
+                    thread_name_prefix="hiresense-serpapi",
+                )
+    return _executor
+
+
+def _serpapi_key() -> Optional[str]:
+    # .env is read lazily (first LLM call or first search), not at import
+    load_env()
+    return os.getenv("SERPAPI_API_KEY")
+
+
+def _warn_no_key() -> None:
+    global _warned_no_key
+    if not _warned_no_key:
+        _warned_no_key = True
+        logger.warning("SERPAPI_API_KEY is not set; public interview search is skipped")
+
+
+class SearchResults(list):
+    """Search results, plus whether every query answered (`complete`)."""
+
+    def __init__(self, results: Any = (), complete: bool = True):
+        super().__init__(results)
+        self.complete = complete
 
-    url = "https://serpapi.com/search"
+
+def _query_serpapi(
+    q: str,
+    num_results: int = 8,
+    read_timeout: float = _READ_TIMEOUT,
+    deadline_at: Optional[float] = None,
+) -> List[Dict[str, str]]:
+    """
+    Low-level helper to query SerpAPI Google Search.
+
+    With `deadline_at` (time.monotonic()), a query that only starts once
+    the deadline has passed is skipped, and connect/read timeouts never
+    run past it – so queries abandoned by search_public_interview_data()
+    free their worker and connection soon after.
+    """
+    return _serpapi_query(q, num_results, read_timeout, deadline_at) or []
+
+
+def _serpapi_query(
+    q: str,
+    num_results: int,
+    read_timeout: float,
+    deadline_at: Optional[float],
+) -> Optional[List[Dict[str, str]]]:
+    """_query_serpapi(), but None when the query got no answer (no key, error, deadline)."""
+    api_key = SERPAPI_KEY or _serpapi_key()
+    if not api_key:
+        # Fail soft: if no key, return no results so app still runs
+        _warn_no_key()
+        return None
+
+    connect_timeout = _CONNECT_TIMEOUT
+    if deadline_at is not None:
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            return None
+        connect_timeout = min(connect_timeout, remaining)
+        read_timeout = min(read_timeout, remaining)
+
+    url = SERPAPI_URL
     params = {
         "engine": "google",
         "q": q,
-        "api_key": SERPAPI_KEY,
+        "api_key": api_key,
         "num": num_results,
         "hl": "en",
     }
 
     try:
-        resp = requests.get(url, params=params, timeout=15)
+        resp = _get_session().get(
+            url,
+            params=params,
+            timeout=(connect_timeout, read_timeout),
+        )
         resp.raise_for_status()
         data = resp.json()
     except Exception:
-        return []
+        return None
 
     results: List[Dict[str, str]] = []
 
@@ -65,7 +182,26 @@ def _query_serpapi(q: str, num_results: int = 8) -> List[Dict[str, str]]:
     return results
 
 
-def search_public_interview_data(company: str, role: str) -> List[Dict[str, str]]:
+def build_search_queries(company: str, role: str) -> List[str]:
+    """The focused query set used for one company/role search."""
+    base = f"{company} {role}".strip()
+
+    return [
+        f"{base} interview experience",
+        f"{base} interview rounds",
+        f"site:glassdoor.com {base} interview",
+        f"site:reddit.com {company} interview experience",
+        f"site:geeksforgeeks.org {company} interview experience",
+        f"site:leetcode.com/discuss {company} interview",
+        f"{company} {role} interview experience blog",
+    ]
+
+
+def search_public_interview_data(
+    company: str,
+    role: str,
+    deadline: Optional[float] = None,
+) -> SearchResults:
     """
     High-level search for public interview reviews & patterns.
 
@@ -75,27 +211,45 @@ def search_public_interview_data(company: str, role: str) -> List[Dict[str, str]
     - GeeksforGeeks
     - LeetCode Discuss
     - General interview-experience blogs
+
+    All queries are issued concurrently. Whatever has come back when
+    `deadline` seconds elapse is returned (partial results); slower
+    queries are dropped. `complete` on the result is False when any
+    query timed out or failed.
     """
 
     if not company and not role:
-        return []
+        return SearchResults()
 
-    base = f"{company} {role}".strip()
+    if deadline is None:
+        deadline = SEARCH_DEADLINE_SECONDS
 
-    queries = [
-        f"{base} interview experience",
-        f"{base} interview rounds",
-        f"site:glassdoor.com {base} interview",
-        f"site:reddit.com {company} interview experience",
-        f"site:geeksforgeeks.org {company} interview experience",
-        f"site:leetcode.com/discuss {company} interview",
-        f"{company} {role} interview experience blog",
+    queries = build_search_queries(company, role)
+
+    executor = _get_executor()
+    deadline_at = time.monotonic() + deadline
+    futures = [
+        executor.submit(_serpapi_query, q, 8, _READ_TIMEOUT, deadline_at)
+        for q in queries
     ]
 
-    all_results: List[Dict[str, str]] = []
+    done, not_done = wait(futures, timeout=deadline)
+    for f in not_done:
+        f.cancel()
+    complete = not not_done
 
-    for q in queries:
-        all_results.extend(_query_serpapi(q, num_results=8))
+    # Keep query order so dedup picks the same "first" result as before
+    all_results: List[Dict[str, str]] = []
+    for f in futures:
+        if f in done and not f.cancelled():
+            try:
+                results = f.result()
+            except Exception:
+                results = None
+            if results is None:
+                complete = False
+                continue
+            all_results.extend(results)
 
     # Deduplicate by URL
     seen_urls = set()
@@ -107,4 +261,57 @@ def search_public_interview_data(company: str, role: str) -> List[Dict[str, str]
         seen_urls.add(url)
         deduped.append(r)
 
-    return deduped
+    return SearchResults(deduped, complete)
+
+
+#############################################
+# CACHED SEARCH (TTL + stale-while-revalidate)
+#############################################
+
+_search_cache = None
+
+
+def get_search_cache():
+    """Process-wide search result cache (created on first use)."""
+    global _search_cache
+    if _search_cache is None:
+        with _init_lock:
+            if _search_cache is None:
+                from agents.search_cache import SearchResultCache
+                _search_cache = SearchResultCache()
+    return _search_cache
+
+
+def search_cache_key(company: str, role: str) -> str:
+    from agents.cache_store import content_hash, normalize_text
+
+    company_n, role_n = normalize_text(company), normalize_text(role)
+    # the query set is part of the key, so editing the queries invalidates entries
+    return content_hash("serpapi", company_n, role_n, build_search_queries(company_n, role_n))
+
+
+def cached_search_public_interview_data(company: str, role: str) -> List[Dict[str, str]]:
+    """
+    search_public_interview_data() behind a TTL cache keyed on the
+    normalized company/role. Hot companies are answered from cache;
+    stale entries are served while a background refresh runs.
+
+    Only complete results are stored: a search cut short by the deadline
+    or a failing query is returned once, then searched again next time,
+    instead of standing in for the full result set for days.
+    """
+    if not company and not role:
+        return []
+
+    return get_search_cache().get_or_fetch(
+        search_cache_key(company, role),
+        lambda: search_public_interview_data(company, role),
+        keep=_keep_search_results,
+    )
+
+
+def _keep_search_results(results: List[Dict[str, str]]) -> bool:
+    if results and not getattr(results, "complete", True):
+        logger.info("search incomplete (deadline or failed queries); not caching %d results", len(results))
+        return False
+    return bool(results)
@@ -0,0 +1,173 @@
+# agents/search_cache.py
+#
+# SQLite-backed TTL cache for public interview search results.
+#
+#   age <= ttl                -> fresh hit
+#   ttl < age <= ttl + stale  -> stale hit, served immediately while a
+#                                background thread refreshes the entry
+#   older / missing           -> miss, fetched synchronously
+#
+# Entries are evicted least-recently-used once max_entries is exceeded.
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from agents.cache_store import CACHE_DIR
+
+
+DEFAULT_TTL_SECONDS = float(os.getenv("HIRESENSE_SEARCH_TTL", str(6 * 3600)))
+DEFAULT_STALE_SECONDS = float(os.getenv("HIRESENSE_SEARCH_STALE_TTL", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("HIRESENSE_SEARCH_CACHE_SIZE", "2000"))
+
+
+class SearchResultCache:
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        stale_ttl: float = DEFAULT_STALE_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path or CACHE_DIR / "search_cache.sqlite3")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.counters: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "evictions": 0,
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_results (
+                    key         TEXT PRIMARY KEY,
+                    value       TEXT NOT NULL,
+                    created_at  REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_search_accessed ON search_results(accessed_at)"
+            )
+            self._conn.commit()
+
+    # ---------- storage ----------
+
+    def _load(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM search_results WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "UPDATE search_results SET accessed_at = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                self._conn.commit()
+        if row is None:
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM search_results WHERE key IN ("
+                    "SELECT key FROM search_results ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.counters["evictions"] += overflow
+            self._conn.commit()
+
+    # ---------- read-through ----------
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        keep: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Return the cached value for `key`, calling `fetch()` on a miss.
+        Fetch results are stored only if `keep(value)` (default: non-empty),
+        so a missing API key or an outage doesn't get pinned for a whole
+        TTL; the rest are returned but not stored.
+        """
+        keep = keep or bool
+        value, created_at = self._load(key)
+        age = None if created_at is None else time.time() - created_at
+
+        if age is not None and age <= self.ttl:
+            self._bump("hits")
+            return value
+
+        if age is not None and age <= self.ttl + self.stale_ttl:
+            self._bump("stale_hits")
+            self._refresh_in_background(key, fetch, keep)
+            return value
+
+        self._bump("misses")
+        value = fetch()
+        if keep(value):
+            self.set(key, value)
+        return value
+
+    def _refresh_in_background(self, key: str, fetch: Callable[[], Any], keep: Callable[[Any], bool]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def worker():
+            try:
+                value = fetch()
+                # an incomplete refresh leaves the stale entry in place
+                if keep(value):
+                    self.set(key, value)
+                self._bump("refreshes")
+            except Exception as e:
+                print("Search cache refresh failed:", e)
+                self._bump("refresh_failures")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=worker, name="hiresense-search-refresh", daemon=True).start()
+
+    # ---------- counters ----------
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self.counters)
+            out["entries"] = self._conn.execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+        return out
@@ -0,0 +1,345 @@
+# agents/skill_lexicon.py
+#
+# Deterministic skill matcher used on the parse hot path.
+#
+# A curated lexicon (canonical name -> aliases) is compiled into ONE
+# regex shaped like a trie of the lowercased aliases, so a resume is
+# scanned in a single left-to-right pass inside the C regex engine,
+# preferring the longest alias at each position ("Google Cloud Platform"
+# over "Google Cloud").
+
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+
+#############################################
+# LEXICON
+#############################################
+
+# canonical name -> aliases (the canonical name is always an alias too)
+SKILL_LEXICON: Dict[str, List[str]] = {
+    # ---- languages ----
+    "Python": ["Python", "Python3", "Python 3"],
+    "Java": ["Java"],
+    "JavaScript": ["JavaScript", "Javascript", "JS", "ES6"],
+    "TypeScript": ["TypeScript", "TS"],
+    "C": ["C"],
+    "C++": ["C++", "CPP"],
+    "C#": ["C#", "CSharp", "C Sharp"],
+    "Go": ["Go", "Golang"],
+    "Rust": ["Rust"],
+    "Ruby": ["Ruby"],
+    "PHP": ["PHP"],
+    "Kotlin": ["Kotlin"],
+    "Swift": ["Swift"],
+    "Scala": ["Scala"],
+    "R": ["R"],
+    "MATLAB": ["MATLAB", "Matlab"],
+    "Bash": ["Bash", "Shell Scripting", "Shell"],
+    "SQL": ["SQL"],
+    "HTML": ["HTML", "HTML5"],
+    "CSS": ["CSS", "CSS3"],
+    "Dart": ["Dart"],
+    "Perl": ["Perl"],
+    "Haskell": ["Haskell"],
+    "Elixir": ["Elixir"],
+    "Julia": ["Julia"],
+    "Solidity": ["Solidity"],
+    # ---- frontend / mobile ----
+    "React": ["React", "React.js", "ReactJS"],
+    "React Native": ["React Native"],
+    "Angular": ["Angular", "AngularJS"],
+    "Vue.js": ["Vue", "Vue.js", "VueJS"],
+    "Next.js": ["Next.js", "NextJS"],
+    "Svelte": ["Svelte"],
+    "Redux": ["Redux"],
+    "Tailwind CSS": ["Tailwind", "Tailwind CSS", "TailwindCSS"],
+    "Bootstrap": ["Bootstrap"],
+    "jQuery": ["jQuery"],
+    "Flutter": ["Flutter"],
+    "Android": ["Android"],
+    "iOS": ["iOS"],
+    "SwiftUI": ["SwiftUI"],
+    # ---- backend frameworks ----
+    "Node.js": ["Node.js", "NodeJS", "Node"],
+    "Express": ["Express", "Express.js", "ExpressJS"],
+    "Django": ["Django"],
+    "Flask": ["Flask"],
+    "FastAPI": ["FastAPI"],
+    "Spring Boot": ["Spring Boot", "SpringBoot"],
+    "Spring": ["Spring", "Spring Framework"],
+    "Ruby on Rails": ["Ruby on Rails", "Rails", "RoR"],
+    ".NET": [".NET", "ASP.NET", "dotnet", ".NET Core"],
+    "GraphQL": ["GraphQL"],
+    "REST APIs": ["REST", "RESTful", "REST API", "REST APIs", "RESTful APIs"],
+    "gRPC": ["gRPC"],
+    "Microservices": ["Microservices", "Microservice", "Micro-services"],
+    # ---- data stores ----
+    "PostgreSQL": ["PostgreSQL", "Postgres", "Postgresql"],
+    "MySQL": ["MySQL"],
+    "SQLite": ["SQLite"],
+    "Oracle": ["Oracle", "Oracle DB"],
+    "SQL Server": ["SQL Server", "MSSQL", "MS SQL"],
+    "MongoDB": ["MongoDB", "Mongo"],
+    "Redis": ["Redis"],
+    "Cassandra": ["Cassandra", "Apache Cassandra"],
+    "DynamoDB": ["DynamoDB", "Dynamo DB", "AWS DynamoDB"],
+    "Elasticsearch": ["Elasticsearch", "Elastic Search", "ElasticSearch", "OpenSearch"],
+    "Neo4j": ["Neo4j"],
+    "Snowflake": ["Snowflake"],
+    "BigQuery": ["BigQuery", "Google BigQuery", "Big Query"],
+    "Redshift": ["Redshift", "Amazon Redshift", "AWS Redshift"],
+    "Databricks": ["Databricks"],
+    "ClickHouse": ["ClickHouse"],
+    # ---- data engineering ----
+    "Apache Spark": ["Spark", "Apache Spark", "PySpark", "Spark SQL"],
+    "Hadoop": ["Hadoop", "Apache Hadoop", "HDFS"],
+    "Hive": ["Hive", "Apache Hive"],
+    "Kafka": ["Kafka", "Apache Kafka"],
+    "Flink": ["Flink", "Apache Flink"],
+    "Airflow": ["Airflow", "Apache Airflow"],
+    "dbt": ["dbt"],
+    "Beam": ["Apache Beam"],
+    "Kinesis": ["Kinesis", "AWS Kinesis"],
+    "ETL": ["ETL", "ELT"],
+    "Data Warehousing": ["Data Warehousing", "Data Warehouse"],
+    "Pandas": ["Pandas"],
+    "NumPy": ["NumPy", "Numpy"],
+    "Polars": ["Polars"],
+    "Dask": ["Dask"],
+    # ---- ML / AI ----
+    "Machine Learning": ["Machine Learning", "ML"],
+    "Deep Learning": ["Deep Learning", "DL"],
+    "NLP": ["NLP", "Natural Language Processing"],
+    "Computer Vision": ["Computer Vision", "CV"],
+    "PyTorch": ["PyTorch", "Pytorch", "Torch"],
+    "TensorFlow": ["TensorFlow", "Tensorflow", "TF"],
+    "Keras": ["Keras"],
+    "scikit-learn": ["scikit-learn", "Scikit-Learn", "sklearn", "Scikit Learn"],
+    "XGBoost": ["XGBoost", "xgboost"],
+    "LightGBM": ["LightGBM"],
+    "Hugging Face": ["Hugging Face", "HuggingFace", "Transformers"],
+    "LangChain": ["LangChain"],
+    "LLMs": ["LLM", "LLMs", "Large Language Models"],
+    "OpenAI API": ["OpenAI", "OpenAI API", "GPT-4", "ChatGPT"],
+    "MLflow": ["MLflow"],
+    "Kubeflow": ["Kubeflow"],
+    "SageMaker": ["SageMaker", "AWS SageMaker", "Amazon SageMaker"],
+    "Vertex AI": ["Vertex AI", "VertexAI"],
+    "OpenCV": ["OpenCV"],
+    "Statistics": ["Statistics", "Statistical Modeling"],
+    "A/B Testing": ["A/B Testing", "A/B Tests", "AB Testing"],
+    # ---- analytics / BI ----
+    "Tableau": ["Tableau"],
+    "Power BI": ["Power BI", "PowerBI"],
+    "Looker": ["Looker"],
+    "Excel": ["Excel", "MS Excel", "Microsoft Excel"],
+    "Jupyter": ["Jupyter", "Jupyter Notebook", "Jupyter Notebooks"],
+    # ---- cloud ----
+    "AWS": ["AWS", "Amazon Web Services"],
+    "GCP": ["GCP", "Google Cloud", "Google Cloud Platform"],
+    "Azure": ["Azure", "Microsoft Azure"],
+    "AWS Lambda": ["AWS Lambda", "Lambda"],
+    "Amazon S3": ["S3", "AWS S3", "Amazon S3"],
+    "Amazon EC2": ["EC2", "AWS EC2", "Amazon EC2"],
+    "AWS Glue": ["AWS Glue", "Glue"],
+    "Google Cloud Functions": ["Cloud Functions", "Google Cloud Functions"],
+    "Firebase": ["Firebase"],
+    "Heroku": ["Heroku"],
+    "Vercel": ["Vercel"],
+    # ---- DevOps / infra ----
+    "Docker": ["Docker"],
+    "Kubernetes": ["Kubernetes", "K8s", "k8s"],
+    "Terraform": ["Terraform"],
+    "Ansible": ["Ansible"],
+    "Jenkins": ["Jenkins"],
+    "GitHub Actions": ["GitHub Actions"],
+    "GitLab CI": ["GitLab CI", "GitLab CI/CD"],
+    "CI/CD": ["CI/CD", "CICD", "Continuous Integration"],
+    "Git": ["Git"],
+    "GitHub": ["GitHub", "Github"],
+    "Linux": ["Linux", "Unix"],
+    "Nginx": ["Nginx", "NGINX"],
+    "Prometheus": ["Prometheus"],
+    "Grafana": ["Grafana"],
+    "Datadog": ["Datadog"],
+    "Helm": ["Helm"],
+    "RabbitMQ": ["RabbitMQ"],
+    "Celery": ["Celery"],
+    # ---- practices ----
+    "System Design": ["System Design", "Distributed Systems"],
+    "Data Structures & Algorithms": ["Data Structures", "Algorithms", "DSA"],
+    "Object-Oriented Programming": ["OOP", "Object-Oriented Programming", "Object Oriented Programming"],
+    "Agile": ["Agile", "Scrum"],
+    "Unit Testing": ["Unit Testing", "PyTest", "pytest", "JUnit", "Jest"],
+    "Selenium": ["Selenium"],
+    "Figma": ["Figma"],
+    "Jira": ["Jira", "JIRA"],
+}
+
+# Short / common-English aliases that only count when written with this
+# exact capitalization ("Go" the language, not "go" the verb).
+CASE_SENSITIVE_ALIASES: Set[str] = {
+    "C", "R", "Go", "JS", "TS", "TF", "DL", "CV", "ML", "Node", "Swift", "Rust",
+    "Spring", "Shell", "Glue", "Lambda", "Torch", "Transformers", "Express",
+    "Agile", "Oracle", "Rails", "Helm", "Hive", "Dart", "Julia", "Excel",
+    "Flask", "Looker", "Git", "REST", "Scala", "Jest", "Statistics", "Algorithms",
+    "Data Structures", "Beam",
+}
+
+# Aliases that are also everyday words or first names ("Go to market",
+# "Julia Smith"): a hit only counts in a skills context – an item of a
+# list (",", "/", "|", bullets, "Skills: Go") or near a skills cue on the
+# same or previous line ("experience with Go", "Languages").
+CONTEXT_ALIASES: Set[str] = {
+    "C", "R", "Go", "Node", "Swift", "Rust", "Ruby", "Spring", "Shell", "Glue",
+    "Lambda", "Torch", "Express", "Oracle", "Rails", "Helm", "Hive", "Dart",
+    "Julia", "Excel", "Flask", "Looker", "Scala", "Jest", "Beam",
+}
+
+
+class SkillMatch(NamedTuple):
+    canonical: str   # lexicon name, e.g. "GCP"
+    text: str        # exactly as written in the resume, e.g. "Google Cloud"
+    start: int       # offsets into the scanned text
+    end: int
+
+
+#############################################
+# COMPILATION (trie -> single regex)
+#############################################
+
+# characters that continue a skill token: "C" must not match inside "C++", "R" not inside "R&D"
+_TOKEN_CHARS = r"\w+#&"
+
+# a context alias is a list item when a separator comes right before or after it
+_LIST_BEFORE = re.compile(r"(?:[,;/|+•·*(:]|^[ \t]*[-–])[ \t]*$", re.MULTILINE)
+_LIST_AFTER = re.compile(r"[ \t]*[,;/|+()]")
+_SKILL_CUE = re.compile(
+    r"\b(?:skills?|languages?|programming|technolog(?:y|ies)|tech|stack|tools?|"
+    r"frameworks?|libraries|proficient|proficiency|fluent|familiar|knowledge|"
+    r"experience (?:with|in)|written in|built (?:with|in|using)|using|coded in)\b",
+    re.IGNORECASE,
+)
+_CUE_WINDOW = 120
+
+
+def _trie_to_regex(node: Dict[str, Any]) -> str:
+    """Serialize a char trie; longer continuations are tried before stopping."""
+    terminal = "" in node
+    branches = []
+    for ch in sorted(k for k in node if k != ""):
+        branches.append(re.escape(ch) + _trie_to_regex(node[ch]))
+
+    if not branches:
+        return ""
+
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if terminal:
+        # greedy optional: longest alias first, backtrack to the shorter one
+        return "(?:" + body + ")?"
+    return body
+
+
+class SkillMatcher:
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, List[str]]] = None,
+        case_sensitive: Iterable[str] = (),
+        needs_context: Iterable[str] = (),
+    ):
+        lexicon = lexicon if lexicon is not None else SKILL_LEXICON
+
+        self._canonical_by_alias: Dict[str, str] = {}
+        self._case_sensitive: Dict[str, str] = {}
+        self._needs_context: Set[str] = {a.lower() for a in needs_context}
+        case_sensitive = set(case_sensitive)
+
+        trie: Dict[str, Any] = {}
+        for canonical, aliases in lexicon.items():
+            for alias in [canonical, *aliases]:
+                key = alias.lower()
+                self._canonical_by_alias.setdefault(key, canonical)
+                if alias in case_sensitive:
+                    self._case_sensitive[key] = alias
+                node = trie
+                for ch in key:
+                    node = node.setdefault(ch, {})
+                node[""] = True
+
+        pattern = rf"(?<![{_TOKEN_CHARS}])({_trie_to_regex(trie)})(?![{_TOKEN_CHARS}])"
+        self._regex = re.compile(pattern, re.IGNORECASE)
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """All lexicon hits with offsets, left to right, non-overlapping."""
+        out: List[SkillMatch] = []
+        if not text:
+            return out
+
+        lookup = self._canonical_by_alias
+        exact = self._case_sensitive
+        for m in self._regex.finditer(text):
+            written = m.group(1)
+            key = written.lower()
+            required = exact.get(key)
+            if required is not None and written != required:
+                continue
+            start, end = m.span(1)
+            context = key in self._needs_context
+            if (context or len(written) == 1) and "-" in (text[start - 1 : start], text[end : end + 1]):
+                # "C-level", "Go-to-market": the hyphen makes it part of another word
+                continue
+            if context and not _in_skill_context(text, start, end):
+                continue
+            canonical = lookup.get(key)
+            if canonical is not None:
+                out.append(SkillMatch(canonical, written, start, end))
+        return out
+
+    def exact_skills(self, text: str) -> List[str]:
+        """Unique skills as written in the text (first spelling wins), in order of appearance."""
+        seen: Set[str] = set()
+        out: List[str] = []
+        for m in self.find(text):
+            if m.canonical in seen:
+                continue
+            seen.add(m.canonical)
+            out.append(m.text)
+        return out
+
+    def canonical_skills(self, text: str) -> List[str]:
+        seen: Set[str] = set()
+        out: List[str] = []
+        for m in self.find(text):
+            if m.canonical not in seen:
+                seen.add(m.canonical)
+                out.append(m.canonical)
+        return out
+
+    def canonicalize(self, skill: str) -> Optional[str]:
+        """Map one free-form skill string to its canonical name, if known."""
+        return self._canonical_by_alias.get(" ".join(skill.split()).lower())
+
+
+def _in_skill_context(text: str, start: int, end: int) -> bool:
+    """A list item, or a skills cue earlier on this line or the line before."""
+    line_start = text.rfind("\n", 0, start) + 1
+    if _LIST_BEFORE.search(text, line_start, start) or _LIST_AFTER.match(text, end):
+        return True
+    # a section header ("Languages", "Tech Stack") usually sits on the line above
+    window_start = max(text.rfind("\n", 0, max(line_start - 1, 0)) + 1, start - _CUE_WINDOW)
+    return _SKILL_CUE.search(text, window_start, start) is not None
+
+
+_default_matcher: Optional[SkillMatcher] = None
+
+
+def get_skill_matcher() -> SkillMatcher:
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = SkillMatcher(SKILL_LEXICON, CASE_SENSITIVE_ALIASES, CONTEXT_ALIASES)
+    return _default_matcher
+
+
+def extract_skill_spans(text: str) -> List[SkillMatch]:
+    return get_skill_matcher().find(text)
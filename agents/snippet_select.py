@@ -0,0 +1,194 @@
+# agents/snippet_select.py
+#
+# Local pre-processing of search results before they go into the role
+# reality prompt (no LLM, no network).
+#
+#   1. BM25 relevance of each snippet against company / role / interview terms
+#   2. near-duplicate removal: word-shingle MinHash + LSH banding, keeping
+#      the higher-scoring copy
+#   3. greedy pick by score under per-source quotas and a token budget
+#
+# Seven queries x eight results is up to 56 snippets, many of them the
+# same Glassdoor / Reddit text surfacing under several queries.
+
+import os
+import re
+import math
+import zlib
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from agents.cache_store import content_hash
+from agents.prompt_budget import count_tokens
+
+
+SNIPPET_TOKEN_BUDGET = int(os.getenv("HIRESENSE_SNIPPET_BUDGET", "1500"))
+SNIPPET_PER_SOURCE = int(os.getenv("HIRESENSE_SNIPPET_PER_SOURCE", "5"))
+
+# estimated Jaccard similarity at/above which two snippets are duplicates
+DEDUP_THRESHOLD = float(os.getenv("HIRESENSE_SNIPPET_DEDUP", "0.7"))
+
+# sources with their own quota; anything else shares the "web" quota
+SOURCE_QUOTAS: Dict[str, int] = {
+    "glassdoor": SNIPPET_PER_SOURCE,
+    "reddit": SNIPPET_PER_SOURCE,
+    "leetcode_discuss": SNIPPET_PER_SOURCE,
+    "geeksforgeeks": SNIPPET_PER_SOURCE,
+    "blind": SNIPPET_PER_SOURCE,
+    "web": SNIPPET_PER_SOURCE,
+}
+
+# words that make a snippet useful for a role profile regardless of company
+INTERVIEW_TERMS = [
+    "interview", "round", "rounds", "onsite", "oa", "assessment", "coding",
+    "dsa", "system", "design", "behavioral", "questions", "asked", "hr",
+    "technical", "screening", "leetcode", "difficulty", "offer", "loop",
+]
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+LSH_BANDS = 16  # 16 bands x 4 rows: pairs at J=0.7 collide with p~0.98
+
+SELECTOR_VERSION = content_hash(
+    "snippet-select-1",
+    SNIPPET_TOKEN_BUDGET,
+    SNIPPET_PER_SOURCE,
+    DEDUP_THRESHOLD,
+    INTERVIEW_TERMS,
+    NUM_PERM,
+    LSH_BANDS,
+)
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall((text or "").lower())
+
+
+def _snippet_text(r: Dict[str, str]) -> str:
+    return f"{r.get('title') or ''}\n{r.get('snippet') or ''}"
+
+
+#############################################
+# BM25
+#############################################
+
+def bm25_scores(docs: Sequence[List[str]], query: Sequence[str]) -> np.ndarray:
+    n = len(docs)
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    lengths = np.array([len(d) for d in docs], dtype=np.float32)
+    avg_len = float(lengths.mean()) or 1.0
+    df = Counter(t for d in docs for t in set(d))
+    terms = list(dict.fromkeys(query))
+
+    scores = np.zeros(n, dtype=np.float32)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_len)
+    for i, doc in enumerate(docs):
+        tf = Counter(doc)
+        s = 0.0
+        for t in terms:
+            f = tf.get(t)
+            if not f:
+                continue
+            idf = math.log(1 + (n - df[t] + 0.5) / (df[t] + 0.5))
+            s += idf * f * (BM25_K1 + 1) / (f + norm[i])
+        scores[i] = s
+    return scores
+
+
+#############################################
+# MINHASH DEDUP
+#############################################
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+
+
+def minhash_signature(words: List[str]) -> np.ndarray:
+    if len(words) >= SHINGLE_SIZE:
+        shingles = {" ".join(words[i : i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    else:
+        shingles = {" ".join(words)}
+    h = np.fromiter((zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles), dtype=np.uint64)
+    # (a*h + b) mod p < 2^62, so uint64 never overflows
+    return ((_PERM_A[:, None] * h[None, :] + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def near_duplicates(signatures: Sequence[np.ndarray], order: Sequence[int]) -> List[int]:
+    """
+    Indices to drop. Items are visited in `order` (best first); an item is
+    a duplicate if it matches one already kept.
+    """
+    rows = NUM_PERM // LSH_BANDS
+    buckets: Dict[tuple, List[int]] = defaultdict(list)
+    dropped: List[int] = []
+
+    for i in order:
+        sig = signatures[i]
+        keys = [(b, sig[b * rows : (b + 1) * rows].tobytes()) for b in range(LSH_BANDS)]
+        candidates = {j for k in keys for j in buckets.get(k, ())}
+        if any(float(np.mean(signatures[j] == sig)) >= DEDUP_THRESHOLD for j in candidates):
+            dropped.append(i)
+            continue
+        for k in keys:
+            buckets[k].append(i)
+    return dropped
+
+
+#############################################
+# SELECTION
+#############################################
+
+def select_snippets(
+    company: str,
+    role: str,
+    results: List[Dict[str, str]],
+    token_budget: Optional[int] = None,
+    quotas: Optional[Dict[str, int]] = None,
+) -> List[Dict[str, str]]:
+    """
+    Top snippets for the role prompt, best first: relevant, distinct,
+    spread across sources and within `token_budget` tokens.
+    """
+    if not results:
+        return []
+
+    token_budget = SNIPPET_TOKEN_BUDGET if token_budget is None else token_budget
+    quotas = SOURCE_QUOTAS if quotas is None else quotas
+
+    docs = [_words(_snippet_text(r)) for r in results]
+    query = _words(company) + _words(role) + INTERVIEW_TERMS
+    scores = bm25_scores(docs, query)
+
+    # stable: ties keep search order (earlier queries are the focused ones)
+    order = sorted(range(len(results)), key=lambda i: -scores[i])
+    dropped = set(near_duplicates([minhash_signature(d) for d in docs], order))
+
+    picked: List[Dict[str, str]] = []
+    per_source: Counter = Counter()
+    used = 0
+    for i in order:
+        if i in dropped:
+            continue
+        r = results[i]
+        source = r.get("source") or "web"
+        bucket = source if source in quotas else "web"
+        if per_source[bucket] >= quotas.get(bucket, SNIPPET_PER_SOURCE):
+            continue
+        cost = count_tokens(_snippet_text(r))
+        if used + cost > token_budget:
+            continue
+        picked.append(r)
+        per_source[bucket] += 1
+        used += cost
+    return picked
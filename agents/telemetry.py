@@ -0,0 +1,578 @@
+# agents/telemetry.py
+#
+# Instrumentation for LLM calls and pipeline stages.
+#
+#   - InstrumentedClient / AsyncInstrumentedClient wrap the clients from
+#     get_client() / get_async_client() and record, per agent: wall time,
+#     prompt/completion tokens, cost, retries and JSON-parse failures of
+#     json_object responses
+#   - submit() runs a pipeline stage on an executor with the caller's
+#     trace context and records stage wall time + queue time
+#   - metrics are kept in-process and rendered in Prometheus text format
+#     (render_prometheus / start_metrics_server); every event is also a
+#     structured JSON log line on the "hiresense.telemetry" logger and is
+#     kept per trace ID for the Streamlit timing panel
+#
+# Agent = the calling module (e.g. "fit_agent"), so agents need no changes.
+
+import os
+import sys
+import json
+import time
+import uuid
+import bisect
+import asyncio
+import logging
+import threading
+import contextvars
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("hiresense.telemetry")
+
+TELEMETRY_ENABLED = os.getenv("HIRESENSE_TELEMETRY", "1") != "0"
+
+# USD per 1M tokens (input, output)
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0)
+
+# traces kept in memory for the timing panel
+MAX_TRACES = 256
+
+
+#############################################
+# TRACE CONTEXT
+#############################################
+
+_trace_id: contextvars.ContextVar[str] = contextvars.ContextVar("hiresense_trace_id", default="")
+_stage: contextvars.ContextVar[str] = contextvars.ContextVar("hiresense_stage", default="")
+_queue_seconds: contextvars.ContextVar[float] = contextvars.ContextVar("hiresense_queue_seconds", default=0.0)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_trace_id() -> str:
+    return _trace_id.get()
+
+
+@contextmanager
+def trace_scope(trace_id: Optional[str] = None) -> Iterator[str]:
+    """Tag everything recorded inside with one trace ID (new unless given)."""
+    trace_id = trace_id or new_trace_id()
+    token = _trace_id.set(trace_id)
+    try:
+        yield trace_id
+    finally:
+        _trace_id.reset(token)
+
+
+@contextmanager
+def stage_scope(stage: str, queue_seconds: float = 0.0) -> Iterator[None]:
+    """Time a pipeline stage running in the current thread."""
+    stage_token = _stage.set(stage)
+    queue_token = _queue_seconds.set(queue_seconds)
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        wall = time.perf_counter() - start
+        _stage.reset(stage_token)
+        _queue_seconds.reset(queue_token)
+        STAGE_SECONDS.observe(wall, stage=stage)
+        STAGE_QUEUE_SECONDS.observe(queue_seconds, stage=stage)
+        _emit(
+            {
+                "event": "stage",
+                "stage": stage,
+                "status": status,
+                "wall_seconds": round(wall, 4),
+                "queue_seconds": round(queue_seconds, 4),
+            }
+        )
+
+
+def submit(pool: Executor, stage: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """
+    pool.submit() for a pipeline stage: runs `fn` in a copy of the
+    caller's context (so the trace ID follows it into the worker) and
+    records how long it waited for a worker.
+    """
+    ctx = contextvars.copy_context()
+    submitted = time.perf_counter()
+
+    def run():
+        with stage_scope(stage, queue_seconds=time.perf_counter() - submitted):
+            return fn(*args, **kwargs)
+
+    return pool.submit(ctx.run, run)
+
+
+#############################################
+# METRICS
+#############################################
+
+class _Metric:
+    def __init__(self, name: str, help_text: str, kind: str):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    @staticmethod
+    def _fmt(labels: Tuple[Tuple[str, str], ...], extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        items = labels + extra
+        if not items:
+            return ""
+        body = ",".join(f'{k}="{v}"' for k, v in items)
+        return "{" + body + "}"
+
+
+class CounterMetric(_Metric):
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text, "counter")
+        self._values: Dict[Tuple, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount:
+            with self._lock:
+                self._values[self._labels(labels)] += amount
+
+    def values(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{self._fmt(k)} {v:g}" for k, v in sorted(self.values().items())]
+
+
+class HistogramMetric(_Metric):
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, "histogram")
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._labels(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            row[bisect.bisect_left(self.buckets, value)] += 1
+            row[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = {k: list(v) for k, v in self._values.items()}
+        lines = []
+        for key, row in sorted(items.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), row[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{self._fmt(key, (('le', le),))} {cumulative:g}")
+            lines.append(f"{self.name}_sum{self._fmt(key)} {row[-1]:g}")
+            lines.append(f"{self.name}_count{self._fmt(key)} {cumulative:g}")
+        return lines
+
+
+LLM_REQUESTS = CounterMetric("hiresense_llm_requests_total", "LLM calls by agent, model and status.")
+LLM_LATENCY = HistogramMetric("hiresense_llm_latency_seconds", "LLM call wall time.")
+LLM_TOKENS = CounterMetric("hiresense_llm_tokens_total", "Prompt/completion tokens reported by the API.")
+LLM_COST = CounterMetric("hiresense_llm_cost_usd_total", "Estimated LLM cost in USD.")
+LLM_RETRIES = CounterMetric("hiresense_llm_retries_total", "HTTP retries taken by the OpenAI client.")
+LLM_JSON_FAILURES = CounterMetric("hiresense_llm_json_parse_failures_total", "json_object responses that did not parse.")
+STAGE_SECONDS = HistogramMetric("hiresense_stage_seconds", "Pipeline stage wall time.")
+STAGE_QUEUE_SECONDS = HistogramMetric("hiresense_stage_queue_seconds", "Time a stage waited for a worker.")
+RATE_LIMIT_WAIT = HistogramMetric(
+    "hiresense_rate_limit_wait_seconds", "Time an LLM call waited for RPM/TPM budget (agents/rate_limit.py)."
+)
+LLM_RATE_LIMITED = CounterMetric("hiresense_llm_rate_limited_total", "429 responses, by caller priority.")
+LLM_SHED = CounterMetric("hiresense_llm_shed_total", "Batch LLM calls shed to keep the quota for interactive ones.")
+STAGE_CHECKPOINT_HITS = CounterMetric(
+    "hiresense_stage_checkpoint_hits_total", "Pipeline stages answered from a saved checkpoint (agents/pipeline.py)."
+)
+ROUTE_CALLS = CounterMetric("hiresense_route_calls_total", "Routed LLM attempts by route, tier and status (agents/model_router.py).")
+ROUTE_LATENCY = HistogramMetric("hiresense_route_latency_seconds", "Routed LLM call wall time, including scheduler waits.")
+ROUTE_COST = CounterMetric("hiresense_route_cost_usd_total", "Estimated LLM cost in USD by route and tier.")
+ROUTE_FALLBACKS = CounterMetric("hiresense_route_fallbacks_total", "Calls that fell back to a route's next tier.")
+STRUCTURED_REPAIRS = CounterMetric(
+    "hiresense_structured_repairs_total", "LLM answers json.loads rejected, by whether local repair recovered them."
+)
+STRUCTURED_REASKS = CounterMetric("hiresense_structured_reasks_total", "Follow-up calls asking only for failed fields.")
+STRUCTURED_DEFAULTED = CounterMetric(
+    "hiresense_structured_defaulted_total", "Output fields left at their default after repair and re-ask."
+)
+
+METRICS: List[_Metric] = [
+    LLM_REQUESTS,
+    LLM_LATENCY,
+    LLM_TOKENS,
+    LLM_COST,
+    LLM_RETRIES,
+    LLM_JSON_FAILURES,
+    STAGE_SECONDS,
+    STAGE_QUEUE_SECONDS,
+    RATE_LIMIT_WAIT,
+    LLM_RATE_LIMITED,
+    LLM_SHED,
+    STAGE_CHECKPOINT_HITS,
+    ROUTE_CALLS,
+    ROUTE_LATENCY,
+    ROUTE_COST,
+    ROUTE_FALLBACKS,
+    STRUCTURED_REPAIRS,
+    STRUCTURED_REASKS,
+    STRUCTURED_DEFAULTED,
+]
+
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for m in METRICS:
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+_server_lock = threading.Lock()
+_server = None
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0"):
+    """Serve /metrics on a daemon thread. Idempotent (Streamlit reruns)."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        _server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=_server.serve_forever, name="hiresense-metrics", daemon=True).start()
+        return _server
+
+
+#############################################
+# EVENTS (JSON logs + per-trace history)
+#############################################
+
+_traces: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+_traces_lock = threading.Lock()
+
+
+def _emit(event: Dict[str, Any]) -> None:
+    event = {"ts": round(time.time(), 3), "trace_id": _trace_id.get(), **event}
+    trace_id = event["trace_id"]
+    if trace_id:
+        with _traces_lock:
+            events = _traces.get(trace_id)
+            if events is None:
+                events = _traces[trace_id] = []
+                while len(_traces) > MAX_TRACES:
+                    _traces.popitem(last=False)
+            events.append(event)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(event, ensure_ascii=False))
+
+
+def trace_events(trace_id: str) -> List[Dict[str, Any]]:
+    with _traces_lock:
+        return list(_traces.get(trace_id, ()))
+
+
+def configure_json_logging(level: int = logging.INFO) -> None:
+    """One JSON object per line on stderr for all hiresense.* loggers."""
+    root = logging.getLogger("hiresense")
+    if any(getattr(h, "_hiresense_json", False) for h in root.handlers):
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._hiresense_json = True
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+if os.getenv("HIRESENSE_JSON_LOGS") == "1":
+    configure_json_logging()
+
+
+#############################################
+# CLIENT WRAPPER
+#############################################
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    price = MODEL_PRICES.get(model)
+    if price is None:
+        # dated snapshots, e.g. "gpt-4.1-2025-04-14"
+        price = next((p for m, p in sorted(MODEL_PRICES.items(), key=lambda i: -len(i[0])) if model.startswith(m)), None)
+    if price is None:
+        return 0.0
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+# client wrappers between the agent and create(); skipped when naming the caller
+_WRAPPER_MODULES = {__name__, "agents.rate_limit", "agents.model_router", "agents.schemas"}
+
+
+def _caller_agent() -> Tuple[str, str]:
+    """(module short name, function) of the code calling create()."""
+    frame = sys._getframe(1)
+    while frame.f_back is not None and frame.f_globals.get("__name__") in _WRAPPER_MODULES:
+        frame = frame.f_back
+    module = frame.f_globals.get("__name__", "?").rsplit(".", 1)[-1]
+    return module, frame.f_code.co_name
+
+
+def _record_call(
+    agent: str,
+    call: str,
+    model: str,
+    wall: float,
+    status: str,
+    usage: Any = None,
+    retries: int = 0,
+    content: Optional[str] = None,
+    wants_json: bool = False,
+    error: str = "",
+    first_token_seconds: Optional[float] = None,
+) -> None:
+    prompt_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+    completion_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+    cost = estimate_cost(model, prompt_tokens, completion_tokens)
+
+    json_ok = None
+    if wants_json and content is not None:
+        try:
+            json.loads(content)
+            json_ok = True
+        except ValueError:
+            json_ok = False
+
+    labels = {"agent": agent, "model": model}
+    LLM_REQUESTS.inc(status=status, **labels)
+    LLM_LATENCY.observe(wall, **labels)
+    LLM_TOKENS.inc(prompt_tokens, kind="prompt", **labels)
+    LLM_TOKENS.inc(completion_tokens, kind="completion", **labels)
+    LLM_COST.inc(cost, **labels)
+    LLM_RETRIES.inc(retries, **labels)
+    if json_ok is False:
+        LLM_JSON_FAILURES.inc(**labels)
+
+    event = {
+        "event": "llm_call",
+        "stage": _stage.get(),
+        "agent": agent,
+        "call": call,
+        "model": model,
+        "status": status,
+        "wall_seconds": round(wall, 4),
+        "queue_seconds": round(_queue_seconds.get(), 4),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_usd": round(cost, 6),
+        "retries": retries,
+        "json_ok": json_ok,
+    }
+    if first_token_seconds is not None:
+        event["first_token_seconds"] = round(first_token_seconds, 4)
+    if error:
+        event["error"] = error
+    _emit(event)
+
+
+class _InstrumentedCompletions:
+    def __init__(self, completions: Any):
+        self._completions = completions
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._completions, name)
+
+    @staticmethod
+    def _prepare(kwargs: Dict[str, Any]) -> Tuple[str, str, str, bool, bool]:
+        agent, call = _caller_agent()
+        model = str(kwargs.get("model", ""))
+        wants_json = (kwargs.get("response_format") or {}).get("type") == "json_object"
+        stream = bool(kwargs.get("stream"))
+        if stream and "stream_options" not in kwargs:
+            kwargs["stream_options"] = {"include_usage": True}
+        return agent, call, model, wants_json, stream
+
+    @staticmethod
+    def _record_result(result, agent, call, model, start, retries, wants_json) -> None:
+        content = result.choices[0].message.content if result.choices else None
+        _record_call(
+            agent, call, model, time.perf_counter() - start, "ok",
+            usage=getattr(result, "usage", None), retries=retries, content=content, wants_json=wants_json,
+        )
+
+    def create(self, **kwargs: Any) -> Any:
+        agent, call, model, wants_json, stream = self._prepare(kwargs)
+
+        # the raw-response API exposes retries_taken; plain duck-typed clients may lack it
+        raw_api = getattr(self._completions, "with_raw_response", None)
+        start = time.perf_counter()
+        try:
+            if raw_api is not None:
+                raw = raw_api.create(**kwargs)
+                result = raw.parse()
+            else:
+                raw, result = None, self._completions.create(**kwargs)
+        except Exception as e:
+            _record_call(agent, call, model, time.perf_counter() - start, "error", error=f"{type(e).__name__}: {e}")
+            raise
+        retries = int(getattr(raw, "retries_taken", 0) or 0)
+        # time queued/backing off in agents/rate_limit.py is not model latency
+        start += float(getattr(raw, "wait_seconds", 0.0) or 0.0)
+
+        if stream:
+            return self._wrap_stream(result, agent, call, model, start, retries, wants_json)
+
+        self._record_result(result, agent, call, model, start, retries, wants_json)
+        return result
+
+    def _wrap_stream(self, stream, agent, call, model, start, retries, wants_json):
+        parts: List[str] = []
+        usage = None
+        first_token = None
+        status, error = "ok", ""
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta:
+                        if first_token is None:
+                            first_token = time.perf_counter() - start
+                        parts.append(delta)
+                yield chunk
+        except GeneratorExit:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _record_call(
+                agent, call, model, time.perf_counter() - start, status,
+                usage=usage, retries=retries,
+                content="".join(parts) if status == "ok" else None,
+                wants_json=wants_json, error=error, first_token_seconds=first_token,
+            )
+
+
+class _AsyncInstrumentedCompletions(_InstrumentedCompletions):
+    async def create(self, **kwargs: Any) -> Any:
+        agent, call, model, wants_json, stream = self._prepare(kwargs)
+
+        raw_api = getattr(self._completions, "with_raw_response", None)
+        start = time.perf_counter()
+        try:
+            if raw_api is not None:
+                raw = await raw_api.create(**kwargs)
+                result = raw.parse()
+            else:
+                raw, result = None, await self._completions.create(**kwargs)
+        except Exception as e:
+            _record_call(agent, call, model, time.perf_counter() - start, "error", error=f"{type(e).__name__}: {e}")
+            raise
+        retries = int(getattr(raw, "retries_taken", 0) or 0)
+        # time queued/backing off in agents/rate_limit.py is not model latency
+        start += float(getattr(raw, "wait_seconds", 0.0) or 0.0)
+
+        if stream:
+            return self._wrap_astream(result, agent, call, model, start, retries, wants_json)
+
+        self._record_result(result, agent, call, model, start, retries, wants_json)
+        return result
+
+    async def _wrap_astream(self, stream, agent, call, model, start, retries, wants_json):
+        parts: List[str] = []
+        usage = None
+        first_token = None
+        status, error = "ok", ""
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta:
+                        if first_token is None:
+                            first_token = time.perf_counter() - start
+                        parts.append(delta)
+                yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _record_call(
+                agent, call, model, time.perf_counter() - start, status,
+                usage=usage, retries=retries,
+                content="".join(parts) if status == "ok" else None,
+                wants_json=wants_json, error=error, first_token_seconds=first_token,
+            )
+
+
+class _InstrumentedChat:
+    def __init__(self, chat: Any, completions_cls: type = _InstrumentedCompletions):
+        self._chat = chat
+        self.completions = completions_cls(chat.completions)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._chat, name)
+
+
+class InstrumentedClient:
+    """Drop-in wrapper: client.chat.completions.create() is measured, the rest passes through."""
+
+    _completions_cls = _InstrumentedCompletions
+
+    def __init__(self, client: Any):
+        self._client = client
+        self.chat = _InstrumentedChat(client.chat, self._completions_cls)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class AsyncInstrumentedClient(InstrumentedClient):
+    """InstrumentedClient for AsyncOpenAI-style clients (awaitable create)."""
+
+    _completions_cls = _AsyncInstrumentedCompletions
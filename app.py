@@ -2,15 +2,25 @@
 # HireSense – Streamlit App + Orchestrator
 #############################################
 
+import os
 import streamlit as st
 from typing import List, Dict, Any
 
+# .env first: agent modules read HIRESENSE_* settings at import
+from agents.openai_client import load_env
+
+load_env()
+
 # Import agents
-from agents.role_reality_agent import build_role_profile
-from agents.resume_reality_agent import build_resume_profile
-from agents.fit_agent import compute_fit_profile
-from agents.friendly_agent import build_friendly_report
-from agents.resume_parser_agent import parse_resume
+from agents import telemetry
+from agents.pipeline import run_hire_sense as run_pipeline, iter_hire_sense
+from agents.profiles import FitProfile, ResumeProfile
+from agents.resume_parser_agent import parse_resume_cached
+from agents.search_agent import cached_search_public_interview_data
+
+# Prometheus /metrics endpoint (optional)
+if os.getenv("HIRESENSE_METRICS_PORT"):
+    telemetry.start_metrics_server(int(os.getenv("HIRESENSE_METRICS_PORT")))
 
 
 #############################################
@@ -122,42 +132,43 @@ def format_resume_reality_markdown(resume_profile: Dict[str, Any]) -> str:
         return "_No resume reality data available._"
 
     lines: List[str] = []
+    p = ResumeProfile.from_dict(resume_profile)
 
-    domain = resume_profile.get("resume_domain", "") or resume_profile.get("likely_resume_domain", "")
+    domain = p.resume_domain
     if domain:
         lines.append(f"### 🧭 Detected Resume Domain")
         lines.append(f"- **{domain}**\n")
 
-    strengths = resume_profile.get("core_strengths_raw", []) or resume_profile.get("core_strengths", [])
+    strengths = p.core_strengths_raw
     if strengths:
         lines.append("### 💪 Core Strength Signals")
         lines.extend([f"- {s}" for s in strengths])
         lines.append("")
 
-    weaknesses = resume_profile.get("core_weaknesses_raw", []) or resume_profile.get("core_weaknesses", [])
+    weaknesses = p.core_weaknesses_raw
     if weaknesses:
         lines.append("### ⚠️ Core Weakness / Risk Signals")
         lines.extend([f"- {w}" for w in weaknesses])
         lines.append("")
 
-    tech_clusters = resume_profile.get("tech_stack_clusters", [])
+    tech_clusters = p.tech_stack_clusters
     if tech_clusters:
         lines.append("### 🧰 Tech Stack Clusters")
         lines.extend([f"- {t}" for t in tech_clusters])
         lines.append("")
 
-    proj_signals = resume_profile.get("project_signals", []) or resume_profile.get("project_summary", {}).get("project_themes", [])
+    proj_signals = p.project_signals
     if proj_signals:
         lines.append("### 📂 Project Signals")
         lines.extend([f"- {p}" for p in proj_signals])
         lines.append("")
 
-    seniority = resume_profile.get("seniority_signal", "") or resume_profile.get("seniority_guess", "")
+    seniority = p.seniority_signal
     if seniority:
         lines.append("### 🎚 Seniority Signal")
         lines.append(f"- {seniority}\n")
 
-    missing = resume_profile.get("missing_signals_for_role", []) or resume_profile.get("skill_summary", {}).get("missing_common_skills", [])
+    missing = p.missing_signals_for_role
     if missing:
         lines.append("### 🔍 Signals Missing for Target Role")
         lines.extend([f"- {m}" for m in missing])
@@ -172,9 +183,10 @@ def format_fit_analysis_markdown(fit_profile: Dict[str, Any]) -> str:
         return "_No fit analysis data available._"
 
     lines: List[str] = []
+    p = FitProfile.from_dict(fit_profile)
 
-    score = fit_profile.get("fit_score_percentage", fit_profile.get("skill_match_score", None))
-    category = fit_profile.get("fit_summary_category", "")
+    score = p.fit_score_percentage
+    category = p.fit_summary_category
     if score is not None or category:
         lines.append("### 🎯 Overall Fit")
         if score is not None:
@@ -183,10 +195,21 @@ def format_fit_analysis_markdown(fit_profile: Dict[str, Any]) -> str:
             lines.append(f"- Category: **{category}**")
         lines.append("")
 
-    seniority_fit = fit_profile.get("seniority_fit", "")
-    domain_fit = fit_profile.get("domain_fit", "")
-    experience_fit = fit_profile.get("experience_fit", "")
-    project_fit = fit_profile.get("project_fit", "")
+    breakdown = p.score_breakdown
+    if breakdown:
+        lines.append("### 🔢 Score Breakdown")
+        lines.append(f"- Skill match: **{breakdown.skill_match_score}%**")
+        lines.append(f"- Seniority match: **{breakdown.seniority_score}%**")
+        lines.append(f"- Domain match: **{breakdown.domain_score}%**")
+        missing_skills = breakdown.missing_required_skills
+        if missing_skills:
+            lines.append(f"- Required skills not found on resume: {', '.join(missing_skills)}")
+        lines.append("")
+
+    seniority_fit = p.seniority_fit
+    domain_fit = p.domain_fit
+    experience_fit = p.experience_fit
+    project_fit = p.project_fit
     if seniority_fit or domain_fit or experience_fit or project_fit:
         lines.append("### 🧱 Alignment Dimensions")
         if seniority_fit:
@@ -199,31 +222,31 @@ def format_fit_analysis_markdown(fit_profile: Dict[str, Any]) -> str:
             lines.append(f"- **Project fit:** {project_fit}")
         lines.append("")
 
-    strengths = fit_profile.get("matched_strengths", [])
+    strengths = p.matched_strengths
     if strengths:
         lines.append("### ✅ Matched Strengths vs Role")
         lines.extend([f"- {s}" for s in strengths])
         lines.append("")
 
-    risks = fit_profile.get("mismatched_risks", [])
+    risks = p.mismatched_risks
     if risks:
         lines.append("### ⚠️ Risks / Misalignments")
         lines.extend([f"- {r}" for r in risks])
         lines.append("")
 
-    priority_gaps = fit_profile.get("priority_gaps", [])
+    priority_gaps = p.priority_gaps
     if priority_gaps:
         lines.append("### 🔧 Priority Gaps to Fix")
         lines.extend([f"- {g}" for g in priority_gaps])
         lines.append("")
 
-    missing_req = fit_profile.get("missing_role_requirements", [])
+    missing_req = p.missing_role_requirements
     if missing_req:
         lines.append("### 📋 Missing Formal Role Requirements")
         lines.extend([f"- {m}" for m in missing_req])
         lines.append("")
 
-    notes = fit_profile.get("overall_alignment_notes", [])
+    notes = p.overall_alignment_notes
     if notes:
         lines.append("### 📝 Alignment Notes")
         lines.extend([f"- {n}" for n in notes])
@@ -244,49 +267,17 @@ def run_hire_sense(
     user_review_text: str = "",
     user_insight_text: str = "",
 ) -> Dict[str, Any]:
-
-    # Stage 1 — Role Reality
-    role_profile = build_role_profile(
+    # Role Reality + Resume Reality run concurrently; see agents/pipeline.py
+    return run_pipeline(
         company=company,
         role=role,
-        results=results,
-        user_review_text=user_review_text,
-        user_insight_text=user_insight_text,
-    )
-
-    # Stage 2 — Resume Reality
-    resume_profile = build_resume_profile(
         resume_text=resume_text,
         extracted_skills=extracted_skills,
+        results=results,
         user_review_text=user_review_text,
         user_insight_text=user_insight_text,
     )
 
-    # Stage 3 — Fit Engine
-    fit_profile = compute_fit_profile(
-        role_profile=role_profile,
-        resume_profile=resume_profile,
-    )
-
-    # Stage 4 — Friendly Final Report
-    friendly_report = build_friendly_report(
-        company=company,
-        role=role,
-        resume_text=resume_text,
-        role_profile=role_profile,
-        resume_profile=resume_profile,
-        fit_profile=fit_profile,
-        user_review_text=user_review_text,
-        user_insight_text=user_insight_text,
-    )
-
-    return {
-        "role_profile_raw": role_profile,
-        "resume_profile_raw": resume_profile,
-        "fit_profile_raw": fit_profile,
-        "friendly_report": friendly_report,
-    }
-
 
 #############################################
 # STREAMLIT UI
@@ -320,7 +311,8 @@ uploaded_pdf = st.file_uploader(
 resume_text = ""
 
 if uploaded_pdf:
-    parsed = parse_resume(uploaded_pdf)
+    # cached by file content – widget reruns don't re-bill the parser LLM calls
+    parsed = parse_resume_cached(uploaded_pdf)
     resume_text = parsed["resume_text"]
     auto_skills = parsed["skills_raw_exact"]
 else:
@@ -345,7 +337,7 @@ skills_manual = st.text_area(
     placeholder="Python, SQL, AWS, Spark, C++, React, etc."
 )
 
-# Search results placeholder (until SERP API is added)
+# Public interview search results (fetched on Analyze, cached per company/role)
 results: List[Dict[str, str]] = []
 
 
@@ -373,134 +365,224 @@ with col2:
 
 
 #############################################
-# RUN ANALYSIS
+# RENDER FRIENDLY REPORT
 #############################################
 
-if st.button("Analyze My Resume", type="primary"):
-    if not (company and role and resume_text.strip()):
-        st.error("❗ Please fill in: company, role, and resume text.")
-    else:
+def _show_list(label: str, items: Any):
+    if items:
+        st.markdown(f"**{label}:**")
+        st.markdown("\n".join(f"- {i}" for i in items))
 
-        with st.spinner("Analyzing your resume with HireSense..."):
-            output = run_hire_sense(
-                company=company,
-                role=role,
-                resume_text=resume_text,
-                extracted_skills=skills_manual,
-                results=results,
-                user_review_text=user_review_text,
-                user_insight_text=user_insight_text,
-            )
 
-        report = output["friendly_report"]
+def render_friendly_report(report: Dict[str, Any]):
+    """Render the user-facing report. Safe to call with a partially streamed report."""
+
+    st.header("👋 Intro Message")
+    st.write(report.get("intro_message") or "")
+
+    st.header("🧠 Friendly Summary")
+    st.write(report.get("friendly_summary") or "")
 
-        st.success("Analysis complete! Scroll down to view your full report.")
+    st.header("📌 Role Expectations Explained")
+    st.write(report.get("role_expectations_explained") or "")
 
+    st.header("💪 Your Strengths")
+    st.write(report.get("resume_strengths_explained") or "")
 
-        #############################################
-        # USER-FACING REPORT (CLEAN)
-        #############################################
+    st.header("⚠️ Gaps / Things to Improve")
+    st.write(report.get("resume_gaps_explained") or "")
 
-        st.header("👋 Intro Message")
-        st.write(report.get("intro_message", ""))
+    st.header("🎯 Fit Summary")
+    st.write(report.get("fit_explained") or "")
 
-        st.header("🧠 Friendly Summary")
-        st.write(report.get("friendly_summary", ""))
 
-        st.header("📌 Role Expectations Explained")
-        st.write(report.get("role_expectations_explained", ""))
+    #############################################
+    # ACTION PLAN
+    #############################################
 
-        st.header("💪 Your Strengths")
-        st.write(report.get("resume_strengths_explained", ""))
+    action_plan = report.get("action_plan", {}) or {}
 
-        st.header("⚠️ Gaps / Things to Improve")
-        st.write(report.get("resume_gaps_explained", ""))
+    st.header("🚀 Action Plan Tailored for You")
 
-        st.header("🎯 Fit Summary")
-        st.write(report.get("fit_explained", ""))
+    st.subheader("✔ Quick Wins (1–7 Days)")
+    quick_wins = action_plan.get("quick_wins", [])
+    if quick_wins:
+        st.write("\n".join(f"- {x}" for x in quick_wins))
+    else:
+        st.write("_No quick wins generated._")
+
+    st.subheader("📆 4-Week Improvement Plan")
+    four_week = action_plan.get("4_week_plan", [])
+    if four_week:
+        st.write("\n".join(f"- {x}" for x in four_week))
+    else:
+        st.write("_No 4-week plan generated._")
 
+    st.subheader("📝 Resume Fixes")
+    resume_fixes = action_plan.get("resume_fixes", [])
+    if resume_fixes:
+        st.write("\n".join(f"- {x}" for x in resume_fixes))
+    else:
+        st.write("_No resume fixes generated._")
 
-        #############################################
-        # ACTION PLAN
-        #############################################
+    st.subheader("⚙ Project Ideas")
+    project_ideas = action_plan.get("project_ideas", [])
+    if project_ideas:
+        st.write("\n".join(f"- {x}" for x in project_ideas))
+    else:
+        st.write("_No project ideas generated._")
 
-        action_plan = report.get("action_plan", {}) or {}
 
-        st.header("🚀 Action Plan Tailored for You")
+    #############################################
+    # ROUND-BY-ROUND BREAKDOWN (User-facing)
+    #############################################
 
-        st.subheader("✔ Quick Wins (1–7 Days)")
-        quick_wins = action_plan.get("quick_wins", [])
-        if quick_wins:
-            st.write("\n".join(f"- {x}" for x in quick_wins))
-        else:
-            st.write("_No quick wins generated._")
+    rounds = report.get("round_deep_dive", [])
+    if rounds:
+        st.header("🧩 Round-by-Round Interview Breakdown (From Public Reviews + Patterns)")
+        for r in rounds:
+            if not isinstance(r, dict):
+                continue
+            title = r.get("round_name") or "Interview Round"
 
-        st.subheader("📆 4-Week Improvement Plan")
-        four_week = action_plan.get("4_week_plan", [])
-        if four_week:
-            st.write("\n".join(f"- {x}" for x in four_week))
-        else:
-            st.write("_No 4-week plan generated._")
+            if r.get("round_type"):
+                title += f" — {r['round_type']}"
+            if r.get("difficulty"):
+                title += f" (Difficulty: {r['difficulty']})"
 
-        st.subheader("📝 Resume Fixes")
-        resume_fixes = action_plan.get("resume_fixes", [])
-        if resume_fixes:
-            st.write("\n".join(f"- {x}" for x in resume_fixes))
-        else:
-            st.write("_No resume fixes generated._")
+            st.subheader(f"• {title}")
 
-        st.subheader("⚙ Project Ideas")
-        project_ideas = action_plan.get("project_ideas", [])
-        if project_ideas:
-            st.write("\n".join(f"- {x}" for x in project_ideas))
-        else:
-            st.write("_No project ideas generated._")
+            _show_list("What they look for", r.get("what_they_look_for", []))
+            _show_list("Common concepts", r.get("common_concepts", []))
+            _show_list("Question patterns", r.get("question_patterns", []))
+            _show_list("Example question themes", r.get("example_question_themes", []))
+            _show_list("Tips", r.get("tips", []))
 
 
-        #############################################
-        # ROUND-BY-ROUND BREAKDOWN (User-facing)
-        #############################################
+#############################################
+# TIMING PANEL (optional)
+#############################################
 
-        rounds = report.get("round_deep_dive", [])
-        if rounds:
-            st.header("🧩 Round-by-Round Interview Breakdown (From Public Reviews + Patterns)")
-            for r in rounds:
-                title = r.get("round_name", "Interview Round")
+def render_timing_panel(trace_id: str):
+    events = telemetry.trace_events(trace_id)
+    stages = [e for e in events if e["event"] == "stage"]
+    calls = [e for e in events if e["event"] == "llm_call"]
+
+    with st.expander(f"⏱ Timing (trace {trace_id})", expanded=True):
+        if stages:
+            st.markdown("**Stages**")
+            st.dataframe(
+                [
+                    {
+                        "stage": e["stage"],
+                        "status": e["status"],
+                        "wall (s)": e["wall_seconds"],
+                        "queue (s)": e["queue_seconds"],
+                    }
+                    for e in stages
+                ],
+                use_container_width=True,
+            )
+        if calls:
+            st.markdown("**LLM calls**")
+            st.dataframe(
+                [
+                    {
+                        "agent": e["agent"],
+                        "call": e["call"],
+                        "model": e["model"],
+                        "wall (s)": e["wall_seconds"],
+                        "prompt tok": e["prompt_tokens"],
+                        "completion tok": e["completion_tokens"],
+                        "cost ($)": e["cost_usd"],
+                        "retries": e["retries"],
+                        "json ok": e["json_ok"],
+                    }
+                    for e in calls
+                ],
+                use_container_width=True,
+            )
+            total_cost = sum(e["cost_usd"] for e in calls)
+            total_tokens = sum(e["prompt_tokens"] + e["completion_tokens"] for e in calls)
+            st.caption(f"{len(calls)} LLM calls · {total_tokens:,} tokens · ~${total_cost:.4f}")
+        if not events:
+            st.caption("No timings recorded (telemetry disabled?).")
 
-                if r.get("round_type"):
-                    title += f" — {r['round_type']}"
-                if r.get("difficulty"):
-                    title += f" (Difficulty: {r['difficulty']})"
 
-                st.subheader(f"• {title}")
+#############################################
+# RUN ANALYSIS
+#############################################
 
-                def show(label: str, items: Any):
-                    if items:
-                        st.markdown(f"**{label}:**")
-                        st.markdown("\n".join(f"- {i}" for i in items))
+show_timings = st.checkbox("⏱ Show timing panel", value=os.getenv("HIRESENSE_TIMING_PANEL") == "1")
 
-                show("What they look for", r.get("what_they_look_for", []))
-                show("Common concepts", r.get("common_concepts", []))
-                show("Question patterns", r.get("question_patterns", []))
-                show("Example question themes", r.get("example_question_themes", []))
-                show("Tips", r.get("tips", []))
+if st.button("Analyze My Resume", type="primary"):
+    if not (company and role and resume_text.strip()):
+        st.error("❗ Please fill in: company, role, and resume text.")
+    else:
 
+        status_box = st.empty()
 
-        #############################################
-        # RAW ROLE / RESUME / FIT – HUMAN FORMAT
-        #############################################
+        # Placeholders in final page order; each is filled as its stage completes.
+        report_box = st.empty()
 
         st.header("🛠 Role Reality (Raw Breakdown)")
         st.write("This is how HireSense understands the REAL expectations of this role, based on public reviews and patterns.")
-        st.markdown(format_role_reality_markdown(output.get("role_profile_raw", {})))
+        role_box = st.empty()
 
         st.header("📄 Resume Reality (Raw Breakdown)")
         st.write("This is how HireSense interprets the TRUE content and signals in your resume.")
-        st.markdown(format_resume_reality_markdown(output.get("resume_profile_raw", {})))
+        resume_box = st.empty()
 
         st.header("📊 Fit Analysis (Raw Breakdown)")
         st.write("This is the realistic fit assessment between your resume and the role expectations.")
-        st.markdown(format_fit_analysis_markdown(output.get("fit_profile_raw", {})))
+        fit_box = st.empty()
+
+        for box in (role_box, resume_box, fit_box):
+            box.caption("⏳ Working on it...")
+
+        trace_id = telemetry.new_trace_id()
+
+        status_box.info("🔎 Searching public interview reviews...")
+        with telemetry.trace_scope(trace_id), telemetry.stage_scope("search"):
+            results = cached_search_public_interview_data(company, role)
+
+        status_box.info("🧠 Analyzing role expectations and your resume...")
+        stage_labels = {
+            "role_reality": "Role reality",
+            "resume_reality": "Resume reality",
+            "fit": "Fit analysis",
+        }
+        done_stages: List[str] = []
+
+        for stage, payload in iter_hire_sense(
+            company=company,
+            role=role,
+            resume_text=resume_text,
+            extracted_skills=skills_manual,
+            results=results,
+            user_review_text=user_review_text,
+            user_insight_text=user_insight_text,
+            stream_friendly=True,
+            trace_id=trace_id,
+        ):
+            if stage == "role_reality":
+                role_box.markdown(format_role_reality_markdown(payload))
+            elif stage == "resume_reality":
+                resume_box.markdown(format_resume_reality_markdown(payload))
+            elif stage == "fit":
+                fit_box.markdown(format_fit_analysis_markdown(payload))
+            elif stage in ("friendly_partial", "friendly"):
+                with report_box.container():
+                    render_friendly_report(payload)
+
+            if stage in stage_labels:
+                done_stages.append(stage_labels[stage])
+                status_box.info("✅ " + ", ".join(done_stages) + " ready – writing your report...")
+
+        status_box.success("Analysis complete! Scroll down to view your full report.")
+
+        if show_timings:
+            render_timing_panel(trace_id)
 
 
 st.markdown("---")
@@ -0,0 +1,526 @@
+#############################################
+# HireSense – Batch Analysis CLI
+#
+# Score many resumes against ONE company/role without the Streamlit UI.
+#
+#   python batch.py --company Google --role "Software Engineer" \
+#       --input resumes/ --output results.jsonl
+#
+# Input:  a directory of PDFs, or a JSONL file with
+#         {"id": "...", "resume_text": "..."} per line.
+# Output: JSONL or CSV (by extension), one row per resume, appended as
+#         each finishes. Re-running with the same --output skips inputs
+#         that already completed, so a crashed run can be resumed.
+#
+# --async runs every resume as a coroutine on one event loop sharing one
+# pooled AsyncOpenAI client: --concurrency then means analyses in flight
+# (hundreds are fine). To use more cores, start a few processes with
+# --shard 0/4 ... 3/4 and separate outputs; each takes 1/N of the
+# HIRESENSE_LLM_RPM / HIRESENSE_LLM_TPM budget.
+#
+# --scores-only skips the fit LLM call: analyzed resumes are collected
+# and scored SCORE_CHUNK at a time with one fit_scoring.score_batch()
+# matrix op, then written.
+#############################################
+
+import os
+import sys
+import io
+import csv
+import json
+import time
+import zlib
+import asyncio
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Iterator, Optional, Set, Tuple
+
+# .env first: agent modules read HIRESENSE_* settings at import
+from agents.openai_client import load_env
+
+load_env()
+
+from agents import openai_client, rate_limit, telemetry
+from agents.search_agent import cached_search_public_interview_data
+from agents.role_reality_agent import build_role_profile_cached
+from agents.resume_reality_agent import build_resume_profile, build_resume_profile_async
+from agents.fit_agent import compute_fit_profile, compute_fit_profile_async
+from agents.fit_scoring import score_fits
+from agents.embedding_index import EmbeddingStore, index_resume
+from agents.resume_parser_agent import parse_resume_cached, parse_resume_cached_async
+
+
+CSV_FIELDS = [
+    "id",
+    "source",
+    "fit_score_percentage",
+    "fit_summary_category",
+    "skill_match_score",
+    "resume_domain",
+    "seniority_signal",
+    "skills_raw_exact",
+    "elapsed_seconds",
+    "error",
+]
+
+# --scores-only: rows per score_batch() call (also the most a crash can lose)
+SCORE_CHUNK = 128
+
+
+#############################################
+# INPUTS
+#############################################
+
+def iter_inputs(path: Path) -> Iterator[Tuple[str, str, Any]]:
+    """Yield (id, source, payload) where payload is a PDF Path or resume text."""
+    if path.is_dir():
+        for pdf in sorted(path.rglob("*.pdf")):
+            yield str(pdf.relative_to(path)), str(pdf), pdf
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                print(f"Skipping malformed JSONL line {line_no}", file=sys.stderr)
+                continue
+            text = row.get("resume_text") or row.get("text") or ""
+            resume_id = str(row.get("id") or f"line-{line_no}")
+            yield resume_id, f"{path}:{line_no}", text
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse "K/N" into (K, N), 0 <= K < N."""
+    index, _, count = spec.partition("/")
+    k, n = int(index), int(count)
+    if n < 1 or not 0 <= k < n:
+        raise ValueError(f"bad shard {spec!r}; expected K/N with 0 <= K < N")
+    return k, n
+
+
+def in_shard(resume_id: str, shard: Tuple[int, int]) -> bool:
+    # stable across processes and runs (unlike hash())
+    return zlib.crc32(resume_id.encode("utf-8")) % shard[1] == shard[0]
+
+
+#############################################
+# OUTPUT (append-only, resumable)
+#############################################
+
+def load_completed_ids(output: Path) -> Set[str]:
+    """IDs already written without an error – these are skipped on resume."""
+    if not output.exists():
+        return set()
+
+    done: Set[str] = set()
+    with open(output, "r", encoding="utf-8", newline="") as f:
+        if output.suffix.lower() == ".csv":
+            for row in csv.DictReader(f):
+                if row.get("id") and not row.get("error"):
+                    done.add(row["id"])
+        else:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    # a torn last line from a crash – that input is simply redone
+                    continue
+                if row.get("id") and not row.get("error"):
+                    done.add(row["id"])
+    return done
+
+
+class ResultWriter:
+    def __init__(self, output: Path):
+        self.output = output
+        self.is_csv = output.suffix.lower() == ".csv"
+        new_file = not output.exists() or output.stat().st_size == 0
+        output.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(output, "a", encoding="utf-8", newline="")
+        self._lock = threading.Lock()
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if new_file:
+                self._csv.writeheader()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            if self.is_csv:
+                flat = dict(row)
+                flat["skills_raw_exact"] = ", ".join(row.get("skills_raw_exact") or [])
+                self._csv.writerow(flat)
+            else:
+                self._f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._f.flush()
+            os.fsync(self._f.fileno())
+
+    def close(self) -> None:
+        self._f.close()
+
+
+#############################################
+# PER-RESUME WORK
+#############################################
+
+def analyze_one(
+    resume_id: str,
+    source: str,
+    payload: Any,
+    role_profile: Dict[str, Any],
+    role_title: str = "",
+    scores_only: bool = False,
+    store: Optional[EmbeddingStore] = None,
+) -> Dict[str, Any]:
+    # one trace per resume: its LLM calls share a trace_id in logs/metrics;
+    # batch priority: the interactive UI goes first on a shared quota
+    with telemetry.trace_scope() as trace_id, rate_limit.priority_scope("batch"):
+        start = time.monotonic()
+        row: Dict[str, Any] = {"id": resume_id, "source": source, "trace_id": trace_id}
+
+        try:
+            if isinstance(payload, Path):
+                with open(payload, "rb") as f:
+                    parsed = parse_resume_cached(f)
+            else:
+                parsed = parse_resume_cached(payload)
+
+            resume_text = parsed.get("resume_text", "")
+            if not resume_text:
+                raise ValueError("no text could be extracted from resume")
+
+            skills = parsed.get("skills_raw_exact", [])
+            resume_profile = build_resume_profile(
+                resume_text=resume_text,
+                extracted_skills=", ".join(skills),
+            )
+            fit_skills = parsed.get("skills_canonical") or skills
+            if scores_only:
+                # deterministic scores only – no fit-stage LLM call; scored
+                # with the rest of its chunk by _ScoreBuffer
+                row["_pending"] = (skills, fit_skills, resume_profile)
+            else:
+                fit_profile = compute_fit_profile(
+                    role_profile=role_profile,
+                    resume_profile=resume_profile,
+                    role_title=role_title,
+                    extracted_skills=fit_skills,
+                )
+                _fill_row(row, resume_id, source, skills, fit_skills, resume_profile, fit_profile, store)
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+
+        row["elapsed_seconds"] = round(time.monotonic() - start, 3)
+    return row
+
+
+async def analyze_one_async(
+    resume_id: str,
+    source: str,
+    payload: Any,
+    role_profile: Dict[str, Any],
+    role_title: str = "",
+    scores_only: bool = False,
+    store: Optional[EmbeddingStore] = None,
+) -> Dict[str, Any]:
+    """analyze_one() as a coroutine on the loop's shared AsyncOpenAI client."""
+    with telemetry.trace_scope() as trace_id, rate_limit.priority_scope("batch"):
+        start = time.monotonic()
+        row: Dict[str, Any] = {"id": resume_id, "source": source, "trace_id": trace_id}
+
+        try:
+            if isinstance(payload, Path):
+                data = await asyncio.to_thread(payload.read_bytes)
+                parsed = await parse_resume_cached_async(io.BytesIO(data))
+            else:
+                parsed = await parse_resume_cached_async(payload)
+
+            resume_text = parsed.get("resume_text", "")
+            if not resume_text:
+                raise ValueError("no text could be extracted from resume")
+
+            skills = parsed.get("skills_raw_exact", [])
+            resume_profile = await build_resume_profile_async(
+                resume_text=resume_text,
+                extracted_skills=", ".join(skills),
+            )
+            fit_skills = parsed.get("skills_canonical") or skills
+            if scores_only:
+                row["_pending"] = (skills, fit_skills, resume_profile)
+            else:
+                fit_profile = await compute_fit_profile_async(
+                    role_profile=role_profile,
+                    resume_profile=resume_profile,
+                    role_title=role_title,
+                    extracted_skills=fit_skills,
+                )
+                _fill_row(row, resume_id, source, skills, fit_skills, resume_profile, fit_profile, store)
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+
+        row["elapsed_seconds"] = round(time.monotonic() - start, 3)
+    return row
+
+
+def _fill_row(
+    row: Dict[str, Any],
+    resume_id: str,
+    source: str,
+    skills: List[str],
+    fit_skills: List[str],
+    resume_profile: Dict[str, Any],
+    fit_profile: Dict[str, Any],
+    store: Optional[EmbeddingStore],
+) -> None:
+    if store is not None:
+        # index for later role-vs-pool shortlisting (see shortlist.py)
+        index_resume(
+            store,
+            resume_id,
+            {**resume_profile, "skills_canonical": fit_skills},
+            payload={"resume_profile": resume_profile, "skills": fit_skills, "source": source},
+        )
+
+    row.update(
+        {
+            "fit_score_percentage": fit_profile.get("fit_score_percentage"),
+            "fit_summary_category": fit_profile.get("fit_summary_category"),
+            "skill_match_score": fit_profile.get("skill_match_score"),
+            "resume_domain": resume_profile.get("resume_domain"),
+            "seniority_signal": resume_profile.get("seniority_signal"),
+            "skills_raw_exact": skills,
+            "resume_profile": resume_profile,
+            "fit_profile": fit_profile,
+            "error": "",
+        }
+    )
+
+
+class _ScoreBuffer:
+    """
+    --scores-only: analyzed rows wait here and are scored together, one
+    score_batch() call per `size` rows, before they go to `emit`. Rows
+    that already failed pass straight through. Only used from the thread
+    that records results, so there is no lock.
+    """
+
+    def __init__(self, role_profile, role_title, store, emit, size: int = SCORE_CHUNK):
+        self.role_profile = role_profile
+        self.role_title = role_title
+        self.store = store
+        self.emit = emit
+        self.size = size
+        self.rows: List[Dict[str, Any]] = []
+
+    def add(self, row: Dict[str, Any]) -> None:
+        if "_pending" not in row:
+            self.emit(row)
+            return
+        self.rows.append(row)
+        if len(self.rows) >= self.size:
+            self.flush()
+
+    def flush(self) -> None:
+        rows, self.rows = self.rows, []
+        if not rows:
+            return
+        pending = [row.pop("_pending") for row in rows]
+        try:
+            fits = score_fits(self.role_profile, [p[2] for p in pending], self.role_title, [p[1] for p in pending])
+        except Exception as e:
+            fits = [e] * len(rows)
+
+        for row, (skills, fit_skills, resume_profile), fit in zip(rows, pending, fits):
+            try:
+                if isinstance(fit, Exception):
+                    raise fit
+                _fill_row(row, row["id"], row["source"], skills, fit_skills, resume_profile, fit, self.store)
+            except Exception as e:
+                row["error"] = f"{type(e).__name__}: {e}"
+            self.emit(row)
+
+
+#############################################
+# PROGRESS
+#############################################
+
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m{s:02d}s" if h else f"{m}m{s:02d}s"
+
+
+def print_progress(done: int, failed: int, total: int, started: float) -> None:
+    elapsed = max(time.monotonic() - started, 1e-6)
+    rate = done / elapsed
+    eta = (total - done) / rate if rate > 0 else 0.0
+    line = (
+        f"\r[{done}/{total}] {rate * 60:.1f} resumes/min"
+        f" | failed {failed} | elapsed {_fmt_duration(elapsed)}"
+        f" | ETA {_fmt_duration(eta) if rate > 0 else '?'}"
+    )
+    print(line, end="", file=sys.stderr, flush=True)
+
+
+#############################################
+# MAIN
+#############################################
+
+def run_batch(
+    company: str,
+    role: str,
+    input_path: Path,
+    output: Path,
+    concurrency: int = 4,
+    skip_search: bool = False,
+    scores_only: bool = False,
+    index_dir: Optional[Path] = None,
+    use_async: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+) -> Dict[str, int]:
+    completed = load_completed_ids(output)
+    todo = [
+        item
+        for item in iter_inputs(input_path)
+        if item[0] not in completed and (shard is None or in_shard(item[0], shard))
+    ]
+
+    print(
+        f"{len(completed)} already done, {len(todo)} to analyze "
+        f"for {company} / {role} (concurrency={concurrency}{', async' if use_async else ''}"
+        f"{f', shard {shard[0]}/{shard[1]}' if shard else ''})",
+        file=sys.stderr,
+    )
+    if not todo:
+        return {"done": 0, "failed": 0, "skipped": len(completed)}
+
+    # Role profile is candidate-independent: compute it ONCE for the whole batch.
+    results: List[Dict[str, str]] = [] if skip_search else cached_search_public_interview_data(company, role)
+    with rate_limit.priority_scope("batch"):
+        role_profile = build_role_profile_cached(company=company, role=role, results=results)
+
+    store = EmbeddingStore(index_dir) if index_dir else None
+    writer = ResultWriter(output)
+    started = time.monotonic()
+    counts = {"done": 0, "failed": 0}
+
+    def record(row: Dict[str, Any]) -> None:
+        writer.write(row)
+        counts["done"] += 1
+        if row.get("error"):
+            counts["failed"] += 1
+        print_progress(counts["done"], counts["failed"], len(todo), started)
+        if store is not None and counts["done"] % 50 == 0:
+            store.flush()
+
+    scores = _ScoreBuffer(role_profile, role, store, record) if scores_only else None
+    collect = scores.add if scores else record
+
+    try:
+        if use_async:
+            asyncio.run(_run_async(todo, role_profile, role, scores_only, store, concurrency, collect))
+        else:
+            _run_threads(todo, role_profile, role, scores_only, store, concurrency, collect)
+    finally:
+        if scores is not None:
+            scores.flush()
+        writer.close()
+        if store is not None:
+            store.flush()
+        print(file=sys.stderr)
+
+    return {"done": counts["done"], "failed": counts["failed"], "skipped": len(completed)}
+
+
+def _run_threads(todo, role_profile, role, scores_only, store, concurrency, record) -> None:
+    queue = iter(todo)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="hiresense-batch") as pool:
+        in_flight = set()
+
+        def refill():
+            # bounded window: never more than 2x concurrency queued at once
+            while len(in_flight) < concurrency * 2:
+                item = next(queue, None)
+                if item is None:
+                    return
+                in_flight.add(pool.submit(analyze_one, *item, role_profile, role, scores_only, store))
+
+        refill()
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                in_flight.discard(future)
+                record(future.result())
+            refill()
+
+
+async def _run_async(todo, role_profile, role, scores_only, store, concurrency, record) -> None:
+    queue = iter(todo)
+
+    async def worker():
+        # `concurrency` workers pull from one queue: that many analyses in flight
+        for item in queue:
+            record(await analyze_one_async(*item, role_profile, role, scores_only, store))
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(todo)))))
+    finally:
+        await openai_client.aclose_async_client()
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="HireSense batch resume scoring for one role.")
+    parser.add_argument("--company", required=True)
+    parser.add_argument("--role", required=True)
+    parser.add_argument("--input", required=True, type=Path, help="directory of PDFs or a JSONL of resume texts")
+    parser.add_argument("--output", required=True, type=Path, help="results file (.jsonl or .csv)")
+    parser.add_argument("--concurrency", type=int, default=4, help="resumes analyzed in parallel")
+    parser.add_argument("--skip-search", action="store_true", help="don't query SerpAPI for public reviews")
+    parser.add_argument("--scores-only", action="store_true", help="deterministic fit scores only, skip the fit LLM notes")
+    parser.add_argument("--index-dir", type=Path, default=None, help="also add resume profiles to this embedding store")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="one event loop, --concurrency analyses in flight")
+    parser.add_argument("--shard", default=None, help="K/N: only this process's share of the inputs (run N processes)")
+    args = parser.parse_args(argv)
+
+    if not args.input.exists():
+        parser.error(f"input not found: {args.input}")
+
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+        # the RPM/TPM budget is per process: split it across the shards
+        limiter = rate_limit.get_rate_limiter()
+        rate_limit.configure_rate_limiter(
+            rpm=limiter.rpm / shard[1],
+            tpm=limiter.tpm / shard[1],
+            max_in_flight=limiter.max_in_flight,
+        )
+
+    summary = run_batch(
+        company=args.company,
+        role=args.role,
+        input_path=args.input,
+        output=args.output,
+        concurrency=max(1, args.concurrency),
+        skip_search=args.skip_search,
+        scores_only=args.scores_only,
+        index_dir=args.index_dir,
+        use_async=args.use_async,
+        shard=shard,
+    )
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
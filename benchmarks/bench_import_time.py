@@ -0,0 +1,128 @@
+# benchmarks/bench_import_time.py
+#
+# Cold-start import time of app.py and each agent module, each measured in
+# a fresh interpreter (python -X importtime) so nothing is pre-imported.
+# Runs with HIRESENSE_LLM_BACKEND=fake: importing must not need a key.
+#
+#   python -m benchmarks.bench_import_time --repeat 5 --out bench_import.json
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "agents.openai_client",
+    "agents.telemetry",
+    "agents.cache_store",
+    "agents.skill_lexicon",
+    "agents.pdf_extract",
+    "agents.resume_parser_agent",
+    "agents.search_agent",
+    "agents.role_reality_agent",
+    "agents.resume_reality_agent",
+    "agents.fit_agent",
+    "agents.friendly_agent",
+    "agents.pipeline",
+    "batch",
+    "app",
+]
+
+# modules that should stay out of a cold import (deferred to first use)
+HEAVY = ["openai", "httpx", "requests", "pdfplumber", "pypdf", "PyPDF2", "tiktoken", "dotenv"]
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """[(module, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _self_us, cumulative_us, raw_name = line[len("import time:"):].split("|")
+            name = raw_name.strip()
+            depth = (len(raw_name) - len(raw_name.lstrip()) - 1) // 2
+            rows.append((name, int(cumulative_us), depth))
+        except ValueError:
+            continue
+    return rows
+
+
+def measure(module: str) -> Dict[str, object]:
+    env = dict(os.environ, HIRESENSE_LLM_BACKEND="fake", PYTHONDONTWRITEBYTECODE="1")
+    code = (
+        f"import {module}, sys, json;"
+        f"print(json.dumps(sorted(m for m in {HEAVY!r} if m in sys.modules)))"
+    )
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    wall = time.perf_counter() - t0
+
+    rows = _parse_importtime(proc.stderr)
+    own = next((us for name, us, _ in rows if name == module), 0)
+    heavy = json.loads(proc.stdout.strip().splitlines()[-1]) if proc.returncode == 0 and proc.stdout.strip() else []
+    # direct dependencies of the measured module
+    children = [(name, us) for name, us, depth in rows if depth == 1]
+    slowest = sorted(children, key=lambda r: -r[1])[:5]
+
+    return {
+        "ok": proc.returncode == 0,
+        "import_ms": round(own / 1000, 1),
+        "process_wall_ms": round(wall * 1000, 1),
+        "heavy_modules_loaded": heavy,
+        "slowest_dependencies": [{"module": n, "ms": round(us / 1000, 1)} for n, us in slowest],
+        "error": "" if proc.returncode == 0 else proc.stderr.strip().splitlines()[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", default=",".join(MODULES))
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per module (median reported)")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    results = {}
+    for module in [m.strip() for m in args.modules.split(",") if m.strip()]:
+        runs = [measure(module) for _ in range(args.repeat)]
+        last = runs[-1]
+        row = {
+            "ok": all(r["ok"] for r in runs),
+            "import_ms_median": statistics.median(r["import_ms"] for r in runs),
+            "process_wall_ms_median": statistics.median(r["process_wall_ms"] for r in runs),
+            "heavy_modules_loaded": last["heavy_modules_loaded"],
+            "slowest_dependencies": last["slowest_dependencies"],
+        }
+        if not row["ok"]:
+            row["error"] = next(r["error"] for r in runs if not r["ok"])
+        results[module] = row
+        status = "ok" if row["ok"] else f"FAILED: {row['error']}"
+        print(
+            f"{module:<30} {row['import_ms_median']:>8.1f} ms import"
+            f"  {row['process_wall_ms_median']:>8.1f} ms process"
+            f"  heavy={','.join(row['heavy_modules_loaded']) or '-'}  {status}"
+        )
+
+    if args.out:
+        args.out.write_text(
+            json.dumps({"python": sys.version.split()[0], "repeat": args.repeat, "modules": results}, indent=2),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_model_router.py
+#
+# Per-stage model routing (agents/model_router.py) against one fake
+# backend per tier, each with its own latency – no API key, no network.
+#
+#   python -m benchmarks.bench_model_router --n 20 --concurrency 4
+#   python -m benchmarks.bench_model_router --large-timeout 0.5      # force large -> small fallback
+#   python -m benchmarks.bench_model_router --local-model llama-3.1-8b \
+#       --routes "resume_parser.exact_skills=local>small,resume_parser.structured=local>small"
+#   python -m benchmarks.bench_model_router --serve --out bench_router.json
+#
+# --serve puts each tier behind its own agents/fake_openai.serve() stub
+# on localhost and talks to it through the real OpenAI SDK, the way a
+# local OpenAI-compatible server would be used.
+#
+# Reported: per-route calls, fallbacks, calls per tier, p50/p95 latency
+# and estimated cost (route_report), plus calls and timeouts per tier.
+
+import os
+import sys
+import json
+import tempfile
+import argparse
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.bench_pipeline import COMPANY, ROLE, git_revision, make_results, make_resume_texts, run_concurrent_async, summarize
+
+TIER_NAMES = ["small", "large", "local"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20, help="analyses")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--small-latency", default="lognormal:0.6,0.3")
+    parser.add_argument("--large-latency", default="lognormal:1.5,0.4")
+    parser.add_argument("--local-latency", default="lognormal:0.3,0.3")
+    parser.add_argument("--latency-scale", type=float, default=0.1, help="multiplier on sampled latencies")
+    parser.add_argument("--small-timeout", type=float, default=30.0)
+    parser.add_argument("--large-timeout", type=float, default=90.0)
+    parser.add_argument("--local-timeout", type=float, default=60.0)
+    parser.add_argument("--local-model", default="", help="enable the local tier with this model name")
+    parser.add_argument("--routes", default="", help="HIRESENSE_MODEL_ROUTES-style overrides")
+    parser.add_argument("--serve", action="store_true", help="one HTTP stub per tier instead of in-process fakes")
+    parser.add_argument("--port", type=int, default=8770, help="first stub port with --serve")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    os.environ["HIRESENSE_CACHE_DIR"] = tempfile.mkdtemp(prefix="hiresense-bench-")
+
+    from agents import model_router, openai_client
+    from agents.fake_openai import AsyncFakeOpenAI, FakeOpenAI, LatencyModel, serve
+
+    fakes: Dict[str, Any] = {}
+    servers = []
+    tiers = {}
+    for i, name in enumerate(TIER_NAMES):
+        latency = LatencyModel(getattr(args, f"{name}_latency"), scale=args.latency_scale, seed=i + 1)
+        if args.serve:
+            fakes[name] = FakeOpenAI(latency=latency)
+            servers.append(serve(fakes[name], port=args.port + i))
+            base_url = f"http://127.0.0.1:{args.port + i}/v1"
+        else:
+            fakes[name] = AsyncFakeOpenAI(latency=latency)
+            base_url = f"http://fake-{name}.invalid/v1"
+            openai_client.set_async_client(fakes[name], base_url=base_url)
+        model = args.local_model if name == "local" else model_router.TIERS[name].model
+        tiers[name] = model_router.Tier(name, model, base_url, getattr(args, f"{name}_timeout"))
+
+    # before the agents are imported: their prompt versions hash the routes
+    model_router.configure_routing(tiers=tiers, routes=model_router.parse_routes(args.routes))
+
+    from agents.pipeline import run_hire_sense_async
+
+    texts = make_resume_texts(args.n)
+    results = make_results()
+
+    async def one(text):
+        await run_hire_sense_async(COMPANY, ROLE, text, "Python, SQL, Docker", results)
+
+    try:
+        latencies, wall, errors = run_concurrent_async(one, texts, args.concurrency)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    row = summarize("pipeline_async", latencies, wall, errors)
+    report = model_router.route_report()
+    print(
+        f"{args.n} analyses  {row['throughput_per_sec']:.2f}/s  p50 {row['latency_p50']:.3f}s"
+        f"  p95 {row['latency_p95']:.3f}s  errors {row['errors']}\n"
+    )
+    print(model_router.format_route_report(report))
+    print()
+    for name, fake in fakes.items():
+        print(f"tier {name:<6} {tiers[name].model or '(off)':<22} calls {sum(fake.calls.values()):>4}  timeouts {fake.timeouts}")
+
+    if args.out:
+        result = {
+            "revision": git_revision(),
+            "config": vars(args) | {"out": str(args.out)},
+            "pipeline": row,
+            "routes": report,
+            "tiers": {name: {"model": tiers[name].model, "calls": sum(f.calls.values()), "timeouts": f.timeouts} for name, f in fakes.items()},
+        }
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_pdf_extract.py
+#
+# Compare PDF extraction backends on a locally generated corpus.
+#
+#   python -m benchmarks.bench_pdf_extract --docs 30 --out bench_pdf.json
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents import pdf_extract
+from benchmarks.synthetic_pdf import make_resume_pdf
+
+
+def run(docs: int, page_counts, backends):
+    corpus = [
+        make_resume_pdf(seed=i, n_pages=page_counts[i % len(page_counts)])
+        for i in range(docs)
+    ]
+    total_pages = sum(pdf_extract._page_count(d) for d in corpus)
+
+    report = {"docs": docs, "pages": total_pages, "backends": {}}
+
+    for backend in backends:
+        # warm-up (imports, process pool start)
+        pdf_extract.extract_pdf_text(corpus[0], backend=backend)
+
+        start = time.perf_counter()
+        chars = 0
+        for data in corpus:
+            chars += len(pdf_extract.extract_pdf_text(data, backend=backend))
+        elapsed = time.perf_counter() - start
+
+        report["backends"][backend] = {
+            "seconds": round(elapsed, 4),
+            "pages_per_second": round(total_pages / elapsed, 1),
+            "ms_per_doc": round(elapsed / docs * 1000, 2),
+            "chars": chars,
+        }
+        print(f"{backend:>10}: {elapsed:7.3f}s  {total_pages / elapsed:8.1f} pages/s", file=sys.stderr)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--pages", default="1,2,12", help="comma-separated page counts to cycle through")
+    parser.add_argument("--backends", default="pypdf,pdfplumber,auto")
+    parser.add_argument("--out", type=Path, default=None, help="write JSON results here")
+    args = parser.parse_args()
+
+    report = run(
+        docs=args.docs,
+        page_counts=[int(p) for p in args.pages.split(",")],
+        backends=args.backends.split(","),
+    )
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+# benchmarks/bench_pipeline.py
+#
+# Offline end-to-end benchmarks against the fake OpenAI backend
+# (agents/fake_openai.py) – no API key, no network.
+#
+#   python -m benchmarks.bench_pipeline                       # all suites
+#   python -m benchmarks.bench_pipeline --suites pipeline,batch \
+#       --n 40 --concurrency 8 --latency lognormal:1.5,0.4 --latency-scale 0.1 \
+#       --out bench_pipeline.json
+#
+# Suites:
+#   pipeline       – run_hire_sense() per analysis (role profile shared via cache)
+#   pipeline_async – run_hire_sense_async(), --concurrency analyses on one loop
+#   parse_text     – parse_resume() on pasted text
+#   parse_pdf      – parse_resume() on synthetic PDFs
+#   batch          – batch.run_batch() over a generated JSONL
+#   batch_async    – the same with batch --async
+#
+# Every suite starts on empty caches. The sync and async variants get the
+# same inputs, and their LLM calls are checked to match (async_comparisons),
+# so the pair measures scheduling, not cache hits.
+#
+# Each suite reports throughput, p50/p95/p99/max latency, memory
+# (peak RSS, optional tracemalloc peak) and LLM calls / completion
+# tokens per agent. Results are JSON with the git
+# revision so runs from different versions can be diffed.
+
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SUITES = ["pipeline", "pipeline_async", "parse_text", "parse_pdf", "batch", "batch_async"]
+
+# suites that must reach the (fake) model; none of their calls may come from a cache
+LLM_SUITES = {"pipeline", "pipeline_async", "parse_text", "parse_pdf", "batch", "batch_async"}
+
+# (sync, async) suites run on the same inputs, each on its own empty
+# caches, so the pair differs only in how the work is scheduled
+ASYNC_PAIRS = [("pipeline", "pipeline_async"), ("batch", "batch_async")]
+
+COMPANY = "Google"
+ROLE = "Software Engineer"
+
+
+#############################################
+# MEASUREMENT
+#############################################
+
+def percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    i = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[i]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def summarize(name: str, latencies: List[float], wall: float, errors: int, extra: Dict[str, Any] = None) -> Dict[str, Any]:
+    n = len(latencies)
+    out = {
+        "suite": name,
+        "ops": n,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_sec": round(n / wall, 3) if wall > 0 else 0.0,
+        "latency_p50": round(percentile(latencies, 50), 4),
+        "latency_p95": round(percentile(latencies, 95), 4),
+        "latency_p99": round(percentile(latencies, 99), 4),
+        "latency_max": round(max(latencies), 4) if latencies else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    out.update(extra or {})
+    return out
+
+
+def run_concurrent(fn: Callable[[Any], Any], items: Sequence[Any], concurrency: int):
+    latencies: List[float] = []
+    errors = 0
+
+    def timed(item):
+        t0 = time.perf_counter()
+        try:
+            fn(item)
+            ok = True
+        except Exception as e:
+            print(f"  error: {type(e).__name__}: {e}", file=sys.stderr)
+            ok = False
+        return time.perf_counter() - t0, ok
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, ok in pool.map(timed, items):
+            latencies.append(latency)
+            errors += 0 if ok else 1
+    return latencies, time.perf_counter() - t0, errors
+
+
+def run_concurrent_async(fn: Callable[[Any], Any], items: Sequence[Any], concurrency: int):
+    """run_concurrent() for a coroutine function: `concurrency` tasks on one loop."""
+    latencies: List[float] = []
+    errors = 0
+
+    async def main():
+        nonlocal errors
+        queue = iter(items)
+
+        async def worker():
+            nonlocal errors
+            for item in queue:
+                t0 = time.perf_counter()
+                try:
+                    await fn(item)
+                except Exception as e:
+                    print(f"  error: {type(e).__name__}: {e}", file=sys.stderr)
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    t0 = time.perf_counter()
+    asyncio.run(main())
+    return latencies, time.perf_counter() - t0, errors
+
+
+#############################################
+# INPUTS
+#############################################
+
+def make_resume_texts(n: int, seed: int = 5) -> List[str]:
+    from benchmarks.synthetic_pdf import resume_lines
+
+    rng = random.Random(seed)
+    return [
+        "\n".join(
+            [f"Candidate {i}", "EXPERIENCE"]
+            + resume_lines(rng, 30)
+            + ["SKILLS", "Python, SQL, Docker, Kubernetes, AWS, PostgreSQL, Redis"]
+        )
+        for i in range(n)
+    ]
+
+
+def make_results() -> List[Dict[str, str]]:
+    from benchmarks.bench_snippet_select import make_set
+
+    return make_set(random.Random(3), 56, 0.3, COMPANY, ROLE)
+
+
+#############################################
+# SUITES
+#############################################
+
+def suite_pipeline(args) -> Dict[str, Any]:
+    from agents.pipeline import run_hire_sense
+
+    texts = make_resume_texts(args.n)
+    results = make_results()
+
+    def one(text):
+        run_hire_sense(COMPANY, ROLE, text, "Python, SQL, Docker", results)
+
+    latencies, wall, errors = run_concurrent(one, texts, args.concurrency)
+    return summarize("pipeline", latencies, wall, errors)
+
+
+def suite_pipeline_async(args) -> Dict[str, Any]:
+    from agents.pipeline import run_hire_sense_async
+
+    texts = make_resume_texts(args.n)
+    results = make_results()
+
+    async def one(text):
+        await run_hire_sense_async(COMPANY, ROLE, text, "Python, SQL, Docker", results)
+
+    latencies, wall, errors = run_concurrent_async(one, texts, args.concurrency)
+    return summarize("pipeline_async", latencies, wall, errors)
+
+
+def suite_parse_text(args) -> Dict[str, Any]:
+    from agents.resume_parser_agent import parse_resume
+
+    texts = make_resume_texts(args.n, seed=9)
+    latencies, wall, errors = run_concurrent(parse_resume, texts, args.concurrency)
+    return summarize("parse_text", latencies, wall, errors)
+
+
+def suite_parse_pdf(args) -> Dict[str, Any]:
+    from agents.resume_parser_agent import parse_resume
+    from benchmarks.synthetic_pdf import make_resume_pdf
+
+    pdfs = [make_resume_pdf(seed=i, n_pages=args.pdf_pages) for i in range(args.n)]
+    latencies, wall, errors = run_concurrent(lambda data: parse_resume(io.BytesIO(data)), pdfs, args.concurrency)
+    return summarize("parse_pdf", latencies, wall, errors, {"pdf_pages": args.pdf_pages})
+
+
+def suite_batch(args, use_async: bool = False) -> Dict[str, Any]:
+    import batch
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inp = Path(tmp) / "resumes.jsonl"
+        out = Path(tmp) / "results.jsonl"
+        with open(inp, "w", encoding="utf-8") as f:
+            for i, text in enumerate(make_resume_texts(args.n, seed=13)):
+                f.write(json.dumps({"id": f"r{i}", "resume_text": text}) + "\n")
+
+        t0 = time.perf_counter()
+        summary = batch.run_batch(
+            COMPANY, ROLE, inp, out, concurrency=args.concurrency, skip_search=True, use_async=use_async
+        )
+        wall = time.perf_counter() - t0
+
+        rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines() if line.strip()]
+    latencies = [r["elapsed_seconds"] for r in rows]
+    return summarize("batch_async" if use_async else "batch", latencies, wall, summary["failed"])
+
+
+SUITE_FNS = {
+    "pipeline": suite_pipeline,
+    "pipeline_async": suite_pipeline_async,
+    "parse_text": suite_parse_text,
+    "parse_pdf": suite_parse_pdf,
+    "batch": suite_batch,
+    "batch_async": lambda args: suite_batch(args, use_async=True),
+}
+
+
+#############################################
+# MAIN
+#############################################
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--suites", default=",".join(SUITES))
+    parser.add_argument("--n", type=int, default=20, help="operations per suite")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", default="lognormal:1.5,0.4", help="fake LLM latency distribution")
+    parser.add_argument("--latency-scale", type=float, default=0.05, help="multiplier on sampled latencies")
+    parser.add_argument("--recordings", type=Path, default=None, help="replay fixtures (default benchmarks/fixtures)")
+    parser.add_argument("--pdf-pages", type=int, default=2)
+    parser.add_argument("--tracemalloc", action="store_true", help="also report Python allocation peak (slower)")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    # isolated caches so every run measures the same amount of work; each
+    # suite also gets its own directory below (cache_store.use_cache_dir),
+    # or later suites would be served from earlier suites' results
+    cache_root = Path(tempfile.mkdtemp(prefix="hiresense-bench-"))
+    os.environ["HIRESENSE_CACHE_DIR"] = str(cache_root)
+
+    from agents import cache_store, openai_client, prompt_budget, telemetry
+    from agents.fake_openai import AsyncFakeOpenAI, FakeOpenAI, LatencyModel, load_recordings
+
+    recordings = load_recordings(args.recordings) if args.recordings else None
+    latency = LatencyModel(args.latency, scale=args.latency_scale, seed=1)
+    # vary: per-candidate answers, so one candidate's results never stand in for another's
+    fakes = [
+        FakeOpenAI(recordings=recordings, latency=latency, vary=True),
+        AsyncFakeOpenAI(recordings=recordings, latency=latency, vary=True),
+    ]
+    openai_client.set_client(fakes[0])
+    openai_client.set_async_client(fakes[1])
+
+    def llm_totals(attr: str) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for fake in fakes:
+            for agent, n in getattr(fake, attr).items():
+                totals[agent] = totals.get(agent, 0) + n
+        return totals
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = [s for s in suites if s not in SUITE_FNS]
+    if unknown:
+        parser.error(f"unknown suites: {unknown} (choose from {SUITES})")
+
+    rows = []
+    for name in suites:
+        cache_store.use_cache_dir(cache_root / name)
+        if args.tracemalloc:
+            tracemalloc.start()
+        before = {attr: llm_totals(attr) for attr in ("calls", "completion_tokens")}
+        row = SUITE_FNS[name](args)
+        for attr, key in (("calls", "llm_calls"), ("completion_tokens", "llm_completion_tokens")):
+            row[key] = {k: v - before[attr].get(k, 0) for k, v in llm_totals(attr).items() if v - before[attr].get(k, 0)}
+        if args.tracemalloc:
+            row["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            tracemalloc.stop()
+        if name in LLM_SUITES and not row["llm_calls"]:
+            raise RuntimeError(f"suite {name} made no LLM calls – its results came from a cache")
+        rows.append(row)
+        print(
+            f"{name:<11} {row['ops']:>4} ops  {row['throughput_per_sec']:>8.2f}/s"
+            f"  p50 {row['latency_p50']:.3f}s  p95 {row['latency_p95']:.3f}s"
+            f"  rss {row['peak_rss_mb']:.0f}MB  errors {row['errors']}"
+        )
+
+    by_name = {row["suite"]: row for row in rows}
+    comparisons = []
+    for sync, asyn in ASYNC_PAIRS:
+        if sync not in by_name or asyn not in by_name:
+            continue
+        same = by_name[sync]["llm_calls"] == by_name[asyn]["llm_calls"]
+        speedup = by_name[asyn]["throughput_per_sec"] / max(by_name[sync]["throughput_per_sec"], 1e-9)
+        comparisons.append({"sync": sync, "async": asyn, "same_llm_calls": same, "async_speedup": round(speedup, 2)})
+        print(f"{asyn} vs {sync}: {speedup:.2f}x throughput" + ("" if same else "  (WARNING: different LLM calls – not comparable)"))
+
+    result = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "n": args.n,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "latency_scale": args.latency_scale,
+            "pdf_pages": args.pdf_pages,
+        },
+        "suites": rows,
+        "async_comparisons": comparisons,
+        "prompt_tokens_saved": {stage: s["tokens_saved"] for stage, s in prompt_budget.budget_stats().items()},
+        "llm_requests": {"|".join(v for _, v in k): n for k, n in telemetry.LLM_REQUESTS.values().items()},
+    }
+    if args.out:
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
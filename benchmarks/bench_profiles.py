@@ -0,0 +1,162 @@
+# benchmarks/bench_profiles.py
+#
+# Memory and JSON cost of holding many profiles: the plain dicts
+# json.loads() gives against the slotted, interned profiles of
+# agents/profiles.py.
+#
+#   python -m benchmarks.bench_profiles --n 20000
+#   python -m benchmarks.bench_profiles --n 50000 --out bench_profiles.json
+#
+# Each candidate gets a resume and a fit profile (the recorded responses
+# in benchmarks/fixtures, with skills drawn from the skill lexicon and
+# per-candidate free text), plus one role profile per --per-role
+# candidates. Reported per representation: bytes held (tracemalloc,
+# after the JSON text is gone) and per profile, and from/to JSON time.
+
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.bench_pipeline import git_revision
+
+DOMAINS = ["Software Engineering", "Backend Engineering", "Data Engineering", "Machine Learning", "Frontend Engineering"]
+SENIORITY = ["junior", "mid-level", "senior", "staff"]
+CATEGORIES = ["Excellent Fit", "Strong Fit", "Moderate Fit", "Weak Fit", "Misaligned"]
+
+
+#############################################
+# DOCUMENTS
+#############################################
+
+def _tagged(values: List[str], i: int) -> List[str]:
+    return [f"{v} (candidate {i})" for v in values]
+
+
+def make_documents(n: int, per_role: int, seed: int = 7) -> List[Tuple[str, str]]:
+    """(kind, JSON text) for n candidates' resume + fit profiles and their roles."""
+    from agents.fake_openai import load_recordings
+    from agents.fit_scoring import SKILL_VOCAB
+
+    recs = {r["agent"]: r["content"] for r in load_recordings()}
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        if i % per_role == 0:
+            role = dict(recs["role_reality"])
+            role["skills_most_often_required"] = rng.sample(SKILL_VOCAB, 8)
+            role["skills_nice_to_have"] = rng.sample(SKILL_VOCAB, 4)
+            role["public_interview_summary"] = f"{role['public_interview_summary']} (role {i // per_role})"
+            docs.append(("role", json.dumps(role)))
+
+        resume = dict(recs["resume_reality"])
+        resume["resume_domain"] = rng.choice(DOMAINS)
+        resume["seniority_signal"] = rng.choice(SENIORITY)
+        for key in ("core_strengths_raw", "core_weaknesses_raw", "project_signals", "missing_signals_for_role"):
+            resume[key] = _tagged(resume[key], i)
+        resume["skills_canonical"] = rng.sample(SKILL_VOCAB, 15)
+        resume["skills_raw_exact"] = rng.sample(SKILL_VOCAB, 10)
+        docs.append(("resume", json.dumps(resume)))
+
+        fit = dict(recs["fit"])
+        for key in ("seniority_fit", "domain_fit", "experience_fit", "project_fit"):
+            fit[key] = f"{fit[key]} (candidate {i})"
+        fit["overall_alignment_notes"] = _tagged(fit["overall_alignment_notes"], i)
+        score = round(rng.uniform(20, 95), 1)
+        fit["skill_match_score"] = score
+        fit["fit_score_percentage"] = score
+        fit["fit_summary_category"] = rng.choice(CATEGORIES)
+        fit["score_breakdown"] = {
+            "skill_match_score": score,
+            "seniority_score": round(rng.uniform(0, 100), 1),
+            "domain_score": round(rng.uniform(0, 100), 1),
+            "fit_score_percentage": score,
+            "fit_summary_category": fit["fit_summary_category"],
+            "matched_required_skills": rng.sample(SKILL_VOCAB, 5),
+            "missing_required_skills": rng.sample(SKILL_VOCAB, 3),
+            "matched_nice_to_have_skills": rng.sample(SKILL_VOCAB, 2),
+            "scoring_version": "fit-scoring-1",
+        }
+        docs.append(("fit", json.dumps(fit)))
+    return docs
+
+
+#############################################
+# MEASUREMENT
+#############################################
+
+def _held(build: Callable[[], List[Any]]) -> Tuple[int, List[Any]]:
+    """(bytes still allocated after build(), its result)."""
+    gc.collect()
+    tracemalloc.start()
+    objs = build()
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held, objs
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run(docs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    from agents.profiles import FitProfile, ResumeProfile, RoleProfile
+
+    classes = {"role": RoleProfile, "resume": ResumeProfile, "fit": FitProfile}
+    texts = [text for _, text in docs]
+
+    load = {
+        "dict": lambda: [json.loads(t) for t in texts],
+        "profiles": lambda: [classes[kind].from_json(t) for kind, t in docs],
+    }
+    rows = []
+    for name, build in load.items():
+        # timed while nothing else is held, so the collector sees the same heap
+        from_json = _timed(build)
+        held, objs = _held(build)
+        dump = (lambda: [json.dumps(d) for d in objs]) if name == "dict" else (lambda: [p.to_json() for p in objs])
+        rows.append({"representation": name, "bytes": held, "from_json_s": from_json, "to_json_s": _timed(dump)})
+        del objs
+
+    for row in rows:
+        row["profiles"] = len(docs)
+        row["bytes_per_profile"] = round(row["bytes"] / max(1, len(docs)), 1)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20000, help="candidates (a resume + a fit profile each)")
+    parser.add_argument("--per-role", type=int, default=50, help="candidates per role profile")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    docs = make_documents(args.n, args.per_role)
+    rows = run(docs)
+    base = rows[0]["bytes"]
+    for row in rows:
+        print(
+            f"{row['representation']:<9} {row['profiles']} profiles  held {row['bytes'] / 2**20:7.1f} MiB"
+            f"  ({row['bytes_per_profile']:6.0f} B/profile, {row['bytes'] / base:4.0%} of dict)"
+            f"  from_json {row['from_json_s']:.2f}s  to_json {row['to_json_s']:.2f}s"
+        )
+
+    if args.out:
+        result = {"revision": git_revision(), "config": vars(args) | {"out": str(args.out)}, "representations": rows}
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# benchmarks/bench_rate_limit.py
+#
+# The request scheduler (agents/rate_limit.py) against a rate-limited fake
+# server (agents/fake_openai.FakeQuota: per-second RPM/TPM buckets,
+# x-ratelimit-* headers, 429 + retry-after), compared with every caller
+# retrying on its own the way the SDK does.
+#
+#   python -m benchmarks.bench_rate_limit --rpm 600 --n 300 --interactive 0.2
+#   python -m benchmarks.bench_rate_limit --modes scheduler --error-rate 0.05 --out bench_rl.json
+#
+# Modes:
+#   naive     – all calls at once, each retries 429/5xx itself with
+#               jittered backoff (at least retry-after), no shared state
+#   scheduler – the same calls through get_async_client(): one priority
+#               queue, header-driven buckets, shared pause on 429
+#
+# Reported per mode: goodput vs the quota, 429s served, failed and shed
+# calls, and p50/p95 latency for interactive and batch calls.
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.bench_pipeline import git_revision, percentile
+
+MODES = ["naive", "scheduler"]
+
+PROMPT = "You are the FIT ANALYSIS ENGINE for HireSense.\n" + "role and resume profile json " * 120
+
+
+def make_priorities(n: int, interactive: float, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return ["interactive" if rng.random() < interactive else "batch" for _ in range(n)]
+
+
+async def _naive_call(fake, priority: str, rate_limit) -> None:
+    # what every agent got before: the SDK's per-call retries, nothing shared
+    attempt = 0
+    while True:
+        try:
+            await fake.chat.completions.create(model="gpt-4.1", messages=[{"role": "user", "content": PROMPT}])
+            return
+        except Exception as e:
+            if attempt >= rate_limit.MAX_RETRIES or not rate_limit.is_retryable(e):
+                raise
+            headers = getattr(getattr(e, "response", None), "headers", None)
+            await asyncio.sleep(max(rate_limit.backoff_delay(attempt), rate_limit.retry_after(headers) or 0.0))
+            attempt += 1
+
+
+async def _scheduled_call(priority: str, openai_client, rate_limit) -> None:
+    with rate_limit.priority_scope(priority):
+        await openai_client.get_async_client().chat.completions.create(
+            model="gpt-4.1", messages=[{"role": "user", "content": PROMPT}]
+        )
+
+
+def run_mode(mode: str, args) -> Dict[str, Any]:
+    from agents import openai_client, rate_limit, telemetry
+    from agents.fake_openai import AsyncFakeOpenAI, FakeQuota, LatencyModel
+
+    quota = FakeQuota(args.rpm, args.tpm, burst_seconds=args.burst)
+    fake = AsyncFakeOpenAI(
+        latency=LatencyModel(args.latency, seed=1), quota=quota, error_rate=args.error_rate, seed=3
+    )
+    openai_client.set_async_client(fake)
+    rate_limit.configure_rate_limiter(rpm=args.rpm_hint, tpm=0)
+    shed_before = sum(telemetry.LLM_SHED.values().values())
+
+    priorities = make_priorities(args.n, args.interactive)
+    latencies: Dict[str, List[float]] = {"interactive": [], "batch": []}
+    failed = {"interactive": 0, "batch": 0}
+
+    async def one(priority: str):
+        t0 = time.perf_counter()
+        try:
+            if mode == "naive":
+                await _naive_call(fake, priority, rate_limit)
+            else:
+                await _scheduled_call(priority, openai_client, rate_limit)
+        except Exception:
+            failed[priority] += 1
+            return
+        latencies[priority].append(time.perf_counter() - t0)
+
+    async def main():
+        await asyncio.gather(*(one(p) for p in priorities))
+
+    t0 = time.perf_counter()
+    asyncio.run(main())
+    wall = time.perf_counter() - t0
+
+    ok = sum(len(v) for v in latencies.values())
+    quota_per_sec = args.rpm / 60.0
+    row: Dict[str, Any] = {
+        "mode": mode,
+        "calls": args.n,
+        "ok": ok,
+        "failed": failed,
+        "shed": int(sum(telemetry.LLM_SHED.values().values()) - shed_before),
+        "wall_seconds": round(wall, 3),
+        "goodput_per_sec": round(ok / wall, 3) if wall else 0.0,
+        "quota_per_sec": round(quota_per_sec, 3),
+        "quota_utilization": round(ok / wall / quota_per_sec, 3) if wall else 0.0,
+        "served_429": fake.errors.get(429, 0),
+        "served_5xx": sum(n for status, n in fake.errors.items() if status >= 500),
+        "requests_per_success": round((quota.admitted + quota.rejected) / ok, 3) if ok else None,
+    }
+    for priority, values in latencies.items():
+        row[f"{priority}_p50"] = round(percentile(values, 50), 3)
+        row[f"{priority}_p95"] = round(percentile(values, 95), 3)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--n", type=int, default=300, help="calls, all submitted at once")
+    parser.add_argument("--rpm", type=float, default=600, help="fake server requests/min")
+    parser.add_argument("--tpm", type=float, default=0, help="fake server tokens/min (0 = unlimited)")
+    parser.add_argument("--burst", type=float, default=1.0, help="seconds of quota the server lets through at once")
+    parser.add_argument("--rpm-hint", type=float, default=0, help="HIRESENSE_LLM_RPM for the scheduler (0 = learn from headers)")
+    parser.add_argument("--interactive", type=float, default=0.2, help="share of interactive calls")
+    parser.add_argument("--latency", default="0.2", help="fake LLM latency distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered with a 503")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    os.environ.setdefault("HIRESENSE_CACHE_DIR", tempfile.mkdtemp(prefix="hiresense-bench-"))
+
+    rows = []
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        if mode not in MODES:
+            parser.error(f"unknown mode {mode!r} (choose from {MODES})")
+        row = run_mode(mode, args)
+        rows.append(row)
+        print(
+            f"{mode:<10} ok {row['ok']:>4}/{row['calls']}  goodput {row['goodput_per_sec']:>6.2f}/s"
+            f" ({row['quota_utilization'] * 100:.0f}% of quota)  429s {row['served_429']:>4}"
+            f"  shed {row['shed']}  interactive p95 {row['interactive_p95']:.2f}s"
+            f"  batch p95 {row['batch_p95']:.2f}s"
+        )
+
+    if args.out:
+        result = {"revision": git_revision(), "config": vars(args) | {"out": str(args.out)}, "modes": rows}
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_skill_extract.py
+#
+# Throughput of the local skill matcher on synthetic resume texts.
+#
+#   python -m benchmarks.bench_skill_extract --resumes 5000 --out bench_skills.json
+
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.skill_lexicon import get_skill_matcher
+from benchmarks.synthetic_pdf import resume_lines
+
+
+def make_corpus(n: int, lines: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        "\n".join(["EXPERIENCE"] + resume_lines(rng, lines) + ["SKILLS", "Python, SQL, Docker, k8s, Google Cloud"])
+        for _ in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=40, help="bullet lines per resume (~90 chars each)")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.resumes, args.lines)
+
+    t0 = time.perf_counter()
+    matcher = get_skill_matcher()
+    compile_s = time.perf_counter() - t0
+
+    start = time.perf_counter()
+    hits = 0
+    for text in corpus:
+        hits += len(matcher.find(text))
+    elapsed = time.perf_counter() - start
+
+    chars = sum(len(t) for t in corpus)
+    report = {
+        "resumes": args.resumes,
+        "avg_chars": chars // args.resumes,
+        "compile_seconds": round(compile_s, 4),
+        "seconds": round(elapsed, 4),
+        "resumes_per_second": round(args.resumes / elapsed, 1),
+        "mb_per_second": round(chars / elapsed / 1e6, 2),
+        "matches": hits,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_snippet_select.py
+#
+# Throughput of snippet selection (BM25 + MinHash dedup + quotas) on
+# synthetic search-result sets with planted near-duplicates.
+#
+#   python -m benchmarks.bench_snippet_select --sets 200 --size 56 --out bench_snippets.json
+
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents.prompt_budget import count_tokens
+from agents.snippet_select import select_snippets
+
+SOURCES = ["glassdoor", "reddit", "leetcode_discuss", "geeksforgeeks", "blind", "web"]
+
+_PHRASES = [
+    "I interviewed for the {role} position at {company}",
+    "the online assessment had two medium leetcode questions",
+    "onsite loop was four rounds including system design and behavioral",
+    "they asked me to design a rate limiter and discuss trade-offs",
+    "recruiter was friendly and the process took three weeks",
+    "hiring manager round focused on past projects and ownership",
+    "got an offer after the team matching call",
+    "dynamic programming and graph questions came up twice",
+    "compensation was negotiated with a competing offer",
+    "the office had free lunch and a nice view",
+    "interviewers expected clean code and complexity analysis",
+    "behavioral questions followed the STAR format",
+]
+
+
+def make_set(rng: random.Random, size: int, dup_rate: float, company: str, role: str):
+    out = []
+    for i in range(size):
+        if out and rng.random() < dup_rate:
+            # near-duplicate: same text surfacing under another query, lightly edited
+            base = rng.choice(out)
+            words = base["snippet"].split()
+            if len(words) > 4:
+                words[rng.randrange(len(words))] = rng.choice(["really", "very", "quite", "also"])
+            out.append({**base, "snippet": " ".join(words), "url": f"https://example.com/{i}"})
+            continue
+        text = ". ".join(p.format(company=company, role=role) for p in rng.sample(_PHRASES, 4))
+        out.append(
+            {
+                "source": rng.choice(SOURCES),
+                "title": f"{company} {role} interview #{i}",
+                "snippet": text,
+                "url": f"https://example.com/{i}",
+            }
+        )
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sets", type=int, default=200)
+    parser.add_argument("--size", type=int, default=56, help="snippets per set (7 queries x 8 results)")
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    sets = [make_set(rng, args.size, args.dup_rate, "Google", "Software Engineer") for _ in range(args.sets)]
+
+    # warm up (numpy / tokenizer init)
+    select_snippets("Google", "Software Engineer", sets[0])
+
+    t0 = time.perf_counter()
+    picked = [select_snippets("Google", "Software Engineer", s) for s in sets]
+    elapsed = time.perf_counter() - t0
+
+    def tokens(rows):
+        return sum(count_tokens(f"{r['title']}\n{r['snippet']}") for r in rows)
+
+    kept = sum(len(p) for p in picked)
+    tokens_in = sum(tokens(s) for s in sets)
+    tokens_out = sum(tokens(p) for p in picked)
+
+    result = {
+        "sets": args.sets,
+        "snippets_per_set": args.size,
+        "dup_rate": args.dup_rate,
+        "seconds": round(elapsed, 3),
+        "sets_per_sec": round(args.sets / elapsed, 1),
+        "snippets_per_sec": round(args.sets * args.size / elapsed, 1),
+        "ms_per_set": round(1000 * elapsed / args.sets, 2),
+        "avg_kept": round(kept / args.sets, 1),
+        "avg_tokens_in": round(tokens_in / args.sets, 1),
+        "avg_tokens_out": round(tokens_out / args.sets, 1),
+    }
+    print(json.dumps(result, indent=2))
+    if args.out:
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
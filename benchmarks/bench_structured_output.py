@@ -0,0 +1,228 @@
+# benchmarks/bench_structured_output.py
+#
+# How malformed LLM answers are handled: the recorded role / resume / fit /
+# friendly responses (benchmarks/fixtures) are corrupted the ways models
+# actually fail – markdown fences, prose around the JSON, // comments,
+# trailing commas, truncation, missing fields, wrong types – and run
+# through four strategies:
+#
+#   legacy        – json.loads, empty defaults on failure (the old agents)
+#   legacy_retry  – legacy, plus a full re-call whenever anything failed
+#   repair        – agents/schemas.parse_output: local repair + validation
+#   repair_reask  – structured_output: repair, then one re-ask for only
+#                   the failed fields
+#
+#   python -m benchmarks.bench_structured_output --n 2000 --corrupt 0.3
+#
+# Reported per strategy: extra LLM calls, extra output tokens, responses
+# whose data was lost entirely, and fields that reached the next stage
+# missing or invalid.
+
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.bench_pipeline import git_revision
+
+STRATEGIES = ["legacy", "legacy_retry", "repair", "repair_reask"]
+
+
+def _tokens(text: str) -> int:
+    # same estimate as agents/fake_openai.py
+    return max(1, len(text) // 4)
+
+
+#############################################
+# CORRUPTIONS
+#############################################
+
+def _fenced(doc: Dict[str, Any], rng: random.Random) -> str:
+    return "```json\n" + json.dumps(doc, indent=2) + "\n```"
+
+
+def _prose(doc: Dict[str, Any], rng: random.Random) -> str:
+    return "Sure! Here is the analysis:\n" + json.dumps(doc) + "\nLet me know if you need anything else."
+
+
+def _comments(doc: Dict[str, Any], rng: random.Random) -> str:
+    lines = json.dumps(doc, indent=2).split("\n")
+    i = rng.randrange(1, len(lines))
+    lines[i] += "  // best guess"
+    return "\n".join(lines)
+
+
+def _trailing_comma(doc: Dict[str, Any], rng: random.Random) -> str:
+    text = json.dumps(doc, indent=2)
+    return text[: text.rfind("}")].rstrip() + ",\n}"
+
+
+def _truncated(doc: Dict[str, Any], rng: random.Random) -> str:
+    text = json.dumps(doc)
+    return text[: int(len(text) * rng.uniform(0.5, 0.95))]
+
+
+def _missing_field(doc: Dict[str, Any], rng: random.Random) -> str:
+    doc = dict(doc)
+    doc.pop(rng.choice(sorted(doc)))
+    return json.dumps(doc)
+
+
+def _wrong_type(doc: Dict[str, Any], rng: random.Random) -> str:
+    doc = dict(doc)
+    doc[rng.choice(sorted(doc))] = {"note": "see above"}
+    return json.dumps(doc)
+
+
+CORRUPTIONS: Dict[str, Callable[[Dict[str, Any], random.Random], str]] = {
+    "fenced": _fenced,
+    "prose": _prose,
+    "comments": _comments,
+    "trailing_comma": _trailing_comma,
+    "truncated": _truncated,
+    "missing_field": _missing_field,
+    "wrong_type": _wrong_type,
+}
+
+
+#############################################
+# RE-ASK SERVER
+#############################################
+
+class _ReaskServer:
+    """Answers a re-ask with the clean values of exactly the fields it asks for."""
+
+    def __init__(self, clean: Dict[str, Any]):
+        self.clean = clean
+        self.calls = 0
+        self.completion_tokens = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, **kwargs: Any) -> Any:
+        prompt = kwargs["messages"][-1]["content"]
+        asked = json.loads(prompt[prompt.index("{") :])
+        content = json.dumps({k: self.clean[k] for k in asked if k in self.clean})
+        self.calls += 1
+        self.completion_tokens += _tokens(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+#############################################
+# STRATEGIES
+#############################################
+
+def _bad_fields(schema: Dict[str, Any], data: Dict[str, Any], clean: Dict[str, Any]) -> int:
+    """Fields that reach the next stage missing, invalid or emptied although the model had content."""
+    from agents.schemas import validate
+
+    _, failed = validate(schema, {k: v for k, v in data.items() if k in schema})
+    return len(set(failed) | {k for k in schema if clean.get(k) and not data.get(k)})
+
+
+def _legacy(raw: str, schema: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """(data, whether json.loads failed and everything was defaulted)."""
+    try:
+        data = json.loads(raw)
+    except Exception:
+        return {}, True
+    return (data if isinstance(data, dict) else {}), False
+
+
+def run(strategy: str, samples: List[Tuple[str, Dict[str, Any], Dict[str, Any], str]]) -> Dict[str, Any]:
+    from agents.schemas import parse_output, structured_output
+
+    calls = tokens = lost = bad = 0
+    for name, schema, clean, raw in samples:
+        if strategy in ("legacy", "legacy_retry"):
+            data, was_lost = _legacy(raw, schema)
+            if strategy == "legacy_retry" and _bad_fields(schema, data, clean):
+                # the retry is assumed to come back clean
+                calls += 1
+                tokens += _tokens(json.dumps(clean))
+                data, was_lost = clean, False
+            lost += was_lost
+        elif strategy == "repair":
+            data, failed = parse_output(raw, schema, name)
+            lost += not any(data.get(k) for k in schema)
+        else:
+            server = _ReaskServer(clean)
+            request = {"messages": [{"role": "user", "content": "(original prompt)"}]}
+            data, failed = structured_output(server, request, raw, schema, name)
+            calls += server.calls
+            tokens += server.completion_tokens
+            lost += not any(data.get(k) for k in schema)
+        bad += _bad_fields(schema, data, clean)
+
+    return {
+        "strategy": strategy,
+        "responses": len(samples),
+        "extra_calls": calls,
+        "extra_output_tokens": tokens,
+        "responses_lost": lost,
+        "bad_fields": bad,
+    }
+
+
+def make_samples(n: int, corrupt: float, seed: int = 11) -> List[Tuple[str, Dict[str, Any], Dict[str, Any], str]]:
+    from agents import schemas
+    from agents.fake_openai import load_recordings
+
+    by_agent = {
+        "role_reality": ("role", schemas.ROLE_SCHEMA),
+        "resume_reality": ("resume", schemas.RESUME_SCHEMA),
+        "fit": ("fit", schemas.FIT_SCHEMA),
+        "friendly_summaries": ("friendly.summaries", schemas.SUMMARIES_SCHEMA),
+        "friendly_action_plan": ("friendly.action_plan", schemas.ACTION_PLAN_SCHEMA),
+        "friendly_round_deep_dive": ("friendly.round_deep_dive", schemas.ROUND_DEEP_DIVE_SCHEMA),
+        "friendly_round_tips": ("friendly.round_tips", schemas.ROUND_TIPS_SCHEMA),
+    }
+    docs = [(by_agent[r["agent"]], r["content"]) for r in load_recordings() if r["agent"] in by_agent]
+
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n):
+        (name, schema), clean = rng.choice(docs)
+        if rng.random() < corrupt:
+            raw = CORRUPTIONS[rng.choice(sorted(CORRUPTIONS))](clean, rng)
+        else:
+            raw = json.dumps(clean)
+        samples.append((name, schema, clean, raw))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=2000, help="responses")
+    parser.add_argument("--corrupt", type=float, default=0.3, help="share of malformed responses")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    import logging
+
+    # one warning per defaulted field would drown the table
+    logging.getLogger("hiresense.schemas").setLevel(logging.ERROR)
+
+    samples = make_samples(args.n, args.corrupt)
+    rows = []
+    for strategy in STRATEGIES:
+        row = run(strategy, samples)
+        rows.append(row)
+        print(
+            f"{strategy:<13} extra calls {row['extra_calls']:>5}  extra output tokens {row['extra_output_tokens']:>7}"
+            f"  responses lost {row['responses_lost']:>4}  bad fields {row['bad_fields']:>5}"
+        )
+
+    if args.out:
+        result = {"revision": git_revision(), "config": vars(args) | {"out": str(args.out)}, "strategies": rows}
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/prompt_budget_regression.py
+#
+# Fixed regression set for prompt compaction (fit + friendly stages).
+#
+# For every case in fixtures/prompt_regression.json, serializes the
+# profiles exactly as the agents do and reports tokens before/after plus
+# how many "must keep" facts survive in the prompt text. --inflate pads
+# every list with verbose filler to simulate long LLM profiles, which is
+# what actually pushes prompts over budget.
+#
+#   python -m benchmarks.prompt_budget_regression
+#   python -m benchmarks.prompt_budget_regression --inflate 40 --fit-budget 1500 --out prompt_budget.json
+#
+# Exits 1 if any must-keep fact is lost, so it can gate prompt changes.
+
+import sys
+import json
+import copy
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from agents import prompt_budget as pb
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures" / "prompt_regression.json"
+
+_FILLER = "Additional context repeated from public reviews and resume bullets that adds little new signal"
+
+
+def inflate(value, n: int):
+    """Append n filler entries to every list of strings (recursively)."""
+    if isinstance(value, dict):
+        return {k: inflate(v, n) for k, v in value.items()}
+    if isinstance(value, list):
+        items = [inflate(v, n) for v in value]
+        if items and all(isinstance(v, str) for v in items):
+            items += [f"{_FILLER} #{i}" for i in range(n)]
+        return items
+    return value
+
+
+def run_case(case, stage, parts, budget, drop_order):
+    out = pb.serialize_for_prompt(stage, parts, budget=budget, drop_order=drop_order)
+    text = "\n".join(out.values())
+    before = sum(pb.count_tokens(json.dumps(p, indent=2)) for p in parts.values())
+    after = sum(pb.count_tokens(s) for s in out.values())
+    facts = case["must_keep"][stage]
+    lost = [f for f in facts if f not in text]
+    return {
+        "case": case["id"],
+        "stage": stage,
+        "budget": budget,
+        "tokens_before": before,
+        "tokens_after": after,
+        "saved_pct": round(100.0 * (before - after) / before, 1) if before else 0.0,
+        "facts_kept": len(facts) - len(lost),
+        "facts_total": len(facts),
+        "lost": lost,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES)
+    parser.add_argument("--inflate", type=int, default=0, help="filler entries appended to every string list")
+    parser.add_argument("--fit-budget", type=int, default=pb.FIT_PROMPT_BUDGET)
+    parser.add_argument("--friendly-budget", type=int, default=pb.FRIENDLY_PROMPT_BUDGET)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    cases = json.loads(args.fixtures.read_text(encoding="utf-8"))["cases"]
+    rows = []
+    for case in cases:
+        c = inflate(copy.deepcopy(case), args.inflate) if args.inflate else case
+        role, resume, fit = c["role_profile"], c["resume_profile"], c["fit_profile"]
+        rows.append(run_case(case, "fit", {"role": role, "resume": resume}, args.fit_budget, pb.FIT_DROP_ORDER))
+        rows.append(
+            run_case(
+                case,
+                "friendly",
+                {"role": role, "resume": resume, "fit": fit},
+                args.friendly_budget,
+                pb.FRIENDLY_DROP_ORDER,
+            )
+        )
+
+    for r in rows:
+        print(
+            f"{r['case']:<24} {r['stage']:<9} {r['tokens_before']:>6} -> {r['tokens_after']:>6} tok"
+            f"  (-{r['saved_pct']:>4}%, budget {r['budget']})"
+            f"  facts {r['facts_kept']}/{r['facts_total']}" + (f"  LOST {r['lost']}" if r["lost"] else "")
+        )
+
+    result = {
+        "tokenizer": "tiktoken" if pb._get_encoder() is not None else "heuristic",
+        "inflate": args.inflate,
+        "rows": rows,
+        "per_stage": pb.budget_stats(),
+    }
+    if args.out:
+        args.out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    return 1 if any(r["lost"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# benchmarks/synthetic_pdf.py
+#
+# Dependency-free generator for synthetic resume-like PDFs, so the
+# extraction benchmarks don't need a corpus of real resumes.
+
+import random
+from typing import List
+
+_SKILLS = [
+    "Python", "SQL", "Java", "C++", "Go", "TypeScript", "React", "Node.js",
+    "AWS Lambda", "Google BigQuery", "Apache Spark", "Airflow", "Kafka",
+    "Docker", "Kubernetes", "PyTorch", "TensorFlow", "Pandas", "PostgreSQL",
+    "Redis", "Terraform", "GCP", "Azure", "Snowflake", "dbt", "FastAPI",
+]
+_VERBS = ["Built", "Designed", "Led", "Optimized", "Migrated", "Shipped", "Automated", "Scaled"]
+_THINGS = [
+    "a streaming ingestion pipeline", "the billing service", "an ML ranking model",
+    "a REST API gateway", "the data warehouse", "a CI/CD workflow", "an internal dashboard",
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def resume_lines(rng: random.Random, n: int) -> List[str]:
+    lines = []
+    for _ in range(n):
+        skills = ", ".join(rng.sample(_SKILLS, 3))
+        lines.append(
+            f"- {rng.choice(_VERBS)} {rng.choice(_THINGS)} using {skills}, "
+            f"improving throughput by {rng.randint(10, 90)}%."
+        )
+    return lines
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """Build a valid PDF with one Helvetica text block per page."""
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(b"")  # placeholder, filled once the page tree exists
+    pages_id = add(b"")
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for lines in pages:
+        ops = ["BT", "/F1 10 Tf", "12 TL", "50 760 Td"]
+        for line in lines:
+            ops.append(f"({_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(
+            add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+                b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+                % (pages_id, font_id, content_id)
+            )
+        )
+
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + body + b"\nendobj\n"
+
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        catalog_id,
+        xref_at,
+    )
+    return bytes(out)
+
+
+def make_resume_pdf(seed: int, n_pages: int, lines_per_page: int = 50) -> bytes:
+    rng = random.Random(seed)
+    pages = []
+    for p in range(n_pages):
+        header = [f"Candidate {seed} - Page {p + 1}", "EXPERIENCE"]
+        pages.append(header + resume_lines(rng, lines_per_page))
+    return make_pdf(pages)
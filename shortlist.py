@@ -0,0 +1,88 @@
+#############################################
+# HireSense – Shortlist CLI
+#
+# Rank every resume in an embedding store (built by
+# `batch.py --index-dir`) against one role, and send ONLY the top-k
+# through the LLM fit stage.
+#
+#   python shortlist.py --index-dir index/ --company Google \
+#       --role "Software Engineer" -k 50 --output shortlist.jsonl
+#############################################
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+# .env first: agent modules read HIRESENSE_* settings at import
+from agents.openai_client import load_env
+
+load_env()
+
+from agents.rate_limit import priority_scope
+from agents.search_agent import cached_search_public_interview_data
+from agents.role_reality_agent import build_role_profile_cached
+from agents.fit_agent import compute_fit_profile
+from agents.embedding_index import EmbeddingStore, shortlist
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Embedding shortlist + LLM fit for the top-k resumes.")
+    parser.add_argument("--index-dir", required=True, type=Path)
+    parser.add_argument("--company", required=True)
+    parser.add_argument("--role", required=True)
+    parser.add_argument("-k", type=int, default=50)
+    parser.add_argument("--output", required=True, type=Path)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--skip-search", action="store_true")
+    args = parser.parse_args(argv)
+
+    store = EmbeddingStore(args.index_dir)
+    print(f"{len(store)} resumes in index", file=sys.stderr)
+
+    results = [] if args.skip_search else cached_search_public_interview_data(args.company, args.role)
+    with priority_scope("batch"):
+        role_profile = build_role_profile_cached(company=args.company, role=args.role, results=results)
+
+    top = shortlist(store, role_profile, k=args.k)
+
+    def fit_one(rank: int, item_id: str, similarity: float) -> Dict[str, Any]:
+        row: Dict[str, Any] = {"rank": rank, "id": item_id, "similarity": round(similarity, 4)}
+        payload = store.get_payload(item_id) or {}
+        try:
+            with priority_scope("batch"):
+                fit = compute_fit_profile(
+                    role_profile=role_profile,
+                    resume_profile=payload.get("resume_profile", {}),
+                    role_title=args.role,
+                    extracted_skills=payload.get("skills", []),
+                )
+            row.update(
+                {
+                    "source": payload.get("source", ""),
+                    "fit_score_percentage": fit.get("fit_score_percentage"),
+                    "fit_summary_category": fit.get("fit_summary_category"),
+                    "fit_profile": fit,
+                    "error": "",
+                }
+            )
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        return row
+
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        rows = list(pool.map(lambda t: fit_one(t[0], *t[1]), enumerate(top, start=1)))
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    print(f"wrote {len(rows)} shortlisted resumes to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+# tests/conftest.py
+#
+# Offline unit tests: python -m pytest -q
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
@@ -0,0 +1,67 @@
+# tests/stubs.py
+#
+# Stand-in for a routed LLM client: answers chat.completions.create()
+# with fixed text, counts calls, and streams the same text on stream=True.
+
+import json
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Union
+
+from agents.fake_openai import load_recordings
+
+Answer = Union[str, Dict[str, Any], Callable[[Dict[str, Any]], Any]]
+
+
+def recorded(agent: str) -> Dict[str, Any]:
+    """The recorded answer of `agent` in benchmarks/fixtures."""
+    return next(dict(r["content"]) for r in load_recordings() if r["agent"] == agent)
+
+
+def _message(text: str) -> Any:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], usage=None)
+
+
+def _chunks(text: str, size: int = 16) -> List[Any]:
+    return [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i : i + size]))], usage=None)
+        for i in range(0, len(text), size)
+    ]
+
+
+class StubLLM:
+    """
+    `answer` is the reply text, a dict (sent as JSON) or a function of the
+    request kwargs returning either. `delay` seconds pass before each reply.
+    """
+
+    def __init__(self, answer: Answer, delay: float = 0.0):
+        self.answer = answer
+        self.delay = delay
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=self)
+
+    @property
+    def calls(self) -> int:
+        return len(self.requests)
+
+    def _text(self, kwargs: Dict[str, Any]) -> str:
+        with self._lock:
+            self.requests.append(kwargs)
+        answer = self.answer(kwargs) if callable(self.answer) else self.answer
+        return answer if isinstance(answer, str) else json.dumps(answer)
+
+    def create(self, **kwargs: Any) -> Any:
+        text = self._text(kwargs)
+        time.sleep(self.delay)
+        return iter(_chunks(text)) if kwargs.get("stream") else _message(text)
+
+
+class AsyncStubLLM(StubLLM):
+    async def create(self, **kwargs: Any) -> Any:
+        text = self._text(kwargs)
+        await asyncio.sleep(self.delay)
+        return _message(text)
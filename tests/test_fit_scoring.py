@@ -0,0 +1,46 @@
+# tests/test_fit_scoring.py
+
+import pytest
+
+from agents.fit_scoring import seniority_level
+
+
+@pytest.mark.parametrize(
+    "text, level",
+    [
+        ("Mid-level engineer with emerging leadership", 3),
+        ("mid level backend developer", 3),
+        ("Senior Software Engineer", 4),
+        ("Sr. Data Engineer", 4),
+        ("Team Lead", 4),
+        ("Staff Engineer", 5),
+        ("New-grad / entry level", 2),
+        ("Summer internship", 1),
+        ("intern", 1),
+    ],
+)
+def test_seniority_level(text, level):
+    assert seniority_level(text) == level
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["international experience", "midwest backend developer", "staffing agency", "demonstrated leadership", "2-5 years"],
+)
+def test_seniority_words_inside_other_words_do_not_count(text):
+    assert seniority_level(text) is None
+
+
+def test_score_fits_matches_score_fit_per_resume():
+    from agents.fit_scoring import score_fit, score_fits
+
+    role = {"skills_most_often_required": ["Python", "SQL", "Kubernetes"], "seniority_pattern": "Senior"}
+    resumes = [
+        {"resume_domain": "Backend Engineering", "seniority_signal": "senior"},
+        {"resume_domain": "Data Engineering", "seniority_signal": "junior"},
+        {},
+    ]
+    skills = [["Python", "SQL"], ["SQL"], []]
+    assert score_fits(role, resumes, "Backend Engineer", skills) == [
+        score_fit(role, r, "Backend Engineer", s) for r, s in zip(resumes, skills)
+    ]
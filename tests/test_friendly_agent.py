@@ -0,0 +1,223 @@
+# tests/test_friendly_agent.py
+#
+# Friendly report sections: caching, the shared round_deep_dive and
+# streaming, against one stub LLM client per section route.
+
+import pytest
+
+from agents import friendly_agent as fa
+from agents import schemas
+from agents.cache_store import LRUDiskCache
+from stubs import AsyncStubLLM, StubLLM, recorded
+
+ROLE = recorded("role_reality")
+RESUME = recorded("resume_reality")
+FIT = recorded("fit")
+
+
+class SectionLLMs:
+    """Stub clients by route ("friendly.summaries", ...), answering with the recordings."""
+
+    def __init__(self, monkeypatch, delay: float = 0.0):
+        self.sync = {}
+        self.aio = {}
+        self.answers = {}
+        self.delay = delay
+        monkeypatch.setattr(fa, "routed_client", lambda route: self._client(self.sync, StubLLM, route))
+        monkeypatch.setattr(fa, "async_routed_client", lambda route: self._client(self.aio, AsyncStubLLM, route))
+
+    def _client(self, clients, cls, route):
+        if route not in clients:
+            name = route.split(".", 1)[1]
+            clients[route] = cls(lambda kwargs: self._answer(name, kwargs), self.delay)
+        return clients[route]
+
+    def _answer(self, name, kwargs):
+        answer = self.answers.get(name) or recorded(f"friendly_{name}")
+        return answer(kwargs) if callable(answer) else answer
+
+    def calls(self, name: str) -> int:
+        route = f"friendly.{name}"
+        return sum(c.calls for c in (self.sync.get(route), self.aio.get(route)) if c is not None)
+
+
+@pytest.fixture
+def llms(monkeypatch, tmp_path):
+    monkeypatch.setattr(fa, "_section_cache", LRUDiskCache("friendly_section", cache_dir=tmp_path))
+    monkeypatch.setattr(schemas, "REASK_ENABLED", False)
+    return SectionLLMs(monkeypatch)
+
+
+def _report(resume=RESUME, fit=FIT, **kwargs):
+    return fa.build_friendly_report(
+        company="Acme", role="Backend Engineer", resume_text="resume",
+        role_profile=ROLE, resume_profile=resume, fit_profile=fit, **kwargs,
+    )
+
+
+def test_callers_cannot_mutate_cached_sections(llms):
+    first = _report()
+    first["friendly_summary"] = "edited"
+    first["round_deep_dive"][0]["tips"].append("edited tip")
+    first["action_plan"]["quick_wins"].clear()
+
+    again = _report()
+    assert again["friendly_summary"] == recorded("friendly_summaries")["friendly_summary"]
+    assert "edited tip" not in again["round_deep_dive"][0]["tips"]
+    assert again["action_plan"]["quick_wins"]
+
+
+def _stream(**kwargs):
+    return fa.stream_friendly_report(
+        company="Acme", role="Backend Engineer", resume_text="resume",
+        role_profile=ROLE, resume_profile=RESUME, fit_profile=FIT, **kwargs,
+    )
+
+
+def test_stalled_section_stream_stops_at_the_deadline(llms):
+    import time
+
+    llms.delay = 1.0
+    # the abandoned workers answer after the test ends: nothing they send may be cached
+    llms.answers = dict.fromkeys(["summaries", "action_plan", "round_deep_dive", "round_tips"], "stalled")
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        list(_stream(deadline=time.monotonic() + 0.3))
+    assert time.monotonic() - start < 0.8
+
+
+def test_concurrent_reports_share_one_deep_dive_and_leave_no_lock_behind(llms):
+    from concurrent.futures import ThreadPoolExecutor
+
+    llms.delay = 0.05
+    resumes = [{**RESUME, "resume_domain": f"domain {i}"} for i in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        reports = list(pool.map(lambda r: _report(resume=r), resumes))
+
+    assert llms.calls("round_deep_dive") == 1
+    assert llms.calls("summaries") == 4
+    assert all(r["round_deep_dive"] for r in reports)
+    assert len(fa._key_locks) == 0
+
+
+def _calls(llms):
+    return {name: llms.calls(name) for name in ("summaries", "action_plan", "round_deep_dive", "round_tips")}
+
+
+def test_unchanged_inputs_reuse_every_section(llms):
+    first = _report()
+    before = _calls(llms)
+    assert before == {"summaries": 1, "action_plan": 1, "round_deep_dive": 1, "round_tips": 1}
+
+    assert _report() == first
+    assert _calls(llms) == before
+
+
+def test_changed_input_reruns_only_the_sections_it_feeds(llms):
+    _report()
+    # seniority_fit reaches summaries (the whole fit profile), not action_plan or round tips
+    _report(fit={**FIT, "seniority_fit": "a different note"})
+    assert _calls(llms) == {"summaries": 2, "action_plan": 1, "round_deep_dive": 1, "round_tips": 1}
+
+
+def test_defaulted_section_is_not_cached(llms):
+    llms.answers["action_plan"] = {"action_plan": "not an object"}
+
+    report = _report()
+    assert report.failed == ["action_plan"]
+    assert report["action_plan"] == fa.SECTIONS[1].defaults["action_plan"]
+
+    _report()
+    assert llms.calls("action_plan") == 2
+    assert llms.calls("summaries") == 1
+
+
+def test_async_report_matches_sync(llms, monkeypatch):
+    import asyncio
+
+    sync = _report()
+    monkeypatch.setattr(fa, "_section_cache", LRUDiskCache("friendly_section", persist=False))
+    assert asyncio.run(
+        fa.build_friendly_report_async(
+            company="Acme", role="Backend Engineer", resume_text="resume",
+            role_profile=ROLE, resume_profile=RESUME, fit_profile=FIT,
+        )
+    ) == sync
+    assert sum(c.calls for c in llms.aio.values()) == 4
+
+
+def _candidate(i: int):
+    resume = {**RESUME, "core_strengths_raw": [f"strength of candidate {i}"]}
+    return resume
+
+
+def _tips_for_candidate(kwargs):
+    """Round tips naming the candidate whose strengths are in the prompt."""
+    prompt = kwargs["messages"][-1]["content"]
+    who = next(f"candidate {i}" for i in range(10) if f"strength of candidate {i}" in prompt)
+    rounds = recorded("friendly_round_deep_dive")["round_deep_dive"]
+    return {"round_tips": [{"round_name": r["round_name"], "tips": [f"tip for {who}"]} for r in rounds]}
+
+
+def test_deep_dive_is_shared_and_tips_are_per_candidate(llms):
+    llms.answers["round_tips"] = _tips_for_candidate
+
+    reports = [_report(resume=_candidate(i)) for i in range(3)]
+
+    assert llms.calls("round_deep_dive") == 1
+    assert llms.calls("round_tips") == 3
+    shared = recorded("friendly_round_deep_dive")["round_deep_dive"]
+    for i, report in enumerate(reports):
+        for r, base in zip(report["round_deep_dive"], shared):
+            # the candidate's tip first, then the shared ones
+            assert r["tips"] == [f"tip for candidate {i}"] + base["tips"]
+            assert r["what_they_look_for"] == base["what_they_look_for"]
+
+
+def test_deep_dive_key_ignores_company_and_role_spelling(llms):
+    _report()
+    fa.build_friendly_report(
+        company=" acme", role="backend  engineer", resume_text="resume",
+        role_profile=ROLE, resume_profile=_candidate(1), fit_profile=FIT,
+    )
+    assert llms.calls("round_deep_dive") == 1
+
+
+def test_user_review_gets_its_own_deep_dive(llms):
+    _report()
+    _report(user_review_text="Three rounds, the last one on system design.")
+    assert llms.calls("round_deep_dive") == 2
+
+
+def test_async_candidates_share_one_deep_dive_call(llms):
+    import asyncio
+
+    llms.answers["round_tips"] = _tips_for_candidate
+    llms.delay = 0.05
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                fa.build_friendly_report_async(
+                    company="Acme", role="Backend Engineer", resume_text="resume",
+                    role_profile=ROLE, resume_profile=_candidate(i), fit_profile=FIT,
+                )
+                for i in range(4)
+            )
+        )
+
+    reports = asyncio.run(main())
+    assert llms.calls("round_deep_dive") == 1
+    assert [r["round_deep_dive"][0]["tips"][0] for r in reports] == [f"tip for candidate {i}" for i in range(4)]
+
+
+def test_stream_yields_partials_then_the_full_report(llms, monkeypatch):
+    items = list(_stream(min_interval=0.0))
+
+    assert len(items) > 1
+    final = items[-1]
+    for partial in items[:-1]:
+        assert set(partial) <= set(final)
+    # same report as the non-streaming build, from a fresh cache
+    monkeypatch.setattr(fa, "_section_cache", LRUDiskCache("friendly_section", persist=False))
+    assert final == _report()
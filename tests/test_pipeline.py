@@ -0,0 +1,149 @@
+# tests/test_pipeline.py
+#
+# Stage checkpoints of run_hire_sense() with the agents replaced by counters.
+
+from collections import Counter
+
+import pytest
+
+from agents import model_router, pipeline
+from agents.cache_store import LRUDiskCache
+from agents.schemas import StructuredResult
+
+RESULTS = [{"source": "web", "title": "t", "snippet": "s", "url": "https://x"}]
+
+
+@pytest.fixture
+def stages(monkeypatch, tmp_path):
+    """Counting stand-ins for the four agents; `stages.fail` names stages that raise."""
+    monkeypatch.setattr(pipeline, "_checkpoints", LRUDiskCache("stage_checkpoint", cache_dir=tmp_path))
+    calls = Counter()
+    state = {"fail": set(), "defaulted": set()}
+
+    def stage(name, fields):
+        def run(**kwargs):
+            calls[name] += 1
+            if name in state["fail"]:
+                raise RuntimeError(f"{name} failed")
+            failed = [fields[0]] if name in state["defaulted"] else []
+            return StructuredResult({f: f"{name} {f}" for f in fields}, failed)
+
+        return run
+
+    monkeypatch.setattr(pipeline, "build_role_profile_cached", stage("role_reality", ["rounds", "public_interview_summary"]))
+    monkeypatch.setattr(pipeline, "build_resume_profile", stage("resume_reality", ["resume_domain"]))
+    monkeypatch.setattr(pipeline, "compute_fit_profile", stage("fit", ["seniority_fit"]))
+    monkeypatch.setattr(pipeline, "build_friendly_report", stage("friendly", ["friendly_summary"]))
+    for name in ("build_role_profile_cached", "build_resume_profile", "compute_fit_profile", "build_friendly_report"):
+        monkeypatch.setattr(pipeline, f"{name}_async", _async(getattr(pipeline, name)))
+    calls.state = state
+    return calls
+
+
+def _async(fn):
+    async def run(**kwargs):
+        return fn(**kwargs)
+
+    return run
+
+
+def _run():
+    return pipeline.run_hire_sense(
+        company="Acme", role="Backend Engineer", resume_text="resume", extracted_skills="Python",
+        results=RESULTS, checkpoints=True,
+    )
+
+
+def test_rerun_resumes_after_the_failed_stage(stages):
+    stages.state["fail"] = {"friendly"}
+    with pytest.raises(RuntimeError):
+        _run()
+
+    stages.state["fail"] = set()
+    out = _run()
+    assert out["friendly_report"]["friendly_summary"] == "friendly friendly_summary"
+    # only the stage that failed ran twice
+    assert stages == Counter(role_reality=1, resume_reality=1, fit=1, friendly=2)
+
+
+def test_defaulted_stage_result_is_not_checkpointed(stages):
+    stages.state["defaulted"] = {"fit"}
+    _run()
+    _run()
+    assert stages["fit"] == 2
+    assert stages["role_reality"] == 1
+
+
+
+def test_checkpoint_hits_are_copies(stages):
+    first = _run()
+    first["role_profile_raw"]["rounds"] = "edited"
+    assert _run()["role_profile_raw"]["rounds"] == "role_reality rounds"
+
+
+def test_stalled_friendly_stream_raises_stage_timeout(stages, monkeypatch):
+    import time
+
+    def stalled(deadline=None, **kwargs):
+        # like stream_friendly_report with no section answering
+        time.sleep(max(0.0, deadline - time.monotonic()))
+        raise TimeoutError
+        yield
+
+    monkeypatch.setattr(pipeline, "stream_friendly_report", stalled)
+    stream = pipeline.iter_hire_sense(
+        company="Acme", role="Backend Engineer", resume_text="resume", extracted_skills="Python",
+        results=RESULTS, stream_friendly=True, stage_timeouts={"friendly": 0.2}, checkpoints=False,
+    )
+    with pytest.raises(pipeline.StageTimeoutError) as err:
+        list(stream)
+    assert err.value.stage == "friendly"
+
+
+def test_stages_are_yielded_as_they_finish(stages, monkeypatch):
+    def streamed(deadline=None, **kwargs):
+        yield {"intro_message": "Hi"}
+        yield {"intro_message": "Hi", "friendly_summary": "Good fit"}
+
+    monkeypatch.setattr(pipeline, "stream_friendly_report", streamed)
+    order = [
+        stage
+        for stage, _ in pipeline.iter_hire_sense(
+            company="Acme", role="Backend Engineer", resume_text="resume", extracted_skills="Python",
+            results=RESULTS, stream_friendly=True, checkpoints=False,
+        )
+    ]
+    assert sorted(order[:2]) == ["resume_reality", "role_reality"]
+    assert order[2:] == ["fit", "friendly_partial", "friendly_partial", "friendly"]
+
+
+def test_prompt_change_reruns_only_that_stage(stages, monkeypatch):
+    _run()
+    monkeypatch.setitem(pipeline.STAGE_VERSIONS, "friendly", lambda: "friendly-prompt-v2")
+    _run()
+    assert stages == Counter(role_reality=1, resume_reality=1, fit=1, friendly=2)
+
+
+def test_route_change_at_runtime_reruns_that_stage(stages, monkeypatch):
+    _run()
+    before = {stage: version() for stage, version in pipeline.STAGE_VERSIONS.items()}
+    monkeypatch.setitem(model_router.ROUTES, "fit", ("small",))
+    model_router.configure_routing(routes={"fit": ("small", "large")})
+    after = {stage: version() for stage, version in pipeline.STAGE_VERSIONS.items()}
+    assert [stage for stage in before if before[stage] != after[stage]] == ["fit"]
+    _run()
+    assert stages == Counter(role_reality=1, resume_reality=1, fit=2, friendly=1)
+
+
+def test_async_pipeline_shares_the_checkpoints(stages):
+    import asyncio
+
+    _run()
+    out = asyncio.run(
+        pipeline.run_hire_sense_async(
+            company="Acme", role="Backend Engineer", resume_text="resume", extracted_skills="Python",
+            results=RESULTS, checkpoints=True,
+        )
+    )
+    assert out == _run()
+    assert stages == Counter(role_reality=1, resume_reality=1, fit=1, friendly=1)
@@ -0,0 +1,157 @@
+# tests/test_rate_limit.py
+#
+# In-flight slots held by streamed completions.
+
+import gc
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from agents.rate_limit import AsyncRateLimitedClient, RateLimitedClient, RateLimiter
+
+CHUNKS = [SimpleNamespace(choices=[], usage=None), SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=12))]
+
+
+class FakeStream:
+    def __init__(self):
+        self.closed = False
+        self._chunks = iter(CHUNKS)
+
+    def __iter__(self):
+        return self._chunks
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncFakeStream:
+    def __init__(self):
+        self.closed = False
+
+    async def __aiter__(self):
+        for chunk in CHUNKS:
+            yield chunk
+
+    async def close(self):
+        self.closed = True
+
+
+def _client(stream_cls, client_cls=RateLimitedClient):
+    if client_cls is RateLimitedClient:
+        create = lambda **kwargs: stream_cls()
+    else:
+        async def create(**kwargs):
+            return stream_cls()
+    raw = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return client_cls(raw, RateLimiter(max_in_flight=1))
+
+
+def _stream(client):
+    return client.chat.completions.create(messages=[], stream=True)
+
+
+def _acquires_in_time(limiter, timeout=1.0):
+    got = threading.Event()
+
+    def take():
+        limiter.acquire_blocking(1)
+        got.set()
+
+    threading.Thread(target=take, daemon=True).start()
+    return got.wait(timeout)
+
+
+def test_closing_an_unread_stream_frees_its_slot():
+    client = _client(FakeStream)
+    limiter = client.chat.completions._limiter
+
+    stream = _stream(client)
+    assert not _acquires_in_time(limiter, 0.2)
+    stream.close()
+    assert stream._stream.closed
+    assert _acquires_in_time(limiter)
+
+
+def test_with_block_and_draining_free_the_slot():
+    client = _client(FakeStream)
+    limiter = client.chat.completions._limiter
+
+    with _stream(client) as stream:
+        next(stream)
+    assert _acquires_in_time(limiter)
+    limiter.release_blocking()
+
+    assert len(list(_stream(client))) == len(CHUNKS)
+    assert _acquires_in_time(limiter)
+
+
+def test_dropping_an_unread_stream_frees_its_slot():
+    client = _client(FakeStream)
+    limiter = client.chat.completions._limiter
+
+    stream = _stream(client)
+    del stream
+    gc.collect()
+    assert _acquires_in_time(limiter)
+
+
+def test_async_stream_dropped_with_no_running_loop_frees_its_slot():
+    client = _client(AsyncFakeStream, AsyncRateLimitedClient)
+    limiter = client.chat.completions._limiter
+
+    async def main():
+        held = [await _stream(client)]
+        # the last reference goes away on a thread with no event loop
+        await asyncio.to_thread(held.clear)
+        return await asyncio.wait_for(_stream(client), 1.0)
+
+    stream = asyncio.run(main())
+    assert stream is not None
+
+
+def test_async_close_frees_the_slot():
+    client = _client(AsyncFakeStream, AsyncRateLimitedClient)
+
+    async def main():
+        stream = await _stream(client)
+        await stream.close()
+        assert stream._stream.closed
+        async with await asyncio.wait_for(_stream(client), 1.0) as again:
+            return [chunk async for chunk in again]
+
+    assert len(asyncio.run(main())) == len(CHUNKS)
+
+
+def test_cancelled_async_call_gives_its_slot_back():
+    async def slow_create(**kwargs):
+        await asyncio.sleep(10)
+
+    raw = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=slow_create)))
+    client = AsyncRateLimitedClient(raw, RateLimiter(max_in_flight=1))
+    limiter = client.chat.completions._limiter
+
+    async def main():
+        # a stage timeout cancels the call while the request is in flight
+        try:
+            await asyncio.wait_for(client.chat.completions.create(messages=[]), 0.05)
+        except asyncio.TimeoutError:
+            pass
+        assert limiter._slots()._value == 1
+        await asyncio.wait_for(limiter.acquire(1), 1.0)
+
+    asyncio.run(main())
+
+
+def test_interrupted_sync_call_gives_its_slot_back():
+    def interrupted(**kwargs):
+        raise KeyboardInterrupt
+
+    raw = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=interrupted)))
+    client = RateLimitedClient(raw, RateLimiter(max_in_flight=1))
+    limiter = client.chat.completions._limiter
+
+    try:
+        client.chat.completions.create(messages=[])
+    except KeyboardInterrupt:
+        pass
+    assert _acquires_in_time(limiter)
@@ -0,0 +1,101 @@
+# tests/test_resume_parser.py
+#
+# parse_resume_cached() against a stub LLM client.
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agents import resume_parser_agent as rp
+from agents.cache_store import LRUDiskCache
+
+RESUME = "Jane Doe\nSkills: Python, Go, SQL\nExperience\nBackend Engineer at Acme"
+
+SECTIONS = {
+    "clean_text": RESUME,
+    "education": [],
+    "experience": ["Backend Engineer at Acme"],
+    "projects": [],
+    "certifications": [],
+    "summary_points": ["Builds APIs"],
+    "detected_resume_domain": "Backend Engineering",
+    "tech_stack_clusters": ["Python / SQL"],
+    "skills_extracted": ["Python", "Go", "SQL"],
+}
+
+
+class StubLLM:
+    """Answers every parser call with `answer`; counts calls."""
+
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def _response(self):
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.answer))])
+
+    def create(self, **kwargs):
+        return self._response()
+
+
+class AsyncStubLLM(StubLLM):
+    async def create(self, **kwargs):
+        return self._response()
+
+
+@pytest.fixture
+def llm(monkeypatch, tmp_path):
+    monkeypatch.setattr(rp, "_parse_cache", LRUDiskCache("resume_parse", cache_dir=tmp_path))
+    monkeypatch.setattr(rp, "SKILL_EXTRACTOR", "local")
+    monkeypatch.setattr(rp, "SKILL_LLM_ENRICH", False)
+
+    def install(answer: str):
+        stub, astub = StubLLM(answer), AsyncStubLLM(answer)
+        monkeypatch.setattr(rp, "routed_client", lambda route: stub)
+        monkeypatch.setattr(rp, "async_routed_client", lambda route: astub)
+        return stub, astub
+
+    return install
+
+
+def test_callers_cannot_mutate_the_cache(llm):
+    stub, _ = llm(json.dumps(SECTIONS))
+
+    first = rp.parse_resume_cached(RESUME)
+    first["skills_raw_exact"].append("COBOL")
+    first["experience"].clear()
+
+    second = rp.parse_resume_cached(RESUME)
+    assert stub.calls == 1
+    assert "COBOL" not in second["skills_raw_exact"]
+    assert second["experience"] == ["Backend Engineer at Acme"]
+
+
+@pytest.mark.parametrize("answer", ["Sorry, I can't help with that.", json.dumps(SECTIONS)[:-40]])
+def test_fallback_parses_are_not_cached(llm, answer):
+    stub, _ = llm(answer)
+
+    parsed = rp.parse_resume_cached(RESUME)
+    assert parsed["resume_text"]
+    assert not parsed.complete
+
+    rp.parse_resume_cached(RESUME)
+    assert stub.calls == 2
+
+
+def test_async_variant_copies_and_skips_fallbacks(llm):
+    _, astub = llm(json.dumps(SECTIONS))
+    first = asyncio.run(rp.parse_resume_cached_async(RESUME))
+    first["summary_points"].append("edited")
+    assert asyncio.run(rp.parse_resume_cached_async(RESUME))["summary_points"] == ["Builds APIs"]
+    assert astub.calls == 1
+
+    _, astub = llm("not json")
+    other = RESUME + "\nProjects"
+    asyncio.run(rp.parse_resume_cached_async(other))
+    asyncio.run(rp.parse_resume_cached_async(other))
+    assert astub.calls == 2
@@ -0,0 +1,106 @@
+# tests/test_role_reality.py
+#
+# The shared role-profile cache against a stub LLM client.
+
+import json
+
+import pytest
+
+from agents import model_router
+from agents import role_reality_agent as rr
+from agents import schemas
+from agents.cache_store import LRUDiskCache
+from stubs import AsyncStubLLM, StubLLM, recorded
+
+RESULTS = [{"source": "glassdoor", "title": "Acme interview", "snippet": "Two coding rounds.", "url": "https://x"}]
+
+
+@pytest.fixture
+def role_llm(monkeypatch, tmp_path):
+    monkeypatch.setattr(rr, "_role_cache", LRUDiskCache("role_profile", cache_dir=tmp_path))
+    monkeypatch.setattr(schemas, "REASK_ENABLED", False)
+
+    def install(answer, delay=0.0):
+        stub, astub = StubLLM(answer, delay), AsyncStubLLM(answer, delay)
+        monkeypatch.setattr(rr, "routed_client", lambda route: stub)
+        monkeypatch.setattr(rr, "async_routed_client", lambda route: astub)
+        return stub, astub
+
+    return install
+
+
+def test_complete_profile_is_shared(role_llm):
+    stub, _ = role_llm(recorded("role_reality"))
+
+    first = rr.build_role_profile_cached("Acme", "Backend Engineer", RESULTS)
+    again = rr.build_role_profile_cached(" acme", "backend engineer ", RESULTS)
+    assert stub.calls == 1
+    assert again == first
+
+
+@pytest.mark.parametrize("cut", [None, 60])
+def test_degraded_profile_is_not_shared(role_llm, cut):
+    answer = recorded("role_reality")
+    if cut is None:
+        # a wrongly typed field is defaulted
+        answer["skills_most_often_required"] = {"not": "a list"}
+        text = json.dumps(answer)
+    else:
+        # cut off mid-answer and repaired locally
+        text = json.dumps(answer)[:-cut]
+    stub, _ = role_llm(text)
+
+    profile = rr.build_role_profile_cached("Acme", "Backend Engineer", RESULTS)
+    assert profile.failed
+    rr.build_role_profile_cached("Acme", "Backend Engineer", RESULTS)
+    assert stub.calls == 2
+
+
+def test_callers_cannot_mutate_the_shared_profile(role_llm):
+    role_llm(recorded("role_reality"))
+
+    first = rr.build_role_profile_cached("Acme", "Backend Engineer", RESULTS)
+    first["skills_most_often_required"].append("COBOL")
+    first["public_interview_summary"] = "edited"
+
+    again = rr.build_role_profile_cached("Acme", "Backend Engineer", RESULTS)
+    assert "COBOL" not in again["skills_most_often_required"]
+    assert again["public_interview_summary"] == recorded("role_reality")["public_interview_summary"]
+
+
+def test_async_waiters_share_one_call_but_not_one_dict(role_llm):
+    import asyncio
+
+    _, astub = role_llm(recorded("role_reality"), delay=0.05)
+
+    async def main():
+        return await asyncio.gather(
+            *(rr.build_role_profile_cached_async("Acme", "Backend Engineer", RESULTS) for _ in range(5))
+        )
+
+    profiles = asyncio.run(main())
+    assert astub.calls == 1
+    assert len({id(p) for p in profiles}) == 5
+    profiles[0]["rounds"].clear()
+    assert all(p["rounds"] for p in profiles[1:])
+
+
+def test_threads_share_one_call_and_leave_no_lock_behind(role_llm):
+    from concurrent.futures import ThreadPoolExecutor
+
+    stub, _ = role_llm(recorded("role_reality"), delay=0.05)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        profiles = list(
+            pool.map(lambda i: rr.build_role_profile_cached("Acme", "Backend Engineer", RESULTS), range(6))
+        )
+    assert stub.calls == 1
+    assert all(p == profiles[0] for p in profiles)
+    assert len(rr._key_locks) == 0
+
+
+def test_route_change_at_runtime_changes_the_key(monkeypatch):
+    key = rr.role_profile_cache_key("Acme", "Backend Engineer", [])
+    monkeypatch.setitem(model_router.ROUTES, "role_reality", ("large", "small"))
+    model_router.configure_routing(routes={"role_reality": ("small",)})
+    assert rr.role_profile_cache_key("Acme", "Backend Engineer", []) != key
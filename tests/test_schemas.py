@@ -0,0 +1,31 @@
+# tests/test_schemas.py
+
+import json
+
+from agents.schemas import ROLE_SCHEMA, RESUME_SCHEMA, defaults, parse_output
+
+
+def test_clean_answer_passes():
+    doc = {k: ["x"] if isinstance(v, list) else "x" for k, v in RESUME_SCHEMA.items()}
+    data, failed = parse_output(json.dumps(doc), RESUME_SCHEMA, "resume")
+    assert failed == []
+    assert data["resume_domain"] == "x"
+
+
+def test_truncated_object_marks_last_field():
+    raw = '{"resume_domain": "Backend", "core_strengths_raw": ["Python", "SQ'
+    data, failed = parse_output(raw, RESUME_SCHEMA, "resume")
+    assert data["resume_domain"] == "Backend"
+    assert "core_strengths_raw" in failed
+    assert "resume_domain" not in failed
+
+
+def test_truncated_top_level_array_fails_every_field():
+    data, failed = parse_output('[{"a":1},{"b":[1,', ROLE_SCHEMA, "role")
+    assert sorted(failed) == sorted(ROLE_SCHEMA)
+    assert data == defaults(ROLE_SCHEMA)
+
+
+def test_non_object_answer_fails_every_field():
+    data, failed = parse_output('"just text"', ROLE_SCHEMA, "role")
+    assert sorted(failed) == sorted(ROLE_SCHEMA)
@@ -0,0 +1,155 @@
+# tests/test_search_agent.py
+#
+# search_public_interview_data() against a local fake SerpAPI server.
+
+import json
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from agents import search_agent
+
+COMPANY = "Acme"
+ROLE = "Backend Engineer"
+
+
+def _item(url: str) -> dict:
+    return {"title": f"title {url}", "snippet": f"snippet {url}", "link": url}
+
+
+class FakeSerpAPI:
+    """query -> (delay seconds, organic_results); unknown queries get nothing."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                q = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+                fake.requests.append(q)
+                delay, items = fake.answers.get(q, (0.0, []))
+                time.sleep(delay)
+                body = json.dumps({"organic_results": items}).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    # the client gave up on this query
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/search"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def serpapi(monkeypatch):
+    servers = []
+
+    def start(answers):
+        fake = FakeSerpAPI(answers)
+        servers.append(fake)
+        monkeypatch.setattr(search_agent, "SERPAPI_URL", fake.url)
+        monkeypatch.setattr(search_agent, "SERPAPI_KEY", "test-key")
+        return fake
+
+    yield start
+    for fake in servers:
+        fake.close()
+
+
+def test_results_keep_query_order_and_drop_duplicate_urls(serpapi):
+    q = search_agent.build_search_queries(COMPANY, ROLE)
+    serpapi(
+        {
+            # the first query answers last: order must follow the queries, not arrival
+            q[0]: (0.3, [_item("https://a.example/1"), _item("https://a.example/2")]),
+            q[1]: (0.0, [_item("https://a.example/2"), _item("https://www.glassdoor.com/3")]),
+            q[2]: (0.0, [_item("https://www.reddit.com/4"), {"title": "no snippet", "link": "https://x"}]),
+        }
+    )
+
+    results = search_agent.search_public_interview_data(COMPANY, ROLE, deadline=5)
+
+    assert [r["url"] for r in results] == [
+        "https://a.example/1",
+        "https://a.example/2",
+        "https://www.glassdoor.com/3",
+        "https://www.reddit.com/4",
+    ]
+    assert [r["source"] for r in results] == ["web", "web", "glassdoor", "reddit"]
+    assert results.complete
+
+
+def test_deadline_returns_partial_results(serpapi):
+    q = search_agent.build_search_queries(COMPANY, ROLE)
+    serpapi({q[0]: (0.0, [_item("https://fast.example")]), q[1]: (3.0, [_item("https://slow.example")])})
+
+    start = time.monotonic()
+    results = search_agent.search_public_interview_data(COMPANY, ROLE, deadline=0.5)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 1.5
+    assert [r["url"] for r in results] == ["https://fast.example"]
+    assert not results.complete
+
+
+def test_running_query_stops_at_the_deadline(serpapi):
+    # an abandoned query must not hold its worker / connection for the full read timeout
+    serpapi({"slow": (3.0, [_item("https://slow.example")])})
+
+    start = time.monotonic()
+    assert search_agent._query_serpapi("slow", deadline_at=time.monotonic() + 0.3) == []
+    assert time.monotonic() - start < 1.0
+
+
+def test_query_past_its_deadline_is_not_sent(serpapi):
+    fake = serpapi({})
+    assert search_agent._query_serpapi("late query", deadline_at=time.monotonic() - 1) == []
+    assert fake.requests == []
+
+
+def test_missing_key_logs_a_warning(monkeypatch, caplog):
+    monkeypatch.setattr(search_agent, "SERPAPI_KEY", None)
+    monkeypatch.setattr(search_agent, "_serpapi_key", lambda: None)
+    monkeypatch.setattr(search_agent, "_warned_no_key", False)
+
+    with caplog.at_level(logging.WARNING, logger="hiresense.search"):
+        assert search_agent._query_serpapi("anything") == []
+    assert "SERPAPI_API_KEY is not set" in caplog.text
+
+
+def test_only_complete_searches_are_cached(serpapi, monkeypatch, tmp_path):
+    from agents.search_cache import SearchResultCache
+
+    cache = SearchResultCache(path=tmp_path / "search.sqlite3")
+    monkeypatch.setattr(search_agent, "_search_cache", cache)
+    monkeypatch.setattr(search_agent, "SEARCH_DEADLINE_SECONDS", 0.5)
+    q = search_agent.build_search_queries(COMPANY, ROLE)
+    fake = serpapi({q[0]: (0.0, [_item("https://fast.example")]), q[1]: (3.0, [_item("https://slow.example")])})
+
+    partial = search_agent.cached_search_public_interview_data(COMPANY, ROLE)
+    assert [r["url"] for r in partial] == ["https://fast.example"]
+    assert cache.stats()["entries"] == 0
+
+    fake.answers[q[1]] = (0.0, [_item("https://slow.example")])
+    full = search_agent.cached_search_public_interview_data(COMPANY, ROLE)
+    assert [r["url"] for r in full] == ["https://fast.example", "https://slow.example"]
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,41 @@
+# tests/test_skill_lexicon.py
+
+import pytest
+
+from agents.skill_lexicon import get_skill_matcher
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Owned the Go to market plan",
+        "Presented to C-level stakeholders",
+        "Sales, Go-to-market",
+        "Julia Smith\nSoftware Engineer",
+        "John R. Smith",
+        "Excel at Swift delivery",
+        "Express delivery of features on Spring release",
+    ],
+)
+def test_common_words_and_names_are_not_skills(text):
+    assert get_skill_matcher().exact_skills(text) == []
+
+
+@pytest.mark.parametrize(
+    "text, skills",
+    [
+        ("Python, Go, SQL", ["Python", "Go", "SQL"]),
+        ("Languages: Go", ["Go"]),
+        ("Technical Skills\nGo and Rust", ["Go", "Rust"]),
+        ("- Julia\n- Scala", ["Julia", "Scala"]),
+        ("Experience with Go and Kubernetes", ["Go", "Kubernetes"]),
+        ("Proficient in C and R", ["C", "R"]),
+        ("C/C++, Java", ["C", "C++", "Java"]),
+        ("Python + Go", ["Python", "Go"]),
+        ("Go (Golang) microservices", ["Go", "microservices"]),
+        ("Tools: Excel | Looker", ["Excel", "Looker"]),
+        ("R&D in C++", ["C++"]),
+    ],
+)
+def test_skills_in_context_are_found(text, skills):
+    assert get_skill_matcher().exact_skills(text) == skills